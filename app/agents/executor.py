@@ -1,5 +1,5 @@
-import asyncio
 from typing import Optional
+from app.agents.sandbox import sandbox_pool
 
 async def deploy_automation(automation_id: str, workflow_code: str, schedule: str) -> str:
     """Deploy automation (for MVP, return code for user to run locally)"""
@@ -27,3 +27,7 @@ if __name__ == "__main__":
 """
     
     return deployment_package
+
+async def run_hosted_automation(workflow_code: str, cpu_seconds: Optional[float] = None, timeout: Optional[float] = None):
+    """Run generated code server-side in the script worker pool (resource limits only, not isolation)"""
+    return await sandbox_pool.run(workflow_code, cpu_seconds=cpu_seconds, timeout=timeout)
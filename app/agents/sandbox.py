@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+
+from app.config import get_settings
+from app.utils.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+_HEADER_SIZE = 4
+
+class SandboxResult:
+    """Outcome of one script run (status: ok, error, timeout, cpu_limit, memory_limit, crashed)"""
+
+    __slots__ = ("status", "output", "result", "error", "cpu_seconds", "wall_seconds")
+
+    def __init__(self, status: str, output: str = "", result: Optional[str] = None, error: Optional[str] = None,
+                 cpu_seconds: float = 0.0, wall_seconds: float = 0.0):
+        self.status = status
+        self.output = output
+        self.result = result
+        self.error = error
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+@lru_cache(maxsize=256)
+def compile_script(source: str) -> Tuple[str, bytes]:
+    """(sha256 of the source, marshalled bytecode), compiled once per process
+
+    Raises SyntaxError before any worker is involved.
+    """
+    code_hash = hashlib.sha256(source.encode()).hexdigest()
+    code = compile(source, f"<automation {code_hash[:12]}>", "exec")
+    return code_hash, marshal.dumps(code)
+
+def _worker_env() -> dict:
+    """Only what an interpreter needs: no DATABASE_URL, API keys or secrets"""
+    home = tempfile.gettempdir()
+    return {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": home, "LANG": "C.UTF-8"}
+
+class SandboxWorker:
+    """A warm interpreter process that runs scripts one at a time"""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.jobs = 0
+
+    @classmethod
+    async def spawn(cls) -> "SandboxWorker":
+        limits = {
+            "memory_mb": settings.SANDBOX_MEMORY_MB,
+            "max_file_mb": settings.SANDBOX_MAX_FILE_MB,
+            "max_output": settings.SANDBOX_MAX_OUTPUT_CHARS
+        }
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", _WORKER_SCRIPT, json.dumps(limits),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=_worker_env()
+        )
+        worker = cls(process)
+        await worker._read()  # "ready" once the interpreter is up
+        return worker
+
+    async def _read(self) -> dict:
+        header = await self.process.stdout.readexactly(_HEADER_SIZE)
+        size = int.from_bytes(header, "big")
+        return json.loads(await self.process.stdout.readexactly(size))
+
+    async def call(self, message) -> dict:
+        frame = marshal.dumps(message)
+        self.process.stdin.write(len(frame).to_bytes(_HEADER_SIZE, "big") + frame)
+        await self.process.stdin.drain()
+        return await self._read()
+
+    def kill(self):
+        if self.process.returncode is None:
+            self.process.kill()
+
+# Respawn backoff after a worker fails to start: 1s, 2s, 4s ... capped
+_RESPAWN_MAX_BACKOFF_SECONDS = 60.0
+
+class SandboxPool:
+    """Pre-started script workers shared by every hosted script run
+
+    Not a security sandbox: workers are `python -I` processes with rlimits
+    and a scrubbed environment, but they run as the server's user with its
+    filesystem and network access. Only enable SANDBOX_ENABLED for code
+    you trust.
+
+    Scripts are compiled once in this process (cached by source hash) and
+    each worker keeps the code objects it has already loaded, so a warm run
+    costs one pipe round trip. Workers run with RLIMIT_AS / RLIMIT_CPU;
+    the wall-clock limit (which includes waiting for a free worker) is
+    enforced here by killing the worker. Killed, crashed or worn-out
+    workers are replaced in the background, retrying with backoff until a
+    replacement starts.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[SandboxWorker] = set()
+        self._pending: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._spawn_failing = False  # Last respawn attempt failed
+
+    async def start(self):
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            workers = await asyncio.gather(*(SandboxWorker.spawn() for _ in range(self.size)))
+            self._idle = asyncio.Queue()
+            for worker in workers:
+                self._workers.add(worker)
+                self._idle.put_nowait(worker)
+        logger.info("🧪 Script worker pool ready: %d worker(s)", self.size)
+        logger.warning("⚠️  Hosted scripts run without filesystem/network isolation: trusted code only")
+
+    async def _replace(self):
+        backoff = 1.0
+        while True:
+            try:
+                worker = await SandboxWorker.spawn()
+                break
+            except Exception as e:
+                self._spawn_failing = True
+                logger.error("❌ Script worker failed to start, retrying in %gs: %s", backoff, e)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, _RESPAWN_MAX_BACKOFF_SECONDS)
+        self._spawn_failing = False
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+
+    def _retire(self, worker: SandboxWorker):
+        worker.kill()
+        self._workers.discard(worker)
+        task = asyncio.ensure_future(self._replace())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def run(self, source: str, cpu_seconds: Optional[float] = None, timeout: Optional[float] = None) -> SandboxResult:
+        try:
+            code_hash, payload = compile_script(source)
+        except SyntaxError as e:
+            return SandboxResult("error", error=f"SyntaxError: {e}")
+        
+        cpu_seconds = min(cpu_seconds or settings.SANDBOX_CPU_SECONDS, settings.SANDBOX_CPU_SECONDS)
+        timeout = min(timeout or settings.SANDBOX_WALL_SECONDS, settings.SANDBOX_WALL_SECONDS)
+        
+        await self.start()
+        if not self._workers and self._spawn_failing:
+            return SandboxResult("crashed", error="No script workers available (respawn failing)")
+        
+        # One deadline for queueing and running: a backlog of scripts must not hold
+        # scheduler slots indefinitely while waiting for a worker
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            async with asyncio.timeout_at(deadline):
+                worker = await self._idle.get()
+        except TimeoutError:
+            return SandboxResult("timeout", error=f"No script worker became free within {timeout:g}s", wall_seconds=timeout)
+        
+        retire = False
+        try:
+            async with asyncio.timeout_at(deadline):
+                reply = await worker.call((code_hash, None, cpu_seconds))
+                if reply.get("status") == "need_code":
+                    reply = await worker.call((code_hash, payload, cpu_seconds))
+            result = SandboxResult(
+                reply.get("status", "error"),
+                output=reply.get("output") or "",
+                result=reply.get("result"),
+                error=reply.get("error"),
+                cpu_seconds=reply.get("cpu_seconds", 0.0),
+                wall_seconds=reply.get("wall_seconds", 0.0)
+            )
+            retire = not result.ok and result.status in ("cpu_limit", "memory_limit")
+        except TimeoutError:
+            retire = True
+            result = SandboxResult("timeout", error=f"Wall-clock limit of {timeout:g}s exceeded", wall_seconds=timeout)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            # Worker died mid-run (segfault, OOM kill) or replied with garbage
+            retire = True
+            result = SandboxResult("crashed", error=f"Sandbox worker failed: {type(e).__name__}")
+        except BaseException:
+            retire = True  # Cancelled mid-call: the worker's reply would desync the pipe
+            raise
+        finally:
+            worker.jobs += 1
+            if retire or worker.jobs >= settings.SANDBOX_MAX_JOBS_PER_WORKER:
+                self._retire(worker)
+            else:
+                self._idle.put_nowait(worker)
+        return result
+
+    async def close(self):
+        for task in list(self._pending):
+            task.cancel()
+        for worker in list(self._workers):
+            worker.kill()
+            await worker.process.wait()
+        self._workers.clear()
+        self._idle = None
+
+sandbox_pool = SandboxPool(settings.SANDBOX_WORKERS)
@@ -0,0 +1,144 @@
+"""Script worker: runs compiled automation scripts under resource limits
+
+Started by app.agents.sandbox as `python -I sandbox_worker.py <limits>`
+with a scrubbed environment, so it imports nothing from the app (no
+settings, no secrets). This limits resources, not access: the process
+runs as the server's user and can still read files and open sockets. Requests and replies travel as length-prefixed
+frames over private duplicates of stdin/stdout; fds 0-2 are pointed at
+/dev/null so script output can't interfere with the protocol.
+"""
+import asyncio
+import builtins
+import contextlib
+import io
+import json
+import marshal
+import math
+import os
+import signal
+import struct
+import sys
+import tempfile
+import time
+import traceback
+from collections import OrderedDict
+
+try:
+    import resource
+except ImportError:  # Not on Windows: wall-clock limit only
+    resource = None
+
+_HEADER = struct.Struct("!I")
+_CODE_CACHE_SIZE = 128
+
+class CpuLimitExceeded(BaseException):
+    """Raised from SIGXCPU; BaseException so scripts' `except Exception` can't swallow it"""
+
+def _on_sigxcpu(signum, frame):
+    raise CpuLimitExceeded()
+
+def read_frame(stream):
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    (size,) = _HEADER.unpack(header)
+    return stream.read(size)
+
+def write_frame(stream, data: bytes):
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+def _apply_limits(limits: dict):
+    if resource is None:
+        return
+    memory = limits["memory_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    max_file = limits["max_file_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (max_file, max_file))
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+
+def _set_cpu_budget(seconds):
+    """Per-job CPU limit on top of what the worker has used so far (RLIMIT_CPU is cumulative)"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = resource.RLIM_INFINITY if seconds is None else math.ceil(time.process_time() + seconds)
+    if hard != resource.RLIM_INFINITY and soft != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _run(code, cpu_seconds: float, max_output: int) -> dict:
+    output = io.StringIO()
+    status, result, error = "ok", None, None
+    started_wall, started_cpu = time.monotonic(), time.process_time()
+    
+    _set_cpu_budget(cpu_seconds)
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            # Fresh globals per run: nothing leaks between scripts sharing a worker
+            namespace = {"__name__": "__automation__", "__builtins__": builtins}
+            exec(code, namespace)
+            main = namespace.get("main")
+            if callable(main):
+                value = main()
+                if asyncio.iscoroutine(value):
+                    value = asyncio.run(value)
+                result = None if value is None else str(value)
+    except CpuLimitExceeded:
+        status, error = "cpu_limit", f"CPU time limit of {cpu_seconds:g}s exceeded"
+    except MemoryError:
+        status, error = "memory_limit", "Memory limit exceeded"
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            status, error = "error", f"Exited with status {e.code}"
+    except BaseException:
+        status, error = "error", traceback.format_exc(limit=-5)
+    finally:
+        _set_cpu_budget(None)
+    
+    text = output.getvalue()
+    return {
+        "status": status,
+        "output": text[-max_output:],
+        "result": result[:max_output] if result is not None else None,
+        "error": error[-max_output:] if error else None,
+        "cpu_seconds": time.process_time() - started_cpu,
+        "wall_seconds": time.monotonic() - started_wall
+    }
+
+def main():
+    limits = json.loads(sys.argv[1])
+    requests = os.fdopen(os.dup(0), "rb")
+    replies = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.chdir(tempfile.mkdtemp(prefix="automation-"))
+    _apply_limits(limits)
+    
+    cache = OrderedDict()  # code hash -> code object
+    write_frame(replies, b'{"status": "ready"}')
+    while True:
+        frame = read_frame(requests)
+        if frame is None:
+            return
+        code_hash, payload, cpu_seconds = marshal.loads(frame)
+        code = cache.get(code_hash)
+        if code is None:
+            if payload is None:
+                write_frame(replies, b'{"status": "need_code"}')
+                continue
+            code = cache[code_hash] = marshal.loads(payload)
+            if len(cache) > _CODE_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(code_hash)
+        
+        reply = _run(code, cpu_seconds, limits["max_output"])
+        write_frame(replies, json.dumps(reply).encode())
+        if reply["status"] in ("cpu_limit", "memory_limit"):
+            return  # Interpreter state is suspect after hitting a limit: let the pool replace us
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.config import get_settings
+from app.scheduler.notifications import EMAIL_ENABLED, send_discord_notification, send_email_notification
+from app.utils.fetch import BytesSink, HtmlSink, fetch_limits, select_text, stream_fetch
+from app.utils.fields import extract_fields, field_specs
+from app.utils.json_extract import compile_expression, extract_values
+from app.utils.politeness import domain_limiter
+
+settings = get_settings()
+
+class _Skip:
+    """Returned by a node to stop its downstream branch (e.g. a failed filter)"""
+    def __repr__(self):
+        return "SKIP"
+
+SKIP = _Skip()
+
+NodeHandler = Callable[[dict, Dict[str, Any]], Awaitable[Any]]
+
+def _config(node: dict) -> dict:
+    return node.get("config") or {}
+
+def _single(inputs: Dict[str, Any]) -> Any:
+    """The upstream value for one-input nodes, the {node id: value} map otherwise"""
+    if len(inputs) == 1:
+        return next(iter(inputs.values()))
+    return inputs
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode()
+
+async def _trigger(node: dict, inputs: Dict[str, Any]) -> Any:
+    return _config(node).get("payload", {})
+
+async def _fetch(node: dict, inputs: Dict[str, Any]) -> Any:
+    """{"url", "mode": "json"|"html", "json_path(s)" | "css_selector" | "selectors"}"""
+    config = _config(node)
+    url = config.get("url")
+    if not url:
+        raise ValueError(f"fetch node {node['id']} has no url")
+    max_bytes, deadline = fetch_limits(config)
+    await domain_limiter.wait(url)
+
+    if config.get("mode") == "json":
+        _, body = await stream_fetch(url, BytesSink, max_bytes=max_bytes, deadline=deadline)
+        document = orjson.loads(body)
+        if config.get("json_paths") or config.get("json_path"):
+            paths = config.get("json_paths") or {"value": config["json_path"]}
+            return extract_values(document, paths)
+        return document
+
+    _, document = await stream_fetch(url, HtmlSink, max_bytes=max_bytes, deadline=deadline)
+    specs = field_specs(config)
+    if specs:
+        return extract_fields(document, specs)
+    return select_text(document, config.get("css_selector", "body"))
+
+async def _transform(node: dict, inputs: Dict[str, Any]) -> Any:
+    """JMESPath "expression" over the input; without one, pass it through"""
+    expression = _config(node).get("expression")
+    value = _single(inputs)
+    return compile_expression(expression).search(value) if expression else value
+
+async def _filter(node: dict, inputs: Dict[str, Any]) -> Any:
+    """Pass the input on only if the JMESPath "expression" is truthy"""
+    expression = _config(node).get("expression")
+    value = _single(inputs)
+    if expression and not compile_expression(expression).search(value):
+        return SKIP
+    return value
+
+async def _notify(node: dict, inputs: Dict[str, Any]) -> Any:
+    """{"discord_webhook"/"webhook_url", "email", "title", "message": "... {input} ..."}"""
+    config = _config(node)
+    title = config.get("title") or node.get("label") or "Workflow notification"
+    message = config.get("message", "{input}").replace("{input}", _as_text(_single(inputs)))
+    sent = []
+
+    webhook = config.get("discord_webhook") or config.get("webhook_url")
+    if webhook and await send_discord_notification(webhook, title, message[:4000]):
+        sent.append("discord")
+    if config.get("email") and EMAIL_ENABLED:
+        # Resend's client is blocking
+        if await asyncio.to_thread(send_email_notification, config["email"], title, config.get("url", ""), message):
+            sent.append("email")
+    return {"sent": sent, "message": message[:500]}
+
+# Node type -> (handler, cacheable). Cacheable nodes are skipped when their
+# inputs and config hash to a cached result; sources and side effects always
+# run. The cache is process-wide, so a cached notify node would suppress the
+# same message from another workflow and would replay a failed send as done.
+NODE_HANDLERS: Dict[str, Tuple[NodeHandler, bool]] = {
+    "trigger": (_trigger, False),
+    "input": (_trigger, False),
+    "fetch": (_fetch, False),
+    "process": (_transform, True),
+    "transform": (_transform, True),
+    "filter": (_filter, True),
+    "validate": (_filter, True),
+    "notify": (_notify, False),
+    "alert": (_notify, False),
+    "output": (_transform, True)
+}
+
+def _digest(value: Any) -> bytes:
+    try:
+        data = orjson.dumps(value, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        data = repr(value).encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class NodeCache:
+    """In-process LRU of node outputs keyed by (node spec, input digests)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[Any, bytes]]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Tuple[Any, bytes]]:
+        item = self._entries.get(key)
+        if item is not None:
+            self._entries.move_to_end(key)
+        return item
+
+    def set(self, key: bytes, value: Any, digest: bytes):
+        self._entries[key] = (value, digest)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+node_cache = NodeCache(settings.WORKFLOW_CACHE_MAX_ENTRIES)
+
+def topological_order(nodes: List[dict], edges: List[dict]) -> Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]:
+    """(order, predecessors, successors); raises ValueError on unknown ids or cycles"""
+    ids = [str(node["id"]) for node in nodes]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Duplicate node ids")
+    predecessors = {node_id: [] for node_id in ids}
+    successors = {node_id: [] for node_id in ids}
+    for edge in edges:
+        source, target = str(edge["source"]), str(edge["target"])
+        if source not in predecessors or target not in predecessors:
+            raise ValueError(f"Edge {source} -> {target} references an unknown node")
+        predecessors[target].append(source)
+        successors[source].append(target)
+
+    remaining = {node_id: len(predecessors[node_id]) for node_id in ids}
+    ready = [node_id for node_id in ids if remaining[node_id] == 0]
+    order = []
+    while ready:
+        node_id = ready.pop()
+        order.append(node_id)
+        for successor in successors[node_id]:
+            remaining[successor] -= 1
+            if remaining[successor] == 0:
+                ready.append(successor)
+    if len(order) != len(ids):
+        raise ValueError("Workflow graph has a cycle")
+    return order, predecessors, successors
+
+class WorkflowRun:
+    """Executes one workflow graph; independent branches run concurrently
+
+    Node outputs are handed to successors by reference (handlers must not
+    mutate their inputs). Each output is digested once so cache keys of
+    downstream nodes never re-serialize upstream data.
+    """
+
+    def __init__(self, nodes: List[dict], edges: List[dict], cache: Optional[NodeCache] = None):
+        self.nodes = {str(node["id"]): node for node in nodes}
+        self.order, self.predecessors, self.successors = topological_order(nodes, edges)
+        self.cache = node_cache if cache is None else cache
+        self.outputs: Dict[str, Any] = {}
+        self.digests: Dict[str, bytes] = {}
+        self.report: Dict[str, dict] = {}
+        self._semaphore = asyncio.Semaphore(settings.WORKFLOW_MAX_CONCURRENCY)
+
+    def _cache_key(self, node: dict) -> bytes:
+        spec = orjson.dumps({"type": node.get("type"), "config": _config(node)}, option=orjson.OPT_SORT_KEYS)
+        key = hashlib.blake2b(spec, digest_size=16)
+        for predecessor in self.predecessors[str(node["id"])]:
+            key.update(predecessor.encode())
+            key.update(self.digests[predecessor])
+        return key.digest()
+
+    async def _execute(self, node_id: str, started: float):
+        node = self.nodes[node_id]
+        handler, cacheable = NODE_HANDLERS.get(node.get("type"), (_transform, True))
+        cacheable = cacheable and _config(node).get("cache", True)
+        inputs = {predecessor: self.outputs[predecessor] for predecessor in self.predecessors[node_id]}
+        entry = {"type": node.get("type"), "status": "ok", "cached": False}
+        self.report[node_id] = entry
+
+        async with self._semaphore:
+            node_started = time.perf_counter()
+            entry["started_ms"] = (node_started - started) * 1000
+            try:
+                key = self._cache_key(node) if cacheable else None
+                hit = self.cache.get(key) if key is not None else None
+                if hit is not None:
+                    output, digest = hit
+                    entry["cached"] = True
+                else:
+                    output = await handler(node, inputs)
+                    digest = _digest(output)
+                    if key is not None:
+                        self.cache.set(key, output, digest)
+                self.outputs[node_id] = output
+                self.digests[node_id] = digest
+                if output is SKIP:
+                    entry["status"] = "filtered"
+            except Exception as e:
+                entry["status"] = "error"
+                entry["error"] = f"{type(e).__name__}: {e}"
+            entry["duration_ms"] = (time.perf_counter() - node_started) * 1000
+
+    def _runnable(self, node_id: str) -> bool:
+        """Runs only if every upstream node produced a value"""
+        return all(
+            self.report[predecessor]["status"] == "ok" for predecessor in self.predecessors[node_id]
+        )
+
+    async def run(self) -> dict:
+        started = time.perf_counter()
+        remaining = {node_id: len(self.predecessors[node_id]) for node_id in self.order}
+        running = {}
+
+        def launch(node_id: str):
+            if self._runnable(node_id):
+                running[asyncio.ensure_future(self._execute(node_id, started))] = node_id
+            else:
+                self.report[node_id] = {"type": self.nodes[node_id].get("type"), "status": "skipped", "cached": False,
+                                        "started_ms": None, "duration_ms": 0.0}
+                finish(node_id)
+
+        def finish(node_id: str):
+            for successor in self.successors[node_id]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    launch(successor)
+
+        for node_id in self.order:
+            if remaining[node_id] == 0:
+                launch(node_id)
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finish(running.pop(task))
+
+        total_ms = (time.perf_counter() - started) * 1000
+        critical_path = self._critical_path()
+        failed = any(entry["status"] == "error" for entry in self.report.values())
+        sinks = [node_id for node_id in self.order if not self.successors[node_id]]
+        return {
+            "status": "error" if failed else "ok",
+            "total_ms": total_ms,
+            "critical_path": critical_path,
+            "outputs": {node_id: self.outputs.get(node_id) for node_id in sinks if self.report[node_id]["status"] == "ok"},
+            "nodes": self.report
+        }
+
+    def _critical_path(self) -> List[str]:
+        """Longest duration chain; annotates each node with its path length and slack"""
+        to_node: Dict[str, float] = {}
+        best_predecessor: Dict[str, Optional[str]] = {}
+        for node_id in self.order:
+            predecessors = self.predecessors[node_id]
+            previous = max(predecessors, key=lambda p: to_node[p], default=None)
+            best_predecessor[node_id] = previous
+            to_node[node_id] = self.report[node_id]["duration_ms"] + (to_node[previous] if previous else 0.0)
+        from_node: Dict[str, float] = {}
+        for node_id in reversed(self.order):
+            following = max((from_node[s] for s in self.successors[node_id]), default=0.0)
+            from_node[node_id] = self.report[node_id]["duration_ms"] + following
+
+        longest = max(to_node.values(), default=0.0)
+        for node_id in self.order:
+            entry = self.report[node_id]
+            entry["critical_path_ms"] = to_node[node_id]
+            entry["slack_ms"] = longest - (to_node[node_id] + from_node[node_id] - entry["duration_ms"])
+
+        path = []
+        node_id = max(to_node, key=to_node.get) if to_node else None
+        while node_id is not None:
+            path.append(node_id)
+            node_id = best_predecessor[node_id]
+        return path[::-1]
+
+async def run_workflow(nodes: List[dict], edges: List[dict]) -> dict:
+    """Execute a WorkflowDesign graph and return its per-node timing report"""
+    return await WorkflowRun(nodes, edges).run()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     # App
@@ -7,19 +8,145 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     API_VERSION: str = "v1"
     
-    # Supabase
-    SUPABASE_URL: str
-    SUPABASE_KEY: str
-    SUPABASE_JWT_SECRET: str
+    # Database
+    DATABASE_URL: Optional[str] = None  # Falls back to local SQLite
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # Seconds; keeps us under managed-Postgres idle timeouts
+    DB_POOL_PRE_PING: bool = True
     
-    # LLM APIs
-    GROQ_API_KEY: str
-    GOOGLE_API_KEY: str
+    # Scheduler
+    # One worker process per instance: run events (SSE), response cache
+    # invalidation and admission buckets live in process memory, so a worker
+    # that doesn't hold the scheduler lock never sees runs and serves stale caches
+    WEB_CONCURRENCY: int = 1  # Read by uvicorn/gunicorn as the default worker count; startup fails above 1
+    SCHEDULER_ENABLED: bool = True  # Set False on instances that should only serve the API
+    SCHEDULER_LOCK_FILE: str = ""  # Defaults to a file in the temp dir
+    SCHEDULER_CONCURRENCY: int = 10  # Automations executed in parallel per tick
+    SCHEDULER_TICK_SECONDS: float = 10.0
+    SCHEDULER_DEMO_MODE: bool = True  # Run everything once per tick instead of every interval_minutes
+    
+    # Per-domain politeness (token bucket per host, robots.txt Crawl-delay)
+    POLITENESS_ENABLED: bool = True
+    DOMAIN_RATE_PER_SECOND: float = 1.0
+    DOMAIN_BURST: int = 2
+    DOMAIN_JITTER: float = 0.5  # Random extra wait, as a fraction of one token interval
+    DOMAIN_MAX_BACKOFF_SECONDS: float = 600.0  # Cap on honored Retry-After
+    ROBOTS_RESPECT_CRAWL_DELAY: bool = True
+    ROBOTS_USER_AGENT: str = "AgenticAutomationBot"  # Token matched against robots.txt User-agent lines
+    ROBOTS_CACHE_SECONDS: int = 86400
+    ROBOTS_MAX_CRAWL_DELAY: float = 60.0
+    
+    # Response cache (dashboard polling endpoints)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 60.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Live run stream (SSE)
+    RUN_EVENT_BUFFER_SIZE: int = 100  # Pending events per subscriber before it is dropped
+    RUN_EVENT_REPLAY_LIMIT: int = 500  # Max runs replayed for a Last-Event-ID resume
+    RUN_EVENT_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Run history export (GET /runs/export)
+    EXPORT_BATCH_ROWS: int = 1000  # Rows fetched per server-side cursor round trip
+    EXPORT_GZIP_LEVEL: int = 6
+    
+    # Fleet stats (daily summary rows rolled up from automation_runs)
+    STATS_SUMMARY_ENABLED: bool = True
+    STATS_ROLLUP_SECONDS: float = 60.0
+    STATS_ROLLUP_LAG_SECONDS: float = 60.0  # Runs younger than this stay in the live tail
+    
+    # Content snapshots (diff engine)
+    SNAPSHOT_KEYFRAME_INTERVAL: int = 20  # Full copy every N versions, deltas in between
+    DIFF_SUMMARY_MAX_CHARS: int = 1000
+    SIMHASH_DEFAULT_THRESHOLD: int = 3  # Max Hamming distance still treated as "no change"
+    
+    # Page fetching (per-automation max_bytes / timeout_seconds are clamped to the *_LIMIT values)
+    FETCH_MAX_BYTES: int = 2_000_000
+    FETCH_MAX_BYTES_LIMIT: int = 10_000_000
+    FETCH_DEADLINE_SECONDS: float = 20.0
+    FETCH_DEADLINE_LIMIT: float = 60.0
+    FETCH_CHUNK_SIZE: int = 65536
+    FETCH_USER_AGENT: str = "Mozilla/5.0 (compatible; AgenticAutomationBot/1.0)"
+    
+    # Price history / analytics
+    PRICE_SERIES_MAX_POINTS: int = 1024
+    PRICE_SERIES_MIN_SPACING_SECONDS: int = 3600  # Unchanged prices are stored at most hourly
+    PRICE_MOVING_AVERAGE_POINTS: int = 24
+    
+    # Feed monitors (seen-GUID Bloom filters, rotated at capacity)
+    FEED_SEEN_CAPACITY: int = 5000
+    FEED_SEEN_ERROR_RATE: float = 0.001
+    FEED_MAX_NOTIFY_ENTRIES: int = 10  # Entries listed in one notification
+    
+    # Hosted script execution (worker pool for generated code). Workers get rlimits and a
+    # scrubbed environment only: no filesystem, network or user isolation, so trusted code only.
+    # Creating or updating a custom_script automation also requires X-Admin-Token = ADMIN_TOKEN
+    SANDBOX_ENABLED: bool = False
+    SANDBOX_WORKERS: int = 2
+    SANDBOX_CPU_SECONDS: float = 10.0
+    SANDBOX_WALL_SECONDS: float = 30.0
+    SANDBOX_MEMORY_MB: int = 512  # Address-space limit per worker
+    SANDBOX_MAX_FILE_MB: int = 10
+    SANDBOX_MAX_OUTPUT_CHARS: int = 10000
+    SANDBOX_MAX_JOBS_PER_WORKER: int = 200  # Recycle workers to bound leaks
+    
+    # Workflow runtime (WorkflowDesign graphs)
+    WORKFLOW_MAX_CONCURRENCY: int = 8  # Nodes of one workflow running at once
+    WORKFLOW_CACHE_MAX_ENTRIES: int = 512
+    
+    # Admission control for expensive endpoints (per-client token buckets + per-class concurrency)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_LLM_PER_MINUTE: float = 10.0  # /generate, /design
+    ADMISSION_LLM_BURST: int = 3
+    ADMISSION_LLM_CONCURRENCY: int = 4
+    ADMISSION_DEBUG_PER_MINUTE: float = 30.0  # /debug table dump
+    ADMISSION_DEBUG_BURST: int = 5
+    ADMISSION_DEBUG_CONCURRENCY: int = 2
+    ADMISSION_EMAIL_PER_MINUTE: float = 2.0  # /test-email
+    ADMISSION_EMAIL_BURST: int = 1
+    ADMISSION_EMAIL_CONCURRENCY: int = 1
+    ADMISSION_WORKFLOW_PER_MINUTE: float = 6.0  # /workflows/run (fetches pages, sends notifications)
+    ADMISSION_WORKFLOW_BURST: int = 2
+    ADMISSION_WORKFLOW_CONCURRENCY: int = 4
+    ADMISSION_BUSY_RETRY_AFTER_SECONDS: int = 1  # Retry-After when a class is at its concurrency limit
+    ADMISSION_MAX_CLIENTS: int = 10000  # Least recently seen buckets are evicted past this
+    ADMISSION_TRUSTED_PROXY_HOPS: int = 0  # Proxies in front of the app that append X-Forwarded-For (Render: 1)
+
+    # Supabase (auth routes, not mounted in app.main; empty until they are)
+    SUPABASE_URL: str = ""
+    SUPABASE_KEY: str = ""
+    SUPABASE_JWT_SECRET: str = ""
+    
+    # LLM APIs (optional at startup: without either key the LLM routes answer 503)
+    GROQ_API_KEY: str = ""
+    GOOGLE_API_KEY: str = ""
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_TOKEN: str = ""  # Empty = admin endpoints open (demo mode) and custom_script creation refused
+    
+    # Logging (queued to a background writer thread)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # "text" or "json" (one object per line)
+    LOG_SAMPLE_EVERY: int = 20  # Keep 1 in N repetitive records (e.g. no_change runs)
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking
+    LOG_FLUSH_INTERVAL_SECONDS: float = 0.25  # Writer thread wakes this often and writes a batch
+    
+    # Request timing
+    SLOW_REQUEST_THRESHOLD_MS: float = 500.0
+    SLOW_REQUEST_BUFFER_SIZE: int = 100
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests run under cProfile
+    
+    # Memory profiling (tracemalloc; slows allocation-heavy code, keep off unless investigating)
+    MEMORY_PROFILING_ENABLED: bool = False
+    MEMORY_TRACE_FRAMES: int = 5  # Stack depth recorded per allocation
+    MEMORY_SNAPSHOT_INTERVAL_SECONDS: float = 300.0
+    MEMORY_TICK_BUDGET_MB: float = 0.0  # Warn when one tick's peak exceeds this; 0 = no budget
+    MEMORY_TICK_HISTORY: int = 360  # Per-tick entries kept
     
     class Config:
         env_file = ".env"
@@ -1,10 +1,19 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import hashlib
 import os
+import tempfile
+from sqlalchemy import Column, DateTime, String, Table, func, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from app.config import get_settings
+from app.utils.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
 
 # Use PostgreSQL on Render or SQLite locally
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.DATABASE_URL
 
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     # Fix for Render's postgres:// → postgresql://
@@ -14,21 +23,148 @@ if not DATABASE_URL:
     # Fallback to SQLite for local dev
     DATABASE_URL = "sqlite:///./automations.db"
 
-# Create engine
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+def _async_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (asyncpg / aiosqlite)"""
+    if url.startswith("postgresql://"):
+        # asyncpg takes ssl=..., not libpq's sslmode=...
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1).replace("sslmode=", "ssl=")
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+def _pool_options() -> dict:
+    """Pool sizing from Settings (SQLite keeps SQLAlchemy's defaults)"""
+    if IS_SQLITE:
+        return {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+# Async engine (routes + scheduler); the only pool this process opens
+ASYNC_DATABASE_URL = _async_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_options())
 
 # Session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Base
 Base = declarative_base()
 
-# Dependency
-def get_db():
-    """Database session dependency"""
-    db = SessionLocal()
+def add_missing_columns(connection):
+    """Add nullable columns introduced after a table was first created
+
+    create_all() only creates missing tables; this covers additive column
+    changes on existing deployments without a migration tool.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                logger.info("📊 Added column %s.%s", table.name, column.name)
+
+def add_missing_indexes(connection):
+    """Create declared indexes that an existing table predates (create_all skips them)"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+                logger.info("📊 Added index %s", index.name)
+
+# Fingerprints of schemas already applied to this database
+schema_state = Table(
+    "schema_state", Base.metadata,
+    Column("fingerprint", String, primary_key=True),
+    Column("applied_at", DateTime, server_default=func.now())
+)
+
+_schema_ready = False
+
+def schema_fingerprint() -> str:
+    """Hash of every table/column/type/index the models declare"""
+    import app.models  # noqa: F401 - registers every model on Base.metadata
+    
+    digest = hashlib.blake2b(digest_size=16)
+    for table in Base.metadata.sorted_tables:
+        for column in table.columns:
+            digest.update(f"{table.name}.{column.name}:{column.type}:{column.nullable};".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(f"{table.name}#{index.name};".encode())
+    return digest.hexdigest()
+
+def _apply_schema(connection, fingerprint: str) -> bool:
+    if inspect(connection).has_table(schema_state.name):
+        found = connection.execute(select(schema_state.c.fingerprint).where(schema_state.c.fingerprint == fingerprint))
+        if found.first() is not None:
+            return False
+    Base.metadata.create_all(connection)
+    add_missing_columns(connection)
+    add_missing_indexes(connection)
+    # Another host sharing the database may have recorded the same schema meanwhile
     try:
-        yield db
+        with connection.begin_nested():
+            connection.execute(schema_state.insert().values(fingerprint=fingerprint))
+    except IntegrityError:
+        pass
+    return True
+
+def _lock_schema_file():
+    """Blocking per-host lock serializing schema changes across worker processes
+
+    Returns the open handle (closing it releases the lock), or None where
+    fcntl is unavailable (Windows: single-process dev server).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    handle = open(os.path.join(tempfile.gettempdir(), "agentic-automation-schema.lock"), "a")
+    fcntl.flock(handle, fcntl.LOCK_EX)
+    return handle
+
+async def ensure_schema():
+    """Create/extend tables once per process, and only when the models changed
+
+    A database that has already seen this exact schema costs one lookup
+    instead of create_all's per-table round trips. Workers on one host
+    (uvicorn --workers N) take turns, so only the first applies changes and
+    the rest find its fingerprint.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    fingerprint = schema_fingerprint()
+    lock = await asyncio.to_thread(_lock_schema_file)
+    try:
+        async with async_engine.begin() as connection:
+            applied = await connection.run_sync(_apply_schema, fingerprint)
     finally:
-        db.close()
+        if lock is not None:
+            lock.close()
+    logger.info("✅ Database tables ready" if applied else "✅ Database schema up to date")
+    _schema_ready = True
+
+# Dependency
+async def get_async_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,22 +1,36 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.routes import automations, workflows, hosted_automations
-from app.scheduler.automation_scheduler import start_scheduler, shutdown_scheduler
-from app.database import engine, Base
-
-# Create tables
-print("📊 Creating database tables...")
-Base.metadata.create_all(bind=engine)
-print("✅ Database tables ready")
+from app.routes import automations, workflows, hosted_automations, admin
+from app.scheduler.automation_scheduler import acquire_scheduler_lock, start_scheduler, shutdown_scheduler
+from app.agents.sandbox import sandbox_pool
+from app.config import get_settings
+from app.database import ensure_schema
+from app.utils.memory import memory_monitor
+from app.utils.timing import TimingMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    start_scheduler()
+    settings = get_settings()
+    if settings.MEMORY_PROFILING_ENABLED:
+        memory_monitor.start()  # Baseline snapshot before the scheduler and script workers start
+    if settings.WEB_CONCURRENCY > 1:
+        # Run events, cache invalidation and admission buckets are per process
+        raise RuntimeError(f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY}: run a single worker per instance")
+    await ensure_schema()
+    # Only one process per host runs the scheduler; the lock also catches a stray --workers N
+    if settings.SCHEDULER_ENABLED and acquire_scheduler_lock():
+        start_scheduler()
+    if settings.SANDBOX_ENABLED:
+        await sandbox_pool.start()  # Warm workers before the first custom script is due
     yield
     # Shutdown
     shutdown_scheduler()
+    await sandbox_pool.close()
+    from app.utils.fetch import close_client  # Imported late: keeps lxml off the startup path
+    await close_client()
+    memory_monitor.stop()
 
 app = FastAPI(
     title="Agentic Automation Platform",
@@ -31,12 +45,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "ETag", "X-Cache"],
 )
 
+# Per-request phase timing (Server-Timing header + slow request sampling)
+app.add_middleware(TimingMiddleware)
+
 # Routes
 app.include_router(automations.router, prefix="/api/automations", tags=["automations"])
 app.include_router(workflows.router, prefix="/api/workflows", tags=["workflows"])
 app.include_router(hosted_automations.router, prefix="/api/hosted-automations", tags=["hosted"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
 def read_root():
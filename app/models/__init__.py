@@ -1,3 +1,8 @@
 from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.models.snapshot import AutomationSnapshot
+from app.models.fingerprint import AutomationFingerprint
+from app.models.price_series import PriceSeries
+from app.models.feed_state import FeedState
+from app.models.run_stats import AutomationRunDaily, RunStatsWatermark
 
-__all__ = ["HostedAutomation", "AutomationRun"]
+__all__ = ["HostedAutomation", "AutomationRun", "AutomationSnapshot", "AutomationFingerprint", "PriceSeries", "FeedState", "AutomationRunDaily", "RunStatsWatermark"]
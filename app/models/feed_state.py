@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+class FeedState(Base):
+    """Seen-entry filters and conditional-GET validators for a feed monitor
+
+    Seen GUIDs live in two generations of Bloom filters: when the current
+    one reaches capacity it becomes `seen_previous` and a fresh one starts,
+    so memory stays bounded while recent history is still recognised.
+    """
+    __tablename__ = "feed_states"
+    
+    automation_id = Column(Integer, primary_key=True)
+    seen = Column(LargeBinary, nullable=False)
+    seen_previous = Column(LargeBinary, nullable=True)
+    seen_count = Column(Integer, default=0, nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
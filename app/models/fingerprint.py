@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AutomationFingerprint(Base):
+    """SimHash of the last content version that was reported as a change"""
+    __tablename__ = "automation_fingerprints"
+    
+    automation_id = Column(Integer, primary_key=True)
+    simhash = Column(String(16), nullable=False)  # 64-bit fingerprint as hex
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
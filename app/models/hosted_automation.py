@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -18,10 +18,18 @@ class HostedAutomation(Base):
 
 class AutomationRun(Base):
     __tablename__ = "automation_runs"
+    # Fetch executed_at on INSERT so committed runs can be published without a reload
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     automation_id = Column(Integer, nullable=False)
     status = Column(String, nullable=False)
     result = Column(Text, nullable=True)
+    changed_fields = Column(Text, nullable=True)  # JSON {field: bool} for multi-field monitors
     notified = Column(Boolean, default=False)
     executed_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        # Covers the grouped stats queries (counts per automation/status, min/max time)
+        Index("ix_automation_runs_automation_status_executed", "automation_id", "status", "executed_at"),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class PriceSeries(Base):
+    """Price history of one product URL tracked by one automation, as packed float64 arrays
+
+    One row per (automation, product) instead of one row per observation:
+    appends rewrite two small blobs and a tick loads every tracked product in
+    one query. Two trackers watching the same URL (possibly with different
+    selectors, possibly for different users) keep separate series.
+    """
+    __tablename__ = "automation_price_series"  # Replaces the URL-keyed price_series table
+    __table_args__ = (UniqueConstraint("automation_id", "product_url", name="uq_price_series_automation_url"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    automation_id = Column(Integer, nullable=False, index=True)
+    product_url = Column(String, nullable=False)
+    timestamps = Column(LargeBinary, nullable=False)  # Unix seconds, float64
+    prices = Column(LargeBinary, nullable=False)  # float64
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class AutomationRunDaily(Base):
+    """Per-automation, per-day run counts rolled up from automation_runs
+
+    Maintained incrementally by the stats rollup; sums and min/max merge
+    across days, so fleet stats read a few rows per automation instead of
+    every run.
+    """
+    __tablename__ = "automation_run_daily"
+    
+    automation_id = Column(Integer, primary_key=True)
+    day = Column(String(10), primary_key=True)  # YYYY-MM-DD (UTC as stored)
+    runs = Column(Integer, default=0, nullable=False)
+    errors = Column(Integer, default=0, nullable=False)
+    changes = Column(Integer, default=0, nullable=False)
+    first_run_at = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    first_change_at = Column(DateTime, nullable=True)
+    last_change_at = Column(DateTime, nullable=True)
+
+class RunStatsWatermark(Base):
+    """Highest automation_runs.id already folded into automation_run_daily"""
+    __tablename__ = "run_stats_watermark"
+    
+    name = Column(String, primary_key=True)
+    last_run_id = Column(Integer, default=0, nullable=False)
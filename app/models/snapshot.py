@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Boolean, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class AutomationSnapshot(Base):
+    """One version of an automation's extracted content
+
+    Keyframes hold the full text; other versions hold a token delta against
+    the previous version. Payloads are zlib-compressed.
+    """
+    __tablename__ = "automation_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    automation_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    is_keyframe = Column(Boolean, default=False, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_automation_snapshots_automation_version", "automation_id", "version", unique=True),
+    )
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Literal, Optional
+import hmac
+
+from app.config import get_settings
+from app.utils.admission import admission_stats
+from app.utils.memory import memory_monitor
+from app.utils.timing import slow_requests
+
+def check_admin_token(x_admin_token: Optional[str], required: bool = False):
+    """403 unless the token matches ADMIN_TOKEN; `required` also rejects when none is configured"""
+    expected = get_settings().ADMIN_TOKEN
+    if not expected:
+        if required:
+            raise HTTPException(status_code=403, detail="ADMIN_TOKEN is not configured")
+        return
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guard admin endpoints when ADMIN_TOKEN is configured"""
+    check_admin_token(x_admin_token)
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/slow-requests")
+def list_slow_requests(limit: int = 20, include_profile: bool = False):
+    """Most recent requests slower than SLOW_REQUEST_THRESHOLD_MS"""
+    entries = slow_requests.recent(limit)
+    if not include_profile:
+        entries = [{k: v for k, v in entry.items() if k != "profile"} for entry in entries]
+    return {
+        "threshold_ms": get_settings().SLOW_REQUEST_THRESHOLD_MS,
+        "count": len(entries),
+        "requests": entries
+    }
+
+@router.delete("/slow-requests")
+def clear_slow_requests():
+    """Reset the slow-request ring buffer"""
+    slow_requests.clear()
+    return {"message": "Slow request log cleared"}
+
+@router.get("/memory")
+def memory_report(
+    limit: int = Query(20, ge=1, le=200),
+    against: Literal["previous", "baseline"] = "previous",
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    ticks: int = Query(20, ge=0, le=1000)
+):
+    """Top growing allocation sites plus per-tick growth/peak (MEMORY_PROFILING_ENABLED)"""
+    return memory_monitor.report(against, group_by, limit, ticks)
+
+@router.post("/memory/snapshot")
+def take_memory_snapshot(limit: int = Query(20, ge=1, le=200)):
+    """Snapshot now and diff it against the previous one"""
+    if not memory_monitor.enabled:
+        raise HTTPException(status_code=409, detail="Memory profiling is disabled (MEMORY_PROFILING_ENABLED)")
+    memory_monitor.take_snapshot()
+    return {"top_growth": memory_monitor.top_growth("previous", "lineno", limit)}
+
+@router.get("/admission")
+def admission_report():
+    """Per-class admission limits, in-flight requests and shed counts"""
+    return admission_stats()
@@ -1,13 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
+from app.utils.admission import admit
+from app.utils.llm_client import require_llm
+
 router = APIRouter()
 
 class AutomationConfig(BaseModel):
     automation_type: str
     config: dict
 
-@router.post("/generate")
+@router.post("/generate", dependencies=[Depends(require_llm), Depends(admit("llm"))])
 def generate_automation(config: AutomationConfig):
     """Generate automation code (simplified for MVP)"""
     return {
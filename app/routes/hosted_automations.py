@@ -1,14 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import case, delete, func, insert, not_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel
+from collections import Counter
 from datetime import datetime
+import asyncio
+import base64
+import binascii
 import json
+import orjson
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import AsyncSessionLocal, get_async_db
+from app.models.feed_state import FeedState
+from app.models.fingerprint import AutomationFingerprint
 from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.models.price_series import PriceSeries
+from app.models.run_stats import AutomationRunDaily
+from app.models.snapshot import AutomationSnapshot
+from app.routes.admin import check_admin_token
+from app.scheduler.automation_scheduler import BATCH_EXECUTORS, EXECUTORS, unschedule
+from app.utils.admission import admit
+from app.utils.export import CsvEncoder, content_type, gzip_stream, ndjson_chunk
+from app.utils.log import get_logger
+from app.utils.response_cache import cached_json, response_cache
+from app.utils.run_events import RunEvent, run_events, run_payload
+from app.utils.run_stats import fleet_stats
+from app.utils.snapshots import reconstruct_version
+from app.utils.timing import phase
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+logger = get_logger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_AUTOMATIONS_PER_USER = 3  # Free tier
+MAX_BULK_ITEMS = 500
+
+# Columns a list/debug caller may request via ?fields=a,b,c (last_result is never loaded)
+AUTOMATION_FIELDS = {
+    "id": HostedAutomation.id,
+    "automation_type": HostedAutomation.automation_type,
+    "name": HostedAutomation.name,
+    "config": HostedAutomation.config,
+    "interval_minutes": HostedAutomation.interval_minutes,
+    "is_active": HostedAutomation.is_active,
+    "last_run": HostedAutomation.last_run,
+    "created_at": HostedAutomation.created_at
+}
+
+def _timed_json(content, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Serialize a response body inside the request's 'serialize' timing phase"""
+    with phase("serialize"):
+        return ORJSONResponse(content=content, headers=headers)
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated field list (default: every field)"""
+    if not fields:
+        return list(AUTOMATION_FIELDS)
+    
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in AUTOMATION_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(AUTOMATION_FIELDS)}"
+        )
+    return selected
+
+def _project(selected: List[str]):
+    """SELECT only the requested columns (plus id, the pagination key)"""
+    keys = ["id"] + [field for field in selected if field != "id"]
+    return select(*(AUTOMATION_FIELDS[key].label(key) for key in keys))
+
+def _encode_cursor(automation_id: int) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps({"id": automation_id})).decode()
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(orjson.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _paginate(stmt, limit: int, offset: int, cursor: Optional[str]):
+    """Newest-first ordering with keyset (cursor) or offset pagination"""
+    # Ids are assigned in creation order, so id DESC matches created_at DESC
+    # and gives an exact, index-backed keyset
+    stmt = stmt.order_by(HostedAutomation.id.desc())
+    
+    if cursor:
+        stmt = stmt.where(HostedAutomation.id < _decode_cursor(cursor))
+    elif offset:
+        stmt = stmt.offset(offset)
+    
+    # One extra row tells us whether another page exists
+    return stmt.limit(limit + 1)
+
+def _page(rows, limit: int):
+    """Trim the look-ahead row and build the cursor for the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(rows[-1].id)
+
+def _row_to_dict(row, selected: List[str]) -> dict:
+    item = {field: getattr(row, field) for field in selected}
+    if "config" in item:
+        item["config"] = orjson.loads(item["config"])
+    return item
+
+def _authorize_scripts(has_script: bool, x_admin_token: Optional[str]):
+    """custom_script runs arbitrary code: creating or changing one needs the sandbox and the admin token
+
+    Unlike the admin endpoints there is no open demo mode: without an
+    ADMIN_TOKEN configured, scripts can't be created at all.
+    """
+    if not has_script:
+        return
+    if not get_settings().SANDBOX_ENABLED:
+        raise HTTPException(status_code=400, detail="Hosted script execution is disabled (SANDBOX_ENABLED)")
+    check_admin_token(x_admin_token, required=True)
 
 class CreateHostedAutomation(BaseModel):
     automation_type: str
@@ -17,25 +130,27 @@ class CreateHostedAutomation(BaseModel):
     interval_minutes: int = 10
 
 @router.post("/create")
-def create_hosted_automation(
+async def create_hosted_automation(
     automation: CreateHostedAutomation,
-    db: Session = Depends(get_db)
+    x_admin_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new cloud-hosted automation"""
     
     user_id = "demo_user"
+    _authorize_scripts(automation.automation_type == "custom_script", x_admin_token)
     
     # Check limit
-    count = db.query(HostedAutomation).filter(
-        HostedAutomation.user_id == user_id
-    ).count()
-    
-    print(f"📊 Current automation count: {count}")
+    count = await db.scalar(
+        select(func.count()).select_from(HostedAutomation).where(
+            HostedAutomation.user_id == user_id
+        )
+    )
     
-    if count >= 3:
+    if count >= MAX_AUTOMATIONS_PER_USER:
         raise HTTPException(
             status_code=400,
-            detail="Free tier limited to 3 active automations. Delete one to create new."
+            detail=f"Free tier limited to {MAX_AUTOMATIONS_PER_USER} active automations. Delete one to create new."
         )
     
     # Create automation
@@ -51,12 +166,12 @@ def create_hosted_automation(
     )
     
     db.add(new_automation)
-    db.commit()
-    db.refresh(new_automation)
+    await db.commit()
+    await db.refresh(new_automation)
+    response_cache.invalidate(f"user:{user_id}")
     
-    print(f"✅ Created automation #{new_automation.id}: {new_automation.name}")
-    print(f"   Config: {automation.config}")
-    print(f"   Active: {new_automation.is_active}")
+    logger.info("✅ Created automation #%d: %s", new_automation.id, new_automation.name,
+                extra={"fields": {"user_id": user_id, "automation_type": new_automation.automation_type}})
     
     return {
         "id": new_automation.id,
@@ -71,110 +186,501 @@ def create_hosted_automation(
     }
 
 @router.get("/list")
-def list_hosted_automations(db: Session = Depends(get_db)):
-    """Get all automations"""
+async def list_hosted_automations(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get automations (newest first); next page cursor in X-Next-Cursor"""
     user_id = "demo_user"
+    selected = _parse_fields(fields)
     
-    automations = db.query(HostedAutomation).filter(
-        HostedAutomation.user_id == user_id
-    ).order_by(HostedAutomation.created_at.desc()).all()
-    
-    results = []
-    for auto in automations:
-        results.append({
-            "id": auto.id,
-            "automation_type": auto.automation_type,
-            "name": auto.name,
-            "config": json.loads(auto.config),
-            "interval_minutes": auto.interval_minutes,
-            "is_active": auto.is_active,
-            "last_run": auto.last_run,
-            "created_at": auto.created_at
-        })
-    
-    return results
-
-@router.get("/debug")
-def debug_automations(db: Session = Depends(get_db)):
-    """Debug: See all automations in database"""
-    all_automations = db.query(HostedAutomation).all()
+    async def build():
+        with phase("db"):
+            stmt = _paginate(
+                _project(selected).where(HostedAutomation.user_id == user_id),
+                limit, offset, cursor
+            )
+            result = await db.execute(stmt)
+        
+        with phase("hydrate"):
+            rows, next_cursor = _page(result.all(), limit)
+        
+        with phase("serialize"):
+            results = [_row_to_dict(row, selected) for row in rows]
+        
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return _timed_json(results, headers=headers)
     
-    return {
-        "total_count": len(all_automations),
-        "active_count": sum(1 for a in all_automations if a.is_active),
-        "automations": [
-            {
-                "id": a.id,
-                "name": a.name,
-                "is_active": a.is_active,
-                "automation_type": a.automation_type,
-                "config": json.loads(a.config),
-                "last_run": str(a.last_run) if a.last_run else None,
-                "interval_minutes": a.interval_minutes,
-                "created_at": str(a.created_at)
-            }
-            for a in all_automations
-        ]
-    }
+    return await cached_json(request, f"user:{user_id}", [f"user:{user_id}"], build)
+
+@router.get("/debug", dependencies=[Depends(admit("debug"))])
+async def debug_automations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Debug: See all automations in database (paginated)"""
+    selected = _parse_fields(fields)
+    
+    with phase("db"):
+        counts = (await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(case((HostedAutomation.is_active == True, 1), else_=0)), 0)
+            ).select_from(HostedAutomation)
+        )).one()
+        result = await db.execute(_paginate(_project(selected), limit, offset, cursor))
+    
+    with phase("hydrate"):
+        rows, next_cursor = _page(result.all(), limit)
+    
+    with phase("serialize"):
+        automations = []
+        for row in rows:
+            item = _row_to_dict(row, selected)
+            # Debug output keeps its original str() timestamps
+            for key in ("last_run", "created_at"):
+                if key in item:
+                    item[key] = str(item[key]) if item[key] else None
+            automations.append(item)
+    
+    return _timed_json({
+        "total_count": counts[0],
+        "active_count": counts[1],
+        "next_cursor": next_cursor,
+        "automations": automations
+    })
 
 @router.put("/{automation_id}/toggle")
-def toggle_automation(automation_id: int, db: Session = Depends(get_db)):
+async def toggle_automation(automation_id: int, db: AsyncSession = Depends(get_async_db)):
     """Pause or resume automation"""
-    automation = db.query(HostedAutomation).filter(
-        HostedAutomation.id == automation_id
-    ).first()
+    automation = await db.get(HostedAutomation, automation_id)
     
     if not automation:
         raise HTTPException(status_code=404, detail="Automation not found")
     
     automation.is_active = not automation.is_active
-    db.commit()
+    await db.commit()
+    response_cache.invalidate(f"user:{automation.user_id}")
+    if not automation.is_active:
+        unschedule([automation_id])
     
-    print(f"🔄 Toggled automation #{automation_id}: Active={automation.is_active}")
+    logger.info("🔄 Toggled automation #%d: active=%s", automation_id, automation.is_active)
     
     return {"id": automation_id, "is_active": automation.is_active}
 
 @router.delete("/{automation_id}")
-def delete_automation(automation_id: int, db: Session = Depends(get_db)):
+async def delete_automation(automation_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete automation"""
-    automation = db.query(HostedAutomation).filter(
-        HostedAutomation.id == automation_id
-    ).first()
+    automation = await db.get(HostedAutomation, automation_id)
     
     if not automation:
         raise HTTPException(status_code=404, detail="Automation not found")
     
-    db.delete(automation)
-    db.commit()
+    await db.delete(automation)
+    await db.execute(delete(AutomationSnapshot).where(AutomationSnapshot.automation_id == automation_id))
+    await db.execute(delete(AutomationFingerprint).where(AutomationFingerprint.automation_id == automation_id))
+    await db.execute(delete(FeedState).where(FeedState.automation_id == automation_id))
+    await db.execute(delete(AutomationRunDaily).where(AutomationRunDaily.automation_id == automation_id))
+    await db.execute(delete(PriceSeries).where(PriceSeries.automation_id == automation_id))
+    await db.commit()
+    response_cache.invalidate(f"user:{automation.user_id}", f"automation:{automation_id}")
+    unschedule([automation_id])
     
-    print(f"🗑️  Deleted automation #{automation_id}")
+    logger.info("🗑️  Deleted automation #%d", automation_id)
     
     return {"message": "Automation deleted successfully"}
 
+# Bulk endpoints: every item is validated before anything is written, then
+# the whole batch is applied in one transaction with set-based SQL. Either
+# all items succeed or none do.
+
+class BulkCreate(BaseModel):
+    automations: List[CreateHostedAutomation]
+
+class BulkUpdateItem(BaseModel):
+    id: int
+    name: Optional[str] = None
+    config: Optional[dict] = None
+    interval_minutes: Optional[int] = None
+    is_active: Optional[bool] = None
+
+class BulkUpdate(BaseModel):
+    updates: List[BulkUpdateItem]
+
+class BulkIds(BaseModel):
+    ids: List[int]
+    is_active: Optional[bool] = None  # Toggle only: set instead of flip
+
+def _check_batch_size(size: int):
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if size > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per batch")
+
+def _item_errors(name: Optional[str], interval_minutes: Optional[int], automation_type: Optional[str] = None) -> List[str]:
+    errors = []
+    if name is not None and not name.strip():
+        errors.append("name must not be empty")
+    if interval_minutes is not None and interval_minutes < 1:
+        errors.append("interval_minutes must be at least 1")
+    if automation_type is not None and automation_type not in EXECUTORS and automation_type not in BATCH_EXECUTORS:
+        errors.append(f"unknown automation_type {automation_type!r}")
+    return errors
+
+def _null_errors(item: BaseModel) -> List[str]:
+    """Fields sent as an explicit null: none of them is nullable in the table or to the executors"""
+    return [f"{field} must not be null" for field in sorted(item.model_fields_set) if getattr(item, field) is None]
+
+def _raise_item_errors(errors: List[dict]):
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Batch rejected; nothing was applied", "errors": errors})
+
+async def _owned_ids(db: AsyncSession, user_id: str, ids: List[int]) -> List[int]:
+    """Validate ids in one query: 400 on duplicates, 404 listing any missing"""
+    duplicates = sorted(i for i, n in Counter(ids).items() if n > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail={"message": "Duplicate ids", "ids": duplicates})
+    found = set((await db.scalars(
+        select(HostedAutomation.id).where(HostedAutomation.id.in_(ids), HostedAutomation.user_id == user_id)
+    )).all())
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Automations not found", "ids": missing})
+    return ids
+
+@router.post("/bulk/create")
+async def bulk_create_automations(
+    batch: BulkCreate,
+    x_admin_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many automations at once (one quota check, one INSERT)"""
+    user_id = "demo_user"
+    _check_batch_size(len(batch.automations))
+    _authorize_scripts(any(item.automation_type == "custom_script" for item in batch.automations), x_admin_token)
+    _raise_item_errors([
+        {"index": index, "errors": errors}
+        for index, item in enumerate(batch.automations)
+        if (errors := _item_errors(item.name, item.interval_minutes, item.automation_type))
+    ])
+    
+    count = await db.scalar(
+        select(func.count()).select_from(HostedAutomation).where(HostedAutomation.user_id == user_id)
+    )
+    if count + len(batch.automations) > MAX_AUTOMATIONS_PER_USER:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Free tier limited to {MAX_AUTOMATIONS_PER_USER} automations; "
+                   f"you have {count}, this batch adds {len(batch.automations)}."
+        )
+    
+    result = await db.execute(
+        insert(HostedAutomation).returning(*AUTOMATION_FIELDS.values(), sort_by_parameter_order=True),
+        [
+            {
+                "user_id": user_id,
+                "automation_type": item.automation_type,
+                "name": item.name,
+                "config": json.dumps(item.config),
+                "interval_minutes": item.interval_minutes,
+                "is_active": True
+            }
+            for item in batch.automations
+        ]
+    )
+    rows = result.all()
+    await db.commit()
+    response_cache.invalidate(f"user:{user_id}")
+    
+    logger.info("✅ Created %d automation(s)", len(rows), extra={"fields": {"user_id": user_id}})
+    selected = list(AUTOMATION_FIELDS)
+    return {"created": len(rows), "automations": [_row_to_dict(row, selected) for row in rows]}
+
+@router.post("/bulk/update")
+async def bulk_update_automations(
+    batch: BulkUpdate,
+    x_admin_token: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update name/config/interval/active state of many automations in one transaction"""
+    user_id = "demo_user"
+    _check_batch_size(len(batch.updates))
+    _raise_item_errors([
+        {"index": index, "id": item.id, "errors": errors}
+        for index, item in enumerate(batch.updates)
+        if (errors := _null_errors(item) + _item_errors(item.name, item.interval_minutes)
+            + ([] if item.model_fields_set - {"id"} else ["nothing to update"]))
+    ])
+    ids = await _owned_ids(db, user_id, [item.id for item in batch.updates])
+    scripts = await db.scalar(
+        select(func.count()).select_from(HostedAutomation)
+        .where(HostedAutomation.id.in_(ids), HostedAutomation.automation_type == "custom_script")
+    )
+    _authorize_scripts(scripts > 0, x_admin_token)
+    
+    rows = []
+    for item in batch.updates:
+        values = item.model_dump(exclude_unset=True)
+        if "config" in values:
+            values["config"] = json.dumps(values["config"])
+        rows.append(values)
+    # ORM bulk UPDATE by primary key: executemany per distinct set of columns
+    await db.execute(update(HostedAutomation), rows)
+    await db.commit()
+    
+    response_cache.invalidate(f"user:{user_id}", *(f"automation:{i}" for i in ids))
+    unschedule([item.id for item in batch.updates if item.is_active is False])
+    logger.info("✏️  Updated %d automation(s)", len(ids), extra={"fields": {"user_id": user_id}})
+    return {"updated": len(ids), "ids": ids}
+
+@router.post("/bulk/toggle")
+async def bulk_toggle_automations(batch: BulkIds, db: AsyncSession = Depends(get_async_db)):
+    """Pause/resume many automations (flip each, or set all to is_active) with one UPDATE"""
+    user_id = "demo_user"
+    _check_batch_size(len(batch.ids))
+    ids = await _owned_ids(db, user_id, batch.ids)
+    
+    new_state = not_(HostedAutomation.is_active) if batch.is_active is None else batch.is_active
+    result = await db.execute(
+        update(HostedAutomation)
+        .where(HostedAutomation.id.in_(ids), HostedAutomation.user_id == user_id)
+        .values(is_active=new_state)
+        .returning(HostedAutomation.id, HostedAutomation.is_active)
+    )
+    states = {row.id: row.is_active for row in result.all()}
+    await db.commit()
+    
+    response_cache.invalidate(f"user:{user_id}")
+    unschedule([i for i, active in states.items() if not active])
+    logger.info("🔄 Toggled %d automation(s)", len(states), extra={"fields": {"user_id": user_id}})
+    return {"toggled": len(states), "automations": [{"id": i, "is_active": states[i]} for i in ids]}
+
+@router.post("/bulk/delete")
+async def bulk_delete_automations(batch: BulkIds, db: AsyncSession = Depends(get_async_db)):
+    """Delete many automations and their snapshots/fingerprints/feed state/stats/price history in one transaction"""
+    user_id = "demo_user"
+    _check_batch_size(len(batch.ids))
+    ids = await _owned_ids(db, user_id, batch.ids)
+    
+    await db.execute(delete(HostedAutomation).where(HostedAutomation.id.in_(ids), HostedAutomation.user_id == user_id))
+    for model in (AutomationSnapshot, AutomationFingerprint, FeedState, AutomationRunDaily, PriceSeries):
+        await db.execute(delete(model).where(model.automation_id.in_(ids)))
+    await db.commit()
+    
+    response_cache.invalidate(f"user:{user_id}", *(f"automation:{i}" for i in ids))
+    unschedule(ids)
+    logger.info("🗑️  Deleted %d automation(s)", len(ids), extra={"fields": {"user_id": user_id}})
+    return {"deleted": len(ids), "ids": ids}
+
+@router.get("/runs/stream")
+async def stream_automation_runs(
+    automation_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Server-Sent Events feed of new runs (resumable via Last-Event-ID)"""
+    user_id = "demo_user"
+    settings = get_settings()
+    
+    # Subscribe before replaying so nothing committed in between is lost
+    subscription = run_events.subscribe(user_id, automation_id)
+    try:
+        replay = []
+        if last_event_id is not None:
+            stmt = (
+                select(AutomationRun)
+                .join(HostedAutomation, HostedAutomation.id == AutomationRun.automation_id)
+                .where(HostedAutomation.user_id == user_id, AutomationRun.id > last_event_id)
+                .order_by(AutomationRun.id)
+                .limit(settings.RUN_EVENT_REPLAY_LIMIT)
+            )
+            if automation_id is not None:
+                stmt = stmt.where(AutomationRun.automation_id == automation_id)
+            replay = [
+                RunEvent(run.id, user_id, run.automation_id, run_payload(run))
+                for run in (await db.execute(stmt)).scalars().all()
+            ]
+    except Exception:
+        run_events.unsubscribe(subscription)
+        raise
+    
+    async def event_stream():
+        replayed_ids = {event.id for event in replay}
+        try:
+            yield b"retry: 3000\n\n"
+            for event in replay:
+                yield event.encode()
+            
+            while not subscription.lagged:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.RUN_EVENT_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if event.id in replayed_ids:
+                    continue  # Already delivered by the replay
+                yield event.encode()
+        finally:
+            run_events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats")
+async def automation_stats(
+    days: Optional[int] = Query(None, ge=1, le=3650),
+    automation_id: Optional[int] = None,
+    source: Literal["summary", "raw"] = "summary",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Uptime, error rate, change frequency and mean time between changes (per automation + fleet)"""
+    user_id = "demo_user"
+    use_summary = source == "summary" and get_settings().STATS_SUMMARY_ENABLED
+    with phase("db"):
+        stats = await fleet_stats(db, user_id, days=days, automation_id=automation_id, use_summary=use_summary)
+    return _timed_json(stats)
+
+EXPORT_COLUMNS = ["id", "automation_id", "automation_name", "automation_type", "status",
+                  "result", "changed_fields", "notified", "executed_at"]
+
+@router.get("/runs/export")
+async def export_automation_runs(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    automation_id: Optional[int] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    gzip: bool = False
+):
+    """Stream the full run history (all automations, oldest first) as NDJSON or CSV
+
+    Rows are read through a server-side cursor in EXPORT_BATCH_ROWS
+    partitions and encoded per partition, so memory stays flat however many
+    runs are exported. gzip=true compresses on the fly (Content-Encoding).
+    """
+    user_id = "demo_user"
+    settings = get_settings()
+    stmt = (
+        select(
+            AutomationRun.id,
+            AutomationRun.automation_id,
+            HostedAutomation.name.label("automation_name"),
+            HostedAutomation.automation_type,
+            AutomationRun.status,
+            AutomationRun.result,
+            AutomationRun.changed_fields,
+            AutomationRun.notified,
+            AutomationRun.executed_at
+        )
+        .join(HostedAutomation, HostedAutomation.id == AutomationRun.automation_id)
+        .where(HostedAutomation.user_id == user_id)
+        .order_by(AutomationRun.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_ROWS)
+    )
+    if automation_id is not None:
+        stmt = stmt.where(AutomationRun.automation_id == automation_id)
+    if status:
+        stmt = stmt.where(AutomationRun.status == status)
+    if since:
+        stmt = stmt.where(AutomationRun.executed_at >= since)
+    if until:
+        stmt = stmt.where(AutomationRun.executed_at < until)
+    
+    async def rows():
+        encoder = CsvEncoder(EXPORT_COLUMNS) if format == "csv" else None
+        # Own session: the export outlives the request handler
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt)
+            async for partition in result.partitions():
+                batch = []
+                for row in partition:
+                    item = dict(row._mapping)
+                    if item["changed_fields"] and not encoder:
+                        item["changed_fields"] = orjson.loads(item["changed_fields"])
+                    batch.append(item)
+                yield encoder.chunk(batch) if encoder else ndjson_chunk(batch)
+        if encoder and not encoder.header_written:
+            yield encoder.chunk([])  # Header only
+    
+    body = gzip_stream(rows(), settings.EXPORT_GZIP_LEVEL) if gzip else rows()
+    filename = f"automation-runs-{datetime.now():%Y%m%d-%H%M%S}.{'ndjson' if format == 'ndjson' else 'csv'}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=content_type(format), headers=headers)
+
 @router.get("/{automation_id}/runs")
-def get_automation_runs(
+async def get_automation_runs(
+    request: Request,
     automation_id: int,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get execution history"""
-    runs = db.query(AutomationRun).filter(
-        AutomationRun.automation_id == automation_id
-    ).order_by(AutomationRun.executed_at.desc()).limit(limit).all()
-    
-    return [
-        {
-            "id": run.id,
-            "automation_id": run.automation_id,
-            "status": run.status,
-            "result": run.result,
-            "notified": run.notified,
-            "executed_at": run.executed_at
-        }
-        for run in runs
-    ]
+    user_id = "demo_user"
+    
+    async def build():
+        with phase("db"):
+            result = await db.execute(
+                select(AutomationRun)
+                .where(AutomationRun.automation_id == automation_id)
+                .order_by(AutomationRun.executed_at.desc())
+                .limit(limit)
+            )
+        
+        with phase("hydrate"):
+            runs = result.scalars().all()
+        
+        with phase("serialize"):
+            results = [run_payload(run) for run in runs]
+        
+        return _timed_json(results)
+    
+    return await cached_json(request, f"user:{user_id}", [f"automation:{automation_id}"], build)
+
+@router.get("/{automation_id}/versions")
+async def list_content_versions(
+    automation_id: int,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stored content versions (newest first) with their on-disk size"""
+    result = await db.execute(
+        select(
+            AutomationSnapshot.version,
+            AutomationSnapshot.is_keyframe,
+            func.length(AutomationSnapshot.payload).label("stored_bytes"),
+            AutomationSnapshot.created_at
+        )
+        .where(AutomationSnapshot.automation_id == automation_id)
+        .order_by(AutomationSnapshot.version.desc())
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in result.all()]
+
+@router.get("/{automation_id}/versions/{version}")
+async def get_content_version(automation_id: int, version: int, db: AsyncSession = Depends(get_async_db)):
+    """Reconstruct the extracted content as it was at a given version"""
+    content = await reconstruct_version(db, automation_id, version)
+    
+    if content is None:
+        raise HTTPException(status_code=404, detail="Version not found")
+    
+    return {"automation_id": automation_id, "version": version, "content": content}
 
-@router.get("/test-email")
+@router.get("/test-email", dependencies=[Depends(admit("email"))])
 def test_email_service():
     """Test email sending directly"""
     import os
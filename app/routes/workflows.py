@@ -1,5 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from typing import Any, Dict, List
+
+from app.utils.admission import admit
+from app.utils.llm_client import require_llm
 
 router = APIRouter()
 
@@ -7,7 +12,7 @@ class WorkflowDesign(BaseModel):
     task_description: str
     automation_type: str
 
-@router.post("/design")
+@router.post("/design", dependencies=[Depends(require_llm), Depends(admit("llm"))])
 def design_workflow(workflow: WorkflowDesign):
     """Design workflow endpoint (simplified for MVP)"""
     return {
@@ -17,6 +22,21 @@ def design_workflow(workflow: WorkflowDesign):
         "status": "success"
     }
 
+class WorkflowGraph(BaseModel):
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]] = []
+    description: str = ""
+
+@router.post("/run", response_class=ORJSONResponse, dependencies=[Depends(admit("workflow"))])
+async def execute_workflow(workflow: WorkflowGraph):
+    """Execute a workflow graph; returns sink outputs and per-node critical-path timing"""
+    from app.agents.workflow_runtime import run_workflow  # Scraping stack loads on first use
+    
+    try:
+        return await run_workflow(workflow.nodes, workflow.edges)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid workflow: {e}")
+
 @router.get("/status")
 def get_status():
     """Health check for workflows"""
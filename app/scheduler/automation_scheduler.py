@@ -1,289 +1,268 @@
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
-import httpx
-import json
+from functools import lru_cache
+import asyncio
+import hashlib
+import importlib
 import os
-from bs4 import BeautifulSoup
-from app.database import SessionLocal
+import tempfile
+import time
+from typing import Optional, Set
+from sqlalchemy import select
+from app.config import get_settings
+from app.database import AsyncSessionLocal
 from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.scheduler.notifications import EMAIL_ENABLED
+from app.utils.log import get_logger, log_context
+from app.utils.memory import memory_monitor
+from app.utils.politeness import domain_limiter, target_url
+from app.utils.response_cache import response_cache
+from app.utils.run_stats import rollup_run_stats
+from app.utils.run_events import RunEvent, run_events, run_payload
 
-# Email setup with detailed checks
-RESEND_API_KEY = os.getenv("RESEND_API_KEY")
-EMAIL_ENABLED = False
+settings = get_settings()
+logger = get_logger(__name__)
 
-if RESEND_API_KEY:
-    try:
-        import resend
-        resend.api_key = RESEND_API_KEY
-        EMAIL_ENABLED = True
-        print(f"✅ Resend configured with key: {RESEND_API_KEY[:10]}...")
-    except ImportError:
-        print("❌ Resend package not installed!")
-else:
-    print("❌ RESEND_API_KEY not found in environment!")
+scheduler = AsyncIOScheduler()
 
-scheduler = BackgroundScheduler()
+# Per-automation executors: (automation, session) -> recorded AutomationRun.
+# Referenced by import path so the scraping stack (lxml, numpy, ...) loads on
+# the first tick instead of delaying process startup.
+EXECUTORS = {
+    "website_monitor": "app.scheduler.website_monitor:execute_website_monitor",
+    "discord_notifier": "app.scheduler.discord_notifier:execute_discord_notifier",
+    "feed_monitor": "app.scheduler.feed_monitor:execute_feed_monitor",
+    "custom_script": "app.scheduler.custom_script:execute_custom_script",
+    "workflow": "app.scheduler.workflow_automation:execute_workflow_automation"
+}
 
-def send_email_notification(email: str, subject: str, url: str, content: str):
-    """Send email via Resend"""
-    if not EMAIL_ENABLED:
-        print(f"❌ Cannot send email - EMAIL_ENABLED={EMAIL_ENABLED}")
-        return
-    
-    try:
-        print(f"📧 Sending email to: {email}")
-        print(f"   Subject: {subject}")
-        
-        import resend
-        
-        params = {
-            "from": "Agentic Automation <onboarding@resend.dev>",
-            "to": [email],
-            "subject": subject,
-            "html": f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 0; padding: 0; background: #f4f4f4; }}
-        .container {{ max-width: 600px; margin: 20px auto; background: white; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
-        .header h1 {{ margin: 0; font-size: 24px; }}
-        .content {{ padding: 30px; }}
-        .alert {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; margin: 20px 0; border-radius: 4px; }}
-        .url {{ color: #667eea; word-break: break-all; background: #f8f9fa; padding: 10px; border-radius: 4px; margin: 10px 0; }}
-        .preview {{ background: #f8f9fa; padding: 15px; border-radius: 4px; margin: 15px 0; max-height: 200px; overflow: auto; }}
-        .footer {{ background: #f8f9fa; padding: 20px; text-align: center; color: #666; font-size: 12px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🔔 Change Detected!</h1>
-        </div>
-        <div class="content">
-            <div class="alert">
-                <strong>Your automation detected a change</strong>
-            </div>
-            
-            <h3>Monitored URL:</h3>
-            <div class="url">{url}</div>
-            
-            <h3>New Content Preview:</h3>
-            <div class="preview"><pre style="margin: 0; white-space: pre-wrap; word-wrap: break-word;">{content[:400]}</pre></div>
-            
-            <p style="color: #666; margin-top: 20px;">
-                Visit your automation dashboard to see full details and manage your automations.
-            </p>
-        </div>
-        <div class="footer">
-            <p><strong>Agentic Automation Platform</strong></p>
-            <p>You're receiving this because you set up an automation to monitor this URL.</p>
-            <p style="margin-top: 10px;">
-                <a href="https://your-frontend.vercel.app/hosted-automations" style="color: #667eea;">Manage Automations →</a>
-            </p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-        }
-        
-        result = resend.Emails.send(params)
-        print(f"✅ Email sent successfully!")
-        print(f"   Resend response: {result}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Email send failed!")
-        print(f"   Error type: {type(e).__name__}")
-        print(f"   Error message: {str(e)}")
-        import traceback
-        print(f"   Traceback: {traceback.format_exc()}")
-        return False
+# Batch executors get every due automation of their type at once
+BATCH_EXECUTORS = {
+    "price_tracker": "app.scheduler.price_tracker:execute_price_trackers"
+}
 
-def send_discord_notification(webhook_url: str, title: str, content: str):
-    """Send Discord notification"""
-    try:
-        response = httpx.post(webhook_url, json={
-            "embeds": [{
-                "title": title,
-                "description": content,
-                "color": 5814783,
-                "timestamp": datetime.now().isoformat(),
-                "footer": {"text": "Agentic Automation Platform"}
-            }]
-        }, timeout=5.0)
-        
-        if response.status_code == 204:
-            print(f"✅ Discord notification sent!")
-            return True
-        else:
-            print(f"❌ Discord failed: Status {response.status_code}")
-            return False
-            
-    except Exception as e:
-        print(f"❌ Discord error: {e}")
-        return False
+@lru_cache(maxsize=None)
+def _load_executor(path: str):
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+def _publish_run(user_id: str, run: AutomationRun):
+    """Push a recorded run to live dashboards (GET /runs/stream)"""
+    run_events.publish(RunEvent(run.id, user_id, run.automation_id, run_payload(run)))
+
+# Runs planned by earlier ticks that are still waiting for their slot or executing
+_in_flight: Set[int] = set()
+# Planned runs whose automation was paused or deleted before its slot came up
+_withdrawn: Set[int] = set()
+_tasks: Set[asyncio.Task] = set()
+_planned_until: Optional[float] = None
+_semaphore = asyncio.Semaphore(settings.SCHEDULER_CONCURRENCY)
+
+def _interval_seconds(automation: HostedAutomation) -> float:
+    if settings.SCHEDULER_DEMO_MODE:
+        return settings.SCHEDULER_TICK_SECONDS
+    return max(settings.SCHEDULER_TICK_SECONDS, (automation.interval_minutes or 60) * 60)
+
+def _phase(automation_id: int, interval: float) -> float:
+    """Stable offset within the interval, so runs spread evenly and survive restarts"""
+    digest = hashlib.blake2b(str(automation_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2**64 * interval
+
+def _next_slot(automation_id: int, interval: float, after: float) -> float:
+    """First time >= after that falls on this automation's phase"""
+    return after + (_phase(automation_id, interval) - after) % interval
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
 
-def execute_website_monitor(automation: HostedAutomation, db):
-    """Execute website monitoring automation"""
+def unschedule(automation_ids):
+    """Drop planned runs of paused/deleted automations that have not started yet
+
+    Only affects runs planned by this process; runs already executing finish.
+    """
+    _withdrawn.update(_in_flight.intersection(automation_ids))
+
+async def drain():
+    """Wait for every run planned so far"""
+    while _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
+
+async def _run_automation(automation: HostedAutomation, delay: float):
+    """Execute one automation at its slot, in its own session (sessions are not task-safe)"""
+    executor = _load_executor(EXECUTORS[automation.automation_type])
+    automation_id = automation.id
+    # Every record logged by this run carries which automation it belongs to
+    with log_context(automation_id=automation_id, automation_type=automation.automation_type, user_id=automation.user_id):
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if automation_id in _withdrawn:
+                return
+            # Wait out a throttled host before taking a slot, so it doesn't block others;
+            # its token is taken once the slot is held, right before the fetch
+            url = target_url(automation.config)
+            await domain_limiter.ready(url)
+            async with _semaphore:
+                await domain_limiter.wait(url)
+                async with AsyncSessionLocal() as db:
+                    db.add(automation)
+                    user_id = automation.user_id
+                    # New run row + last_run: drop cached /list and /runs responses
+                    cache_tags = (f"user:{user_id}", f"automation:{automation.id}")
+                    try:
+                        run = await executor(automation, db)
+                    finally:
+                        response_cache.invalidate(*cache_tags)
+                    
+                    _publish_run(user_id, run)
+        except Exception as e:
+            logger.exception("❌ Scheduler error in automation #%d: %s", automation_id, e)
+        finally:
+            _in_flight.discard(automation_id)
+            _withdrawn.discard(automation_id)
+
+async def _run_batch(automation_type: str, automations: list, delay: float):
+    """Execute all due automations of a batch type; the semaphore bounds their fetches"""
+    automation_ids = [a.id for a in automations]
     try:
-        config = json.loads(automation.config)
-        
-        print(f"\n{'='*60}")
-        print(f"🔄 Executing automation #{automation.id}: {automation.name}")
-        print(f"   URL: {config.get('url')}")
-        print(f"   Discord: {'✓' if config.get('discord_webhook') else '✗'}")
-        print(f"   Email: {config.get('email', 'Not set')}")
-        print(f"{'='*60}\n")
-        
-        # Fetch website
-        response = httpx.get(config['url'], timeout=10.0, follow_redirects=True)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Extract content
-        selector = config.get('css_selector', 'body')
-        content = soup.select_one(selector)
-        current_value = content.get_text(strip=True) if content else ""
-        
-        # Check if changed
-        changed = automation.last_result != current_value if automation.last_result else True
-        
-        # Log run
-        run = AutomationRun(
-            automation_id=automation.id,
-            status="change_detected" if changed else "no_change",
-            result=current_value[:500],
-            notified=False
-        )
-        db.add(run)
-        
-        # Update automation
-        automation.last_run = datetime.now()
-        if changed:
-            automation.last_result = current_value
-        
-        db.commit()
-        
-        # Send notifications if changed
-        notifications_sent = []
-        
-        if changed:
-            print(f"🔥 CHANGE DETECTED!")
-            
-            # Discord
-            if config.get('discord_webhook'):
-                success = send_discord_notification(
-                    config['discord_webhook'],
-                    f"🔔 Change detected: {automation.name}",
-                    f"**URL:** {config['url']}\n\n**New content:**\n{current_value[:300]}"
-                )
-                if success:
-                    notifications_sent.append("Discord")
-            
-            # Email
-            if config.get('email'):
-                print(f"\n📧 EMAIL NOTIFICATION:")
-                print(f"   Recipient: {config['email']}")
-                print(f"   EMAIL_ENABLED: {EMAIL_ENABLED}")
-                
-                if EMAIL_ENABLED:
-                    success = send_email_notification(
-                        config['email'],
-                        f"🔔 Change Detected: {automation.name}",
-                        config['url'],
-                        current_value[:500]
-                    )
-                    if success:
-                        notifications_sent.append("Email")
-                        run.notified = True
-                        db.commit()
-                else:
-                    print(f"   ⚠️  Email disabled - check RESEND_API_KEY")
-            
-            print(f"\n✅ Notifications sent: {', '.join(notifications_sent) if notifications_sent else 'None'}")
-        else:
-            print(f"✓ No change detected")
-        
-        print(f"{'='*60}\n")
+        if delay > 0:
+            await asyncio.sleep(delay)
+        automations = [a for a in automations if a.id not in _withdrawn]
+        if not automations:
+            return
+        try:
+            results = await _load_executor(BATCH_EXECUTORS[automation_type])(automations, _semaphore)
+        finally:
+            response_cache.invalidate(
+                *{f"user:{a.user_id}" for a in automations},
+                *(f"automation:{a.id}" for a in automations)
+            )
         
+        for user_id, run in results:
+            _publish_run(user_id, run)
     except Exception as e:
-        print(f"❌ Automation execution error: {e}")
-        import traceback
-        print(traceback.format_exc())
-        
-        run = AutomationRun(
-            automation_id=automation.id,
-            status="error",
-            result=str(e)[:500],
-            notified=False
-        )
-        db.add(run)
-        db.commit()
+        logger.exception("❌ Scheduler error in %s batch: %s", automation_type, e)
+    finally:
+        _in_flight.difference_update(automation_ids)
+        _withdrawn.difference_update(automation_ids)
 
-def run_scheduled_automations():
-    """Main scheduler loop"""
-    db = SessionLocal()
-    
+async def run_scheduled_automations():
+    """Main scheduler loop: plan the runs whose phase slot falls in the next tick
+
+    Each automation runs at a fixed offset within its interval instead of
+    on the tick boundary, so outbound requests are spread out; runs are
+    started as tasks and the tick returns immediately.
+    """
+    global _planned_until
+    memory_monitor.on_tick()
     try:
         # Get active automations
-        automations = db.query(HostedAutomation).filter(
-            HostedAutomation.is_active == True
-        ).all()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(HostedAutomation).where(HostedAutomation.is_active == True)
+            )
+            automations = result.scalars().all()
         
         if not automations:
-            print("⏸️  No active automations")
+            logger.info("⏸️  No active automations", extra={"sample": "no_automations"})
             return
         
-        print(f"\n🔍 Found {len(automations)} active automation(s):")
-        for auto in automations:
-            config = json.loads(auto.config)
-            print(f"   #{auto.id}: {auto.name} (Email: {config.get('email', 'none')})")
+        # Plan [end of last window, now + tick); a late tick catches up at most one tick
+        now = time.time()
+        tick = settings.SCHEDULER_TICK_SECONDS
+        window_start = max(_planned_until or now, now - tick)
+        window_end = now + tick
+        _planned_until = window_end
         
-        # Check each automation
+        planned = 0
+        batches = {}
         for automation in automations:
-            # Demo mode: run every 10 seconds minimum
-            if automation.last_run:
-                seconds_since = (datetime.now() - automation.last_run).total_seconds()
-                if seconds_since < 10:
-                    continue
+            if automation.id in _in_flight:
+                continue
+            interval = _interval_seconds(automation)
+            slot = _next_slot(automation.id, interval, window_start)
+            if slot >= window_end:
+                continue
             
-            # Execute
-            if automation.automation_type == "website_monitor":
-                execute_website_monitor(automation, db)
+            if automation.automation_type in EXECUTORS:
+                _in_flight.add(automation.id)
+                _spawn(_run_automation(automation, slot - now))
+                planned += 1
+            elif automation.automation_type in BATCH_EXECUTORS:
+                batches.setdefault(automation.automation_type, []).append((slot, automation))
+        
+        # Batches share fetches, so they start at their earliest member's slot
+        for automation_type, members in batches.items():
+            _in_flight.update(automation.id for _, automation in members)
+            _spawn(_run_batch(automation_type, [automation for _, automation in members], min(slot for slot, _ in members) - now))
+            planned += len(members)
+        
+        logger.info("🗓️  Planned %d run(s) over the next %gs", planned, tick,
+                    extra={"fields": {"active": len(automations), "in_flight": len(_in_flight)}})
                 
     except Exception as e:
-        print(f"❌ Scheduler error: {e}")
-        import traceback
-        print(traceback.format_exc())
-    finally:
-        db.close()
+        logger.exception("❌ Scheduler error: %s", e)
+
+_lock_file = None
+
+def acquire_scheduler_lock() -> bool:
+    """Exclusive per-host lock so only one worker process schedules automations
+
+    The app expects a single worker (see WEB_CONCURRENCY): run events and
+    cache invalidations are published in the scheduling process only.
+    """
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:  # Windows: single-process dev server
+        return True
+    path = settings.SCHEDULER_LOCK_FILE or os.path.join(tempfile.gettempdir(), "agentic-automation-scheduler.lock")
+    handle = open(path, "a")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        logger.warning("⚠️  Scheduler already running in another process (lock: %s): this worker "
+                       "gets no run events or cache invalidations, run a single worker", path)
+        return False
+    _lock_file = handle  # Held (and the lock with it) for the life of the process
+    return True
 
 def start_scheduler():
     """Start background scheduler"""
-    print("\n" + "="*60)
-    print("🚀 STARTING AUTOMATION SCHEDULER")
-    print("="*60)
-    print(f"Mode: Demo (every 10 seconds)")
-    print(f"Email: {'✅ ENABLED' if EMAIL_ENABLED else '❌ DISABLED'}")
-    if EMAIL_ENABLED:
-        print(f"Resend API Key: {RESEND_API_KEY[:15]}...")
-    print("="*60 + "\n")
+    mode = f"demo (every {settings.SCHEDULER_TICK_SECONDS:g} seconds" if settings.SCHEDULER_DEMO_MODE else "interval (interval_minutes"
+    logger.info("🚀 Starting automation scheduler: %s, phase-spread, %d concurrent), email %s",
+                mode, settings.SCHEDULER_CONCURRENCY, "enabled" if EMAIL_ENABLED else "disabled")
     
     scheduler.add_job(
         run_scheduled_automations,
-        trigger=IntervalTrigger(seconds=10),
+        trigger=IntervalTrigger(seconds=settings.SCHEDULER_TICK_SECONDS),
         id='automation_checker',
-        name='Check automations every 10s',
+        name='Plan automation runs for the next tick',
         replace_existing=True
     )
     
+    if settings.STATS_SUMMARY_ENABLED:
+        scheduler.add_job(
+            rollup_run_stats,
+            trigger=IntervalTrigger(seconds=settings.STATS_ROLLUP_SECONDS),
+            id='run_stats_rollup',
+            name='Fold new runs into the daily stats summary',
+            replace_existing=True
+        )
+    
     scheduler.start()
-    print("✅ Scheduler running!\n")
+    logger.info("✅ Scheduler running")
 
 def shutdown_scheduler():
     """Stop scheduler"""
+    if not scheduler.running:
+        return
     scheduler.shutdown()
-    print("✅ Scheduler stopped")
+    for task in list(_tasks):
+        task.cancel()
+    logger.info("✅ Scheduler stopped")
@@ -0,0 +1,54 @@
+from datetime import datetime
+import json
+from app.agents.executor import run_hosted_automation
+from app.config import get_settings
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.utils.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+async def execute_custom_script(automation: HostedAutomation, db) -> AutomationRun:
+    """Run an automation's generated code in the script worker pool (main()'s return value is the result)"""
+    automation_id = automation.id  # Still readable after a rollback expires the instance
+    try:
+        if not settings.SANDBOX_ENABLED:
+            raise ValueError("Hosted script execution is disabled (SANDBOX_ENABLED)")
+        config = json.loads(automation.config)
+        code = config.get('code') or config.get('workflow_code')
+        if not code:
+            raise ValueError("custom_script requires code")
+        
+        outcome = await run_hosted_automation(code, cpu_seconds=config.get('cpu_seconds'), timeout=config.get('timeout_seconds'))
+        if outcome.ok:
+            text = outcome.result if outcome.result is not None else outcome.output
+        else:
+            text = f"{outcome.status}: {outcome.error or ''}\n{outcome.output}".strip()
+        logger.info("🧪 Script %s (%.2fs CPU, %.2fs wall)", outcome.status, outcome.cpu_seconds, outcome.wall_seconds)
+        
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="completed" if outcome.ok else "error",
+            result=text[:500],
+            notified=False
+        )
+        db.add(run)
+        automation.last_run = datetime.now()
+        if outcome.ok:
+            automation.last_result = text
+        await db.commit()
+        return run
+        
+    except Exception as e:
+        logger.error("❌ Custom script error: %s", e)
+        
+        await db.rollback()
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="error",
+            result=str(e)[:500],
+            notified=False
+        )
+        db.add(run)
+        await db.commit()
+        return run
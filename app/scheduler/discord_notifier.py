@@ -0,0 +1,74 @@
+from datetime import datetime
+import json
+import orjson
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.scheduler.notifications import send_discord_notification
+from app.utils.fetch import BytesSink, fetch_limits, stream_fetch
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+class _TemplateFields(dict):
+    """Leave unknown {placeholders} in a user template untouched"""
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+async def execute_discord_notifier(automation: HostedAutomation, db) -> AutomationRun:
+    """Post the templated message to Discord whenever its rendered content changes"""
+    automation_id = automation.id  # Still readable after a rollback expires the instance
+    try:
+        config = json.loads(automation.config)
+        webhook = config.get('webhook_url') or config.get('discord_webhook')
+        if not webhook:
+            raise ValueError("discord_notifier requires webhook_url")
+        
+        content = "Hello from your automation!"
+        if config.get('data_source'):
+            max_bytes, deadline = fetch_limits(config)
+            fetch, body = await stream_fetch(config['data_source'], BytesSink, max_bytes=max_bytes, deadline=deadline)
+            if fetch.status_code != 200:
+                raise ValueError(f"data_source returned HTTP {fetch.status_code}")
+            try:
+                content = orjson.dumps(orjson.loads(body)).decode()
+            except orjson.JSONDecodeError:
+                content = body.decode('utf-8', errors='replace')
+        
+        template = config.get('message_template', "Notification: {content}")
+        message = template.format_map(_TemplateFields(content=content))
+        
+        # {time} is filled in at send time so it doesn't count as a change
+        changed = message != automation.last_result
+        notified = False
+        if changed:
+            notified = await send_discord_notification(
+                webhook,
+                f"📢 {automation.name}",
+                message.replace("{time}", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))[:4000]
+            )
+        
+        run = AutomationRun(
+            automation_id=automation_id,
+            status=("notified" if notified else "error") if changed else "no_change",
+            result=message[:500],
+            notified=notified
+        )
+        db.add(run)
+        automation.last_run = datetime.now()
+        if notified:
+            automation.last_result = message
+        await db.commit()
+        return run
+        
+    except Exception as e:
+        logger.error("❌ Discord notifier error: %s", e)
+        
+        await db.rollback()
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="error",
+            result=str(e)[:500],
+            notified=False
+        )
+        db.add(run)
+        await db.commit()
+        return run
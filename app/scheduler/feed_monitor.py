@@ -0,0 +1,153 @@
+from datetime import datetime
+import asyncio
+import json
+from app.config import get_settings
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.models.feed_state import FeedState
+from app.scheduler.notifications import EMAIL_ENABLED, send_discord_notification, send_email_notification
+from app.utils.bloom import BloomFilter
+from app.utils.feeds import FeedSink
+from app.utils.fetch import fetch_limits, stream_fetch
+from app.utils.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+def _new_filter(data: bytes = None) -> BloomFilter:
+    return BloomFilter.for_capacity(settings.FEED_SEEN_CAPACITY, settings.FEED_SEEN_ERROR_RATE, data)
+
+def _load_filters(state: FeedState):
+    """(current, previous) filters, or None if there is no usable state yet"""
+    if state is None:
+        return None
+    current = _new_filter(state.seen)
+    if len(state.seen) != len(current.bits):
+        return None  # Capacity settings changed: re-baseline
+    previous = None
+    if state.seen_previous and len(state.seen_previous) == len(current.bits):
+        previous = _new_filter(state.seen_previous)
+    return current, previous
+
+def _format_entries(entries) -> str:
+    limit = settings.FEED_MAX_NOTIFY_ENTRIES
+    lines = [f"• {entry.title or entry.link or entry.key}" + (f"\n  {entry.link}" if entry.link else "") for entry in entries[:limit]]
+    if len(entries) > limit:
+        lines.append(f"…and {len(entries) - limit} more")
+    return "\n".join(lines)
+
+async def execute_feed_monitor(automation: HostedAutomation, db) -> AutomationRun:
+    """Notify about entries of an RSS/Atom feed or sitemap not seen before
+
+    Seen entry keys are kept in rotating Bloom filters (FeedState), so a
+    check costs one conditional GET plus a streaming parse, whatever the
+    feed's history. The first run only records the current entries.
+    """
+    automation_id = automation.id  # Still readable after a rollback expires the instance
+    try:
+        config = json.loads(automation.config)
+        url = config.get('feed_url') or config.get('url')
+        if not url:
+            raise ValueError("feed_monitor requires feed_url")
+        
+        state = await db.get(FeedState, automation_id)
+        headers = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        
+        max_bytes, deadline = fetch_limits(config)
+        fetch, entries = await stream_fetch(url, FeedSink, max_bytes=max_bytes, deadline=deadline, headers=headers)
+        
+        automation.last_run = datetime.now()
+        if fetch.status_code == 304:
+            run = AutomationRun(automation_id=automation_id, status="no_change", result="Feed not modified", notified=False)
+            db.add(run)
+            await db.commit()
+            return run
+        if fetch.status_code != 200:
+            raise ValueError(f"Feed returned HTTP {fetch.status_code}")
+        
+        # Sitemaps re-list the same <loc> when a page changes; opt in to treating that as new
+        track_updates = config.get('track_updates', False)
+        keys = [f"{entry.key}@{entry.updated}" if track_updates else entry.key for entry in entries]
+        
+        filters = _load_filters(state)
+        baseline = filters is None
+        current, previous = filters or (_new_filter(), None)
+        seen_count = 0 if baseline else state.seen_count
+        
+        new_entries = []
+        for entry, key in zip(entries, keys):
+            if key in current:
+                continue
+            if not baseline and not (previous is not None and key in previous):
+                new_entries.append(entry)
+            # Re-adding entries still in the feed keeps them out of the rotated-away generation
+            current.add(key)
+            seen_count += 1
+            if seen_count >= settings.FEED_SEEN_CAPACITY:
+                previous, current, seen_count = current, _new_filter(), 0
+        
+        if state is None:
+            state = FeedState(automation_id=automation_id)
+            db.add(state)
+        state.seen = current.to_bytes()
+        state.seen_previous = previous.to_bytes() if previous is not None else None
+        state.seen_count = seen_count
+        # A truncated body may hide entries; don't let a 304 skip them next time
+        state.etag = None if fetch.truncated else fetch.headers.get("etag")
+        state.last_modified = None if fetch.truncated else fetch.headers.get("last-modified")
+        
+        if baseline:
+            result = f"Tracking {len(entries)} entries"
+        elif new_entries:
+            result = f"{len(new_entries)} new entries\n{_format_entries(new_entries)}"
+        else:
+            result = "No new entries"
+        
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="change_detected" if new_entries else "no_change",
+            result=result[:500],
+            notified=False
+        )
+        db.add(run)
+        if new_entries:
+            automation.last_result = result
+        await db.commit()
+        
+        if new_entries:
+            logger.info("📰 %d new entries", len(new_entries))
+            summary = _format_entries(new_entries)
+            title = f"📰 {len(new_entries)} new in {automation.name}"
+            notified = False
+            
+            webhook = config.get('discord_webhook') or config.get('webhook_url')
+            if webhook:
+                notified = await send_discord_notification(webhook, title, f"**Feed:** {url}\n\n{summary}") or notified
+            
+            if config.get('email') and EMAIL_ENABLED:
+                # Resend's client is blocking
+                notified = bool(await asyncio.to_thread(send_email_notification, config['email'], title, url, summary)) or notified
+            
+            if notified:
+                run.notified = True
+                await db.commit()
+        
+        return run
+        
+    except Exception as e:
+        logger.error("❌ Feed monitor error: %s", e)
+        
+        await db.rollback()
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="error",
+            result=str(e)[:500],
+            notified=False
+        )
+        db.add(run)
+        await db.commit()
+        return run
@@ -0,0 +1,118 @@
+from datetime import datetime
+import html
+import importlib.util
+import os
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Email setup with detailed checks. resend (and requests under it) is only
+# imported when the first email goes out, not at startup.
+RESEND_API_KEY = os.getenv("RESEND_API_KEY")
+EMAIL_ENABLED = False
+
+if RESEND_API_KEY:
+    if importlib.util.find_spec("resend") is not None:
+        EMAIL_ENABLED = True
+        logger.info("✅ Resend configured with key: %s...", RESEND_API_KEY[:10])
+    else:
+        logger.error("❌ Resend package not installed!")
+else:
+    logger.warning("❌ RESEND_API_KEY not found in environment!")
+
+def send_email_notification(email: str, subject: str, url: str, content: str):
+    """Send email via Resend"""
+    if not EMAIL_ENABLED:
+        logger.warning("❌ Cannot send email - EMAIL_ENABLED=%s", EMAIL_ENABLED)
+        return
+    
+    try:
+        import resend
+        resend.api_key = RESEND_API_KEY
+        
+        params = {
+            "from": "Agentic Automation <onboarding@resend.dev>",
+            "to": [email],
+            "subject": subject,
+            "html": f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 0; padding: 0; background: #f4f4f4; }}
+        .container {{ max-width: 600px; margin: 20px auto; background: white; border-radius: 10px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
+        .header h1 {{ margin: 0; font-size: 24px; }}
+        .content {{ padding: 30px; }}
+        .alert {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 15px; margin: 20px 0; border-radius: 4px; }}
+        .url {{ color: #667eea; word-break: break-all; background: #f8f9fa; padding: 10px; border-radius: 4px; margin: 10px 0; }}
+        .preview {{ background: #f8f9fa; padding: 15px; border-radius: 4px; margin: 15px 0; max-height: 200px; overflow: auto; }}
+        .footer {{ background: #f8f9fa; padding: 20px; text-align: center; color: #666; font-size: 12px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🔔 Change Detected!</h1>
+        </div>
+        <div class="content">
+            <div class="alert">
+                <strong>Your automation detected a change</strong>
+            </div>
+            
+            <h3>Monitored URL:</h3>
+            <div class="url">{url}</div>
+            
+            <h3>What Changed:</h3>
+            <div class="preview"><pre style="margin: 0; white-space: pre-wrap; word-wrap: break-word;">{html.escape(content)}</pre></div>
+            
+            <p style="color: #666; margin-top: 20px;">
+                Visit your automation dashboard to see full details and manage your automations.
+            </p>
+        </div>
+        <div class="footer">
+            <p><strong>Agentic Automation Platform</strong></p>
+            <p>You're receiving this because you set up an automation to monitor this URL.</p>
+            <p style="margin-top: 10px;">
+                <a href="https://your-frontend.vercel.app/hosted-automations" style="color: #667eea;">Manage Automations →</a>
+            </p>
+        </div>
+    </div>
+</body>
+</html>
+            """
+        }
+        
+        result = resend.Emails.send(params)
+        logger.info("📧 Email sent", extra={"fields": {"email": email, "resend_id": result.get("id") if isinstance(result, dict) else None}})
+        return True
+        
+    except Exception as e:
+        logger.exception("❌ Email send failed: %s: %s", type(e).__name__, e, extra={"fields": {"email": email}})
+        return False
+
+async def send_discord_notification(webhook_url: str, title: str, content: str):
+    """Send Discord notification"""
+    from app.utils.fetch import get_client  # Shared client; loads the scraping stack on first use
+    
+    try:
+        response = await get_client().post(webhook_url, json={
+            "embeds": [{
+                "title": title,
+                "description": content,
+                "color": 5814783,
+                "timestamp": datetime.now().isoformat(),
+                "footer": {"text": "Agentic Automation Platform"}
+            }]
+        }, timeout=5.0)
+        
+        if response.status_code == 204:
+            logger.debug("✅ Discord notification sent")
+            return True
+        else:
+            logger.warning("❌ Discord failed: status %d", response.status_code)
+            return False
+            
+    except Exception as e:
+        logger.warning("❌ Discord error: %s", e)
+        return False
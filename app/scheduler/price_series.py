@@ -0,0 +1,126 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import select
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.price_series import PriceSeries
+
+settings = get_settings()
+
+Series = Tuple[np.ndarray, np.ndarray]  # (timestamps, prices)
+SeriesKey = Tuple[int, str]  # (automation_id, product_url)
+
+async def append_prices(prices: Dict[SeriesKey, float], now: float) -> Tuple[Dict[SeriesKey, Series], set]:
+    """Append this tick's prices to every product's series in one round trip
+
+    A point is stored when the price changed or PRICE_SERIES_MIN_SPACING_SECONDS
+    passed since the last one, so steady prices polled every few seconds don't
+    fill the series. Returns ({key: series}, keys that got a new point).
+    """
+    if not prices:
+        return {}, set()
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(PriceSeries).where(
+            PriceSeries.automation_id.in_({key[0] for key in prices}),
+            PriceSeries.product_url.in_({key[1] for key in prices})
+        ))
+        rows = {(row.automation_id, row.product_url): row for row in result.scalars().all()}
+        
+        series: Dict[SeriesKey, Series] = {}
+        appended = set()
+        for key, price in prices.items():
+            row = rows.get(key)
+            if row is None:
+                times, values = np.empty(0), np.empty(0)
+            else:
+                times, values = np.frombuffer(row.timestamps), np.frombuffer(row.prices)
+            
+            if len(values) and values[-1] == price and now - times[-1] < settings.PRICE_SERIES_MIN_SPACING_SECONDS:
+                series[key] = (times, values)
+                continue
+            
+            keep = settings.PRICE_SERIES_MAX_POINTS - 1
+            times = np.append(times[-keep:], now)
+            values = np.append(values[-keep:], price)
+            series[key] = (times, values)
+            appended.add(key)
+            
+            if row is None:
+                db.add(PriceSeries(automation_id=key[0], product_url=key[1], timestamps=times.tobytes(), prices=values.tobytes()))
+            else:
+                row.timestamps, row.prices = times.tobytes(), values.tobytes()
+        
+        await db.commit()
+    return series, appended
+
+def _right_aligned(series: List[Series]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack ragged series into NaN-padded (N, L) matrices, newest point in the last column"""
+    width = max((len(values) for _, values in series), default=0)
+    times = np.full((len(series), width), np.nan)
+    prices = np.full((len(series), width), np.nan)
+    for i, (t, p) in enumerate(series):
+        if len(p):
+            times[i, width - len(t):] = t
+            prices[i, width - len(p):] = p
+    return times, prices
+
+def _masked_mean(values: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    total = np.where(valid, values, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+def _masked_std(values: np.ndarray) -> np.ndarray:
+    mean = _masked_mean(values)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    squared = np.where(valid, (values - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 1, np.sqrt(squared / (count - 1)), np.nan)
+
+def analyze(series: List[Series], lowest_days: np.ndarray, ma_points: np.ndarray, below_ma_pct: np.ndarray, now: float) -> Dict[str, np.ndarray]:
+    """Rolling statistics and alert flags for every product in one vectorized pass
+
+    Row i of every input/output belongs to series[i]; a rule whose parameter
+    is 0 never fires. Flags only fire on the tick a condition starts holding.
+    """
+    times, prices = _right_aligned(series)
+    n, width = prices.shape
+    if width == 0:
+        empty = np.full(n, np.nan)
+        return {"moving_average": empty, "volatility": empty, "period_low": empty,
+                "lowest_in_days": np.zeros(n, bool), "below_moving_average": np.zeros(n, bool)}
+    
+    current = prices[:, -1]
+    history_prices, history_times = prices[:, :-1], times[:, :-1]
+    
+    # Lowest in N days: strictly below every earlier point inside the window
+    in_window = history_times >= (now - lowest_days * 86400.0)[:, None]
+    period_low = np.min(np.where(in_window, history_prices, np.inf), axis=1) if width > 1 else np.full(n, np.inf)
+    lowest = (lowest_days > 0) & np.isfinite(period_low) & (current < period_low)
+    
+    # Moving average of each row's k points before the current one; volatility
+    # is the std of the k log returns ending at the current point
+    columns = np.arange(width - 1)
+    recent = columns[None, :] >= (width - 1 - np.maximum(ma_points, 1))[:, None]
+    moving_average = _masked_mean(np.where(recent, history_prices, np.nan))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_returns = np.diff(np.log(prices), axis=1)
+    volatility = _masked_std(np.where(recent, log_returns, np.nan))
+    
+    threshold = moving_average * (1 - below_ma_pct / 100.0)
+    previous = prices[:, -2] if width > 1 else np.full(n, np.nan)
+    with np.errstate(invalid="ignore"):
+        below_now = current <= threshold
+        below_before = previous <= threshold
+    below = (below_ma_pct > 0) & below_now & ~below_before & ~np.isnan(previous)
+    
+    return {
+        "moving_average": moving_average,
+        "volatility": volatility,
+        "period_low": np.where(np.isfinite(period_low), period_low, np.nan),
+        "lowest_in_days": lowest,
+        "below_moving_average": below
+    }
@@ -0,0 +1,282 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import time
+import numpy as np
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.scheduler.notifications import EMAIL_ENABLED, send_discord_notification, send_email_notification
+from app.scheduler.price_series import analyze, append_prices
+from app.utils.fetch import HtmlSink, compile_selector, element_text, fetch_limits, stream_fetch
+from app.utils.fields import parse_price
+from app.utils.log import get_logger
+from app.utils.politeness import domain_limiter
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Same fallbacks as the generated price_tracker script
+DEFAULT_PRICE_SELECTORS = [
+    '.price', '#priceblock_dealprice', '#priceblock_ourprice',
+    '.a-price-whole', '[data-price]', '.product-price', '._30jeq3'
+]
+
+def products_from_config(config: dict) -> List[dict]:
+    """Normalize the single-product template config and the multi-product form
+
+    {"product_url": ..., "target_price": ...} or
+    {"products": [{"url": ..., "target_price": ..., "css_selector": ..., "name": ...}]}
+    """
+    products = config.get('products')
+    if products is None:
+        products = [{"url": config.get('product_url') or config.get('url'), "target_price": config.get('target_price', 0)}]
+    
+    normalized = []
+    for product in products:
+        if not product.get('url'):
+            continue
+        selector = product.get('css_selector') or config.get('css_selector')
+        normalized.append({
+            **product,
+            "url": product['url'],
+            "name": product.get('name') or product['url'],
+            "target_price": float(product.get('target_price') or 0),
+            "selectors": [selector] if selector else DEFAULT_PRICE_SELECTORS
+        })
+    return normalized
+
+def extract_price(document, selectors: List[str]) -> Optional[float]:
+    if document is None:
+        return None
+    for selector in selectors:
+        for element in compile_selector(selector)(document):
+            price = parse_price(element.get('data-price') or element_text(element))
+            if price is not None:
+                return price
+    return None
+
+async def _fetch_price(url: str, selectors: List[str], limits, semaphore: asyncio.Semaphore) -> Tuple[Optional[float], Optional[str]]:
+    """(price, error) for one product page"""
+    await domain_limiter.ready(url)  # Outside the semaphore: a slow host must not hold a slot
+    async with semaphore:
+        await domain_limiter.wait(url)  # Token taken right before the fetch, not while queued
+        try:
+            max_bytes, deadline = limits
+            _, document = await stream_fetch(url, HtmlSink, max_bytes=max_bytes, deadline=deadline)
+            price = extract_price(document, selectors)
+            return price, None if price is not None else "price not found"
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}"
+
+def _last_prices(automation: HostedAutomation) -> Dict[str, float]:
+    """Prices recorded on the previous run ({url: price} JSON in last_result)"""
+    try:
+        prices = json.loads(automation.last_result) if automation.last_result else {}
+    except ValueError:
+        return {}
+    return prices if isinstance(prices, dict) else {}
+
+def _alert_due(price: Optional[float], target: float, previous: Optional[float]) -> bool:
+    """At/below target and either newly so or cheaper than last time (no repeat spam)"""
+    if price is None or target <= 0 or price > target:
+        return False
+    return previous is None or previous > target or price < previous
+
+async def execute_price_trackers(
+    automations: List[HostedAutomation],
+    semaphore: asyncio.Semaphore
+) -> List[Tuple[str, AutomationRun]]:
+    """Run every due price tracker of this tick as one batch
+
+    All product pages across all trackers are fetched concurrently (a URL
+    tracked twice is fetched once), then prices are extracted and compared
+    against targets in a single pass, and the rolling rules (lowest_in_days,
+    below_moving_average_pct) are evaluated for all products together.
+    Returns (user_id, run) per automation; one with an unusable config gets
+    an error run and the rest of the batch goes ahead.
+    """
+    plans = []
+    results = []
+    fetches: Dict[str, asyncio.Task] = {}
+    for automation in automations:
+        try:
+            config = json.loads(automation.config)
+            if not isinstance(config, dict):
+                raise ValueError("config must be a JSON object")
+            products = products_from_config(config)
+            limits = fetch_limits(config)
+            for product in products:
+                product['rules'] = _rules(config, product)
+        except Exception as e:
+            results.append(await _record_config_error(automation, e))
+            continue
+        for product in products:
+            key = product['url'] + "\0" + "|".join(product['selectors'])
+            if key not in fetches:
+                fetches[key] = asyncio.ensure_future(_fetch_price(product['url'], product['selectors'], limits, semaphore))
+            product['fetch_key'] = key
+        plans.append((automation, config, products))
+    
+    logger.info("💰 Price batch: %d tracker(s), %d unique product page(s)", len(automations), len(fetches))
+    await asyncio.gather(*fetches.values())
+    
+    # Persist this tick's observations into each product's time series
+    now = time.time()
+    tick_prices = {}
+    for automation, config, products in plans:
+        for product in products:
+            price, _ = fetches[product['fetch_key']].result()
+            if price is not None:
+                tick_prices[(automation.id, product['url'])] = price
+    series, appended = await append_prices(tick_prices, now)
+    
+    # One pass over every product: price, previous price, target check
+    grouped = []
+    analyzed = []
+    for automation, config, products in plans:
+        previous_prices = _last_prices(automation)
+        observations = []
+        for product in products:
+            price, error = fetches[product['fetch_key']].result()
+            previous = previous_prices.get(product['url'])
+            observation = {
+                **product,
+                "automation_id": automation.id,
+                "price": price,
+                "previous": previous,
+                "error": error,
+                "alert": _alert_due(price, product['target_price'], previous),
+                "reasons": []
+            }
+            observations.append(observation)
+            # Rolling rules only judge a fresh point; a skipped append means nothing new
+            if (automation.id, product['url']) in appended:
+                analyzed.append(observation)
+        grouped.append((automation, config, observations))
+    
+    # Rolling statistics + rule alerts for every fresh product of the tick at once
+    if analyzed:
+        stats = analyze(
+            [series[(o['automation_id'], o['url'])] for o in analyzed],
+            np.array([o['rules']['lowest_in_days'] for o in analyzed], dtype=float),
+            np.array([o['rules']['moving_average_points'] for o in analyzed], dtype=int),
+            np.array([o['rules']['below_moving_average_pct'] for o in analyzed], dtype=float),
+            now
+        )
+        for i, o in enumerate(analyzed):
+            o['moving_average'] = _finite(stats['moving_average'][i])
+            o['volatility'] = _finite(stats['volatility'][i])
+            if stats['lowest_in_days'][i]:
+                o['reasons'].append(f"lowest in {o['rules']['lowest_in_days']:g} days")
+            if stats['below_moving_average'][i]:
+                o['reasons'].append(
+                    f"{o['rules']['below_moving_average_pct']:g}% below its "
+                    f"{o['rules']['moving_average_points']}-point average"
+                )
+            o['alert'] = o['alert'] or bool(o['reasons'])
+    
+    for automation, config, observations in grouped:
+        results.append(await _record_price_run(automation, config, observations))
+    return results
+
+def _rules(config: dict, product: dict) -> dict:
+    """Rolling alert rules: product-level values override the automation's"""
+    def value(key, default):
+        return product.get(key, config.get(key, default))
+    return {
+        "lowest_in_days": float(value('lowest_in_days', 0)),
+        "below_moving_average_pct": float(value('below_moving_average_pct', 0)),
+        "moving_average_points": int(value('moving_average_points', settings.PRICE_MOVING_AVERAGE_POINTS))
+    }
+
+def _finite(value) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+async def _record_config_error(automation: HostedAutomation, error: Exception) -> Tuple[str, AutomationRun]:
+    """Error run for a tracker whose config can't be parsed or normalized"""
+    logger.error("❌ Invalid price tracker config: %s", error, extra={
+        "fields": {"automation_id": automation.id, "automation_type": "price_tracker", "user_id": automation.user_id}
+    })
+    async with AsyncSessionLocal() as db:
+        db.add(automation)
+        run = AutomationRun(
+            automation_id=automation.id,
+            status="error",
+            result=f"Invalid config: {type(error).__name__}: {error}"[:500],
+            notified=False
+        )
+        db.add(run)
+        automation.last_run = datetime.now()
+        await db.commit()
+    return automation.user_id, run
+
+async def _record_price_run(automation: HostedAutomation, config: dict, observations: List[dict]) -> Tuple[str, AutomationRun]:
+    user_id = automation.user_id
+    alerts = [o for o in observations if o['alert']]
+    prices = {o['url']: o['price'] for o in observations if o['price'] is not None}
+    
+    if not prices and observations:
+        status = "error"
+    elif alerts:
+        status = "price_alert"
+    elif any(o['price'] is not None and o['price'] != o['previous'] for o in observations):
+        status = "change_detected"
+    else:
+        status = "no_change"
+    
+    lines = []
+    for o in observations:
+        if o['price'] is None:
+            lines.append(f"{o['name']}: ✗ {o['error']}")
+        else:
+            target = f" (target ₹{o['target_price']:,.2f})" if o['target_price'] > 0 else ""
+            reasons = f" — {', '.join(o['reasons'])}" if o['reasons'] else ""
+            lines.append(f"{'🎉 ' if o['alert'] else ''}{o['name']}: ₹{o['price']:,.2f}{target}{reasons}")
+    summary = "\n".join(lines)
+    
+    async with AsyncSessionLocal() as db:
+        db.add(automation)
+        run = AutomationRun(
+            automation_id=automation.id,
+            status=status,
+            result=summary[:500],
+            notified=False
+        )
+        db.add(run)
+        automation.last_run = datetime.now()
+        if prices:
+            # Keep the last known price of products that failed this time
+            automation.last_result = json.dumps({**_last_prices(automation), **prices})
+        await db.commit()
+        
+        if alerts:
+            alert_text = "\n".join(
+                f"**{o['name']}**\nNow ₹{o['price']:,.2f} (target ₹{o['target_price']:,.2f})"
+                + (f"\n📉 {', '.join(o['reasons'])}" if o['reasons'] else "")
+                + (f"\nAvg ₹{o['moving_average']:,.2f}" if o.get('moving_average') is not None else "")
+                + f"\n{o['url']}"
+                for o in alerts
+            )
+            webhook = config.get('discord_webhook') or config.get('webhook_url')
+            notified = False
+            if webhook:
+                notified = await send_discord_notification(webhook, f"💰 Price Alert: {automation.name}", alert_text)
+            if config.get('email') and EMAIL_ENABLED:
+                notified = await asyncio.to_thread(
+                    send_email_notification,
+                    config['email'],
+                    f"💰 Price Alert: {automation.name}",
+                    alerts[0]['url'],
+                    alert_text
+                ) or notified
+            if notified:
+                run.notified = True
+                await db.commit()
+    
+    logger.info("💰 Price check: %s", status, extra={
+        "fields": {"automation_id": automation.id, "automation_type": "price_tracker", "user_id": user_id},
+        "sample": "no_change" if status == "no_change" else None
+    })
+    return user_id, run
@@ -0,0 +1,194 @@
+from datetime import datetime
+import asyncio
+import json
+import orjson
+from app.config import get_settings
+from app.models.fingerprint import AutomationFingerprint
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.scheduler.notifications import EMAIL_ENABLED, send_discord_notification, send_email_notification
+from app.utils.diff import compute_delta, summarize_delta
+from app.utils.fields import compare_fields, extract_fields, field_specs, ignored_updates
+from app.utils.fetch import BytesSink, FetchError, HtmlSink, fetch_limits, select_text, stream_fetch
+from app.utils.fingerprint import hamming_distance, simhash
+from app.utils.json_extract import canonical, extract_values, json_paths, load_canonical, summarize_changes
+from app.utils.log import get_logger
+from app.utils.snapshots import record_snapshot
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+async def _simhash_changed(automation: HostedAutomation, config: dict, previous_value, current_value: str, db) -> bool:
+    """Near-duplicate check: changed only if the SimHash moved past the threshold"""
+    fingerprint = await asyncio.to_thread(simhash, current_value)
+    stored = await db.get(AutomationFingerprint, automation.id)
+    
+    if stored is not None:
+        baseline = int(stored.simhash, 16)
+    elif previous_value:
+        # Automation just switched modes: fingerprint the last reported content once
+        baseline = await asyncio.to_thread(simhash, previous_value)
+    else:
+        baseline = None
+    
+    threshold = int(config.get('simhash_threshold', settings.SIMHASH_DEFAULT_THRESHOLD))
+    distance = hamming_distance(baseline, fingerprint) if baseline is not None else None
+    changed = distance is None or distance > threshold
+    logger.debug("SimHash distance %s (threshold %d)", distance, threshold)
+    
+    if changed:
+        # Compare future versions against what was last reported, so slow drift still adds up
+        if stored is None:
+            db.add(AutomationFingerprint(automation_id=automation.id, simhash=f"{fingerprint:016x}"))
+        else:
+            stored.simhash = f"{fingerprint:016x}"
+    return changed
+
+async def execute_website_monitor(automation: HostedAutomation, db) -> AutomationRun:
+    """Execute website monitoring automation and return the recorded run"""
+    automation_id = automation.id  # Still readable after a rollback expires the instance
+    try:
+        config = json.loads(automation.config)
+        logger.debug("🔄 Checking %s", config.get('url'))
+        
+        previous_value = automation.last_result
+        max_bytes, deadline = fetch_limits(config)
+        previous_values = None  # Named-field modes: last reported values by name
+        field_changes = None  # Named-field modes: per-field change flags
+        specs = {}  # HTML named-field mode: selector specs
+        
+        if config.get('mode') == 'json':
+            # JSON APIs: parse the body directly and compare extracted values structurally
+            fetch, body = await stream_fetch(config['url'], BytesSink, max_bytes=max_bytes, deadline=deadline)
+            if fetch.truncated:
+                raise FetchError(f"JSON response larger than {max_bytes} bytes")
+            values = extract_values(orjson.loads(body), json_paths(config))
+            current_value = canonical(values)
+            previous_values = load_canonical(previous_value)
+            if isinstance(previous_values, dict):
+                field_changes = {name: name not in previous_values or previous_values[name] != value for name, value in values.items()}
+            else:
+                field_changes = {name: True for name in values}
+            changed = previous_values != values
+        else:
+            specs = field_specs(config)
+            
+            # Fetch website: streamed into an incremental parser, capped in size and time
+            fetch, document = await stream_fetch(config['url'], HtmlSink, max_bytes=max_bytes, deadline=deadline)
+            if fetch.truncated:
+                logger.warning("⚠️  Page truncated at %d bytes", fetch.bytes_read)
+            
+            if specs:
+                # Several named regions, each with its own rule, from the one parsed document
+                values = extract_fields(document, specs)
+                current_value = canonical(values)
+                previous_values = load_canonical(previous_value)
+                field_changes = await asyncio.to_thread(compare_fields, specs, previous_values, values)
+                changed = any(field_changes.values())
+            else:
+                # Extract content
+                selector = config.get('css_selector', 'body')
+                current_value = select_text(document, selector)
+                
+                # Check if changed
+                if config.get('change_detection') == 'simhash':
+                    changed = await _simhash_changed(automation, config, previous_value, current_value, db)
+                else:
+                    changed = previous_value != current_value if previous_value else True
+        
+        change_summary = None
+        if changed:
+            # Store a compact delta (keyframes periodically) and tell users what actually changed
+            delta = await asyncio.to_thread(compute_delta, previous_value, current_value) if previous_value else None
+            await record_snapshot(db, automation.id, previous_value, current_value, delta)
+            if isinstance(previous_values, dict):
+                flagged = [name for name, flag in field_changes.items() if flag]
+                change_summary = summarize_changes(
+                    {name: previous_values[name] for name in flagged if name in previous_values},
+                    {name: values[name] for name in flagged},
+                    settings.DIFF_SUMMARY_MAX_CHARS
+                )
+            elif delta is not None:
+                change_summary = summarize_delta(previous_value, delta, settings.DIFF_SUMMARY_MAX_CHARS)
+            else:
+                change_summary = current_value[:settings.DIFF_SUMMARY_MAX_CHARS]
+        
+        # Log run
+        run = AutomationRun(
+            automation_id=automation.id,
+            status="change_detected" if changed else "no_change",
+            result=current_value[:500],
+            changed_fields=canonical(field_changes) if field_changes is not None else None,
+            notified=False
+        )
+        db.add(run)
+        
+        # Update automation
+        automation.last_run = datetime.now()
+        if changed:
+            automation.last_result = current_value
+        elif specs:
+            # Ignored fields never alert, but their latest values are still recorded. Every
+            # new last_result is also a stored version: the next change is a delta against it
+            ignored = ignored_updates(specs, previous_values, values)
+            if ignored:
+                baseline = previous_values if isinstance(previous_values, dict) else {}
+                recorded = canonical({**baseline, **ignored})
+                delta = await asyncio.to_thread(compute_delta, previous_value, recorded) if previous_value else None
+                await record_snapshot(db, automation.id, previous_value, recorded, delta)
+                automation.last_result = recorded
+        
+        await db.commit()
+        
+        # Send notifications if changed
+        notifications_sent = []
+        
+        if changed:
+            # Discord
+            if config.get('discord_webhook'):
+                success = await send_discord_notification(
+                    config['discord_webhook'],
+                    f"🔔 Change detected: {automation.name}",
+                    f"**URL:** {config['url']}\n\n**What changed:**\n{change_summary}"
+                )
+                if success:
+                    notifications_sent.append("Discord")
+            
+            # Email
+            if config.get('email'):
+                if EMAIL_ENABLED:
+                    # Resend's client is blocking
+                    success = await asyncio.to_thread(
+                        send_email_notification,
+                        config['email'],
+                        f"🔔 Change Detected: {automation.name}",
+                        config['url'],
+                        change_summary
+                    )
+                    if success:
+                        notifications_sent.append("Email")
+                        run.notified = True
+                        await db.commit()
+                else:
+                    logger.warning("⚠️  Email disabled - check RESEND_API_KEY")
+            
+            changed_names = [name for name, flag in field_changes.items() if flag] if field_changes else None
+            logger.info("🔥 Change detected", extra={"fields": {
+                "changed_fields": changed_names, "notified": notifications_sent or None
+            }})
+        else:
+            logger.info("✓ No change detected", extra={"sample": "no_change"})
+        return run
+        
+    except Exception as e:
+        logger.exception("❌ Automation execution error: %s", e)
+        
+        await db.rollback()
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="error",
+            result=str(e)[:500],
+            notified=False
+        )
+        db.add(run)
+        await db.commit()
+        return run
@@ -0,0 +1,51 @@
+from datetime import datetime
+import json
+import orjson
+from app.agents.workflow_runtime import run_workflow
+from app.models.hosted_automation import HostedAutomation, AutomationRun
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+async def execute_workflow_automation(automation: HostedAutomation, db) -> AutomationRun:
+    """Run a stored WorkflowDesign graph ({"nodes": [...], "edges": [...]} config)"""
+    automation_id = automation.id  # Still readable after a rollback expires the instance
+    try:
+        config = json.loads(automation.config)
+        report = await run_workflow(config.get('nodes') or [], config.get('edges') or [])
+        
+        cached = sum(1 for entry in report['nodes'].values() if entry['cached'])
+        logger.info("🧩 Workflow %s in %.0fms (%d/%d nodes cached, critical path %s)", report['status'], report['total_ms'],
+                    cached, len(report['nodes']), ' → '.join(report['critical_path']))
+        
+        if report['status'] == "ok":
+            result = orjson.dumps(report['outputs'], option=orjson.OPT_SORT_KEYS).decode()
+        else:
+            result = "; ".join(f"{node_id}: {entry['error']}" for node_id, entry in report['nodes'].items() if entry.get('error'))
+        
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="completed" if report['status'] == "ok" else "error",
+            result=result[:500],
+            notified=False
+        )
+        db.add(run)
+        automation.last_run = datetime.now()
+        if report['status'] == "ok":
+            automation.last_result = result
+        await db.commit()
+        return run
+        
+    except Exception as e:
+        logger.error("❌ Workflow error: %s", e)
+        
+        await db.rollback()
+        run = AutomationRun(
+            automation_id=automation_id,
+            status="error",
+            result=str(e)[:500],
+            notified=False
+        )
+        db.add(run)
+        await db.commit()
+        return run
@@ -0,0 +1,151 @@
+import math
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from app.config import get_settings
+from app.utils.log import get_logger
+from app.utils.politeness import TokenBucket
+
+logger = get_logger(__name__)
+
+class ConcurrencyPool:
+    """Counts in-flight requests of one endpoint class; full means reject, never wait"""
+
+    __slots__ = ("limit", "active")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.active >= self.limit:
+            return False
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+
+class EndpointClass:
+    """Per-client token buckets plus one shared concurrency pool
+
+    Everything runs on the event loop (admission is an async dependency),
+    so the counters need no lock.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int, concurrency: int, max_clients: int):
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.pool = ConcurrencyPool(concurrency)
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.admitted = 0
+        self.rate_limited = 0
+        self.busy = 0
+
+    def _bucket(self, client: str) -> TokenBucket:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket
+
+    def try_admit(self, client: str) -> Optional[float]:
+        """None when admitted (a pool slot is held), else seconds until a retry can succeed"""
+        if not self.pool.try_acquire():
+            self.busy += 1
+            return float(get_settings().ADMISSION_BUSY_RETRY_AFTER_SECONDS)
+        wait = self._bucket(client).try_take()
+        if wait > 0:
+            self.pool.release()
+            self.rate_limited += 1
+            return wait
+        self.admitted += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "concurrency": self.pool.limit,
+            "in_flight": self.pool.active,
+            "clients": len(self._buckets),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "busy": self.busy
+        }
+
+_classes: Dict[str, EndpointClass] = {}
+
+def endpoint_class(name: str) -> EndpointClass:
+    """Limits for one class of expensive endpoints, built from Settings on first use"""
+    limits = _classes.get(name)
+    if limits is None:
+        settings = get_settings()
+        prefix = f"ADMISSION_{name.upper()}_"
+        limits = _classes[name] = EndpointClass(
+            name,
+            getattr(settings, prefix + "PER_MINUTE"),
+            getattr(settings, prefix + "BURST"),
+            getattr(settings, prefix + "CONCURRENCY"),
+            settings.ADMISSION_MAX_CLIENTS
+        )
+    return limits
+
+def admission_stats() -> dict:
+    return {
+        "enabled": get_settings().ADMISSION_ENABLED,
+        "classes": {name: limits.stats() for name, limits in _classes.items()}
+    }
+
+def client_key(request: Request) -> str:
+    """Tenant the buckets are keyed by: the client address (every route still serves demo_user)
+
+    Behind ADMISSION_TRUSTED_PROXY_HOPS proxies (Render's load balancer is
+    one) the peer is the proxy, so the client is the X-Forwarded-For entry
+    that the outermost trusted proxy appended. Entries left of it are
+    client-supplied and are never used, so a caller can't pick its bucket.
+    """
+    hops = get_settings().ADMISSION_TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [address.strip() for address in request.headers.get("x-forwarded-for", "").split(",") if address.strip()]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+def admit(name: str):
+    """Dependency that sheds a request with 429 + Retry-After before the endpoint runs
+
+    The slot is held until the endpoint returns, so slow calls of one class
+    (LLM, table dumps, email) cannot take every worker thread.
+    """
+    endpoint_class(name)  # Fail at import time on a class without Settings
+
+    async def dependency(request: Request):
+        if not get_settings().ADMISSION_ENABLED:
+            yield
+            return
+        limits = endpoint_class(name)
+        client = client_key(request)
+        wait = limits.try_admit(client)
+        if wait is not None:
+            retry_after = max(1, math.ceil(wait))
+            logger.info("🚦 Shed %s request from %s (retry in %ds)", name, client, retry_after,
+                        extra={"sample": f"admission:{name}"})
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many {name} requests, retry in {retry_after}s",
+                headers={"Retry-After": str(retry_after)}
+            )
+        try:
+            yield
+        finally:
+            limits.pool.release()
+
+    return dependency
@@ -0,0 +1,98 @@
+import re
+from difflib import SequenceMatcher
+from typing import List, Union
+
+# Whitespace runs, words, and single punctuation marks. Every character falls
+# in exactly one class, so "".join(tokenize(text)) == text always holds.
+_TOKEN_RE = re.compile(r"\s+|\w+|[^\w\s]")
+
+# A delta is a list of ops applied left to right against the old tokens:
+#   int n > 0  -> copy the next n old tokens
+#   int n < 0  -> skip the next -n old tokens
+#   str s      -> insert literal text s
+Delta = List[Union[int, str]]
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text)
+
+def compute_delta(old: str, new: str) -> Delta:
+    """Token-level delta that rebuilds `new` from `old`"""
+    a, b = tokenize(old), tokenize(new)
+    
+    # Most page changes are local: trim the shared prefix/suffix before the
+    # (much more expensive) SequenceMatcher pass
+    prefix = 0
+    limit = min(len(a), len(b))
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[-1 - suffix] == b[-1 - suffix]:
+        suffix += 1
+    
+    delta: Delta = []
+    if prefix:
+        delta.append(prefix)
+    
+    a_mid, b_mid = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a_mid, b_mid).get_opcodes():
+        if tag == "equal":
+            _append(delta, i2 - i1)
+        else:
+            if i2 > i1:
+                _append(delta, -(i2 - i1))
+            if j2 > j1:
+                _append(delta, "".join(b_mid[j1:j2]))
+    
+    if suffix:
+        _append(delta, suffix)
+    return delta
+
+def _append(delta: Delta, op: Union[int, str]):
+    """Append an op, merging it into the previous one when they are the same kind"""
+    if delta:
+        last = delta[-1]
+        if isinstance(op, str) and isinstance(last, str):
+            delta[-1] = last + op
+            return
+        if isinstance(op, int) and isinstance(last, int) and (op > 0) == (last > 0):
+            delta[-1] = last + op
+            return
+    delta.append(op)
+
+def apply_delta(old: str, delta: Delta) -> str:
+    """Rebuild the newer text from `old` and a delta made by compute_delta"""
+    tokens = tokenize(old)
+    out = []
+    pos = 0
+    for op in delta:
+        if isinstance(op, str):
+            out.append(op)
+        elif op > 0:
+            out.extend(tokens[pos:pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+def summarize_delta(old: str, delta: Delta, max_chars: int = 1000) -> str:
+    """Human-readable removed/added lines for notifications"""
+    tokens = tokenize(old)
+    lines = []
+    pos = 0
+    for op in delta:
+        if isinstance(op, str):
+            added = " ".join(op.split())
+            if added:
+                lines.append(f"➕ {added}")
+        elif op > 0:
+            pos += op
+        else:
+            removed = " ".join("".join(tokens[pos:pos - op]).split())
+            if removed:
+                lines.append(f"➖ {removed}")
+            pos -= op
+    
+    summary = "\n".join(lines) or "(whitespace-only change)"
+    if len(summary) > max_chars:
+        summary = summary[:max_chars - 1] + "…"
+    return summary
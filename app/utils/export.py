@@ -0,0 +1,49 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Iterable, Sequence
+
+import orjson
+
+def ndjson_chunk(rows: Iterable[dict]) -> bytes:
+    """One JSON object per line"""
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+class CsvEncoder:
+    """Encodes batches of row dicts as CSV, header first"""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+        self.header_written = False
+
+    def chunk(self, rows: Iterable[dict]) -> bytes:
+        out = io.StringIO()
+        writer = csv.writer(out)
+        if not self.header_written:
+            writer.writerow(self.columns)
+            self.header_written = True
+        for row in rows:
+            writer.writerow([self._cell(row.get(column)) for column in self.columns])
+        return out.getvalue().encode()
+
+    @staticmethod
+    def _cell(value):
+        if value is None:
+            return ""
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return orjson.dumps(value).decode()
+        return value
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream incrementally (gzip container, constant memory)"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def content_type(export_format: str) -> str:
+    return "application/x-ndjson" if export_format == "ndjson" else "text/csv"  # Starlette appends the charset
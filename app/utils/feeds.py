@@ -0,0 +1,95 @@
+from typing import List, NamedTuple, Optional
+
+import httpx
+from lxml import etree
+
+# Entry elements by local name, whatever the namespace:
+# RSS <item>, Atom <entry>, sitemap <url> and sitemap-index <sitemap>
+_ENTRY_TAGS = {"item", "entry", "url", "sitemap"}
+
+class FeedEntry(NamedTuple):
+    key: str  # Stable identity used for seen-tracking (guid / id / link / loc)
+    title: str
+    link: str
+    updated: str
+
+def _local(tag) -> Optional[str]:
+    if not isinstance(tag, str):
+        return None  # Comments / processing instructions
+    return tag.rsplit("}", 1)[-1]
+
+def _children(element) -> dict:
+    """First direct child of each local name"""
+    children = {}
+    for child in element:
+        name = _local(child.tag)
+        if name and name not in children:
+            children[name] = child
+    return children
+
+def _text(element) -> str:
+    if element is None:
+        return ""
+    return "".join(element.itertext()).strip()
+
+def _entry(element) -> Optional[FeedEntry]:
+    children = _children(element)
+    link = _text(children.get("link")) or _text(children.get("loc"))
+    if not link:
+        # Atom: <link href=.../>, preferring rel="alternate" (the default)
+        hrefs = [
+            (child.get("rel", "alternate"), child.get("href"))
+            for child in element if _local(child.tag) == "link" and child.get("href")
+        ]
+        link = next((href for rel, href in hrefs if rel == "alternate"), hrefs[0][1] if hrefs else "")
+    key = _text(children.get("guid")) or _text(children.get("id")) or link
+    if not key:
+        return None
+    updated = (
+        _text(children.get("lastmod")) or _text(children.get("updated"))
+        or _text(children.get("pubDate")) or _text(children.get("published"))
+    )
+    return FeedEntry(key=key, title=_text(children.get("title")), link=link, updated=updated)
+
+class FeedSink:
+    """Pull-parse RSS/Atom/sitemap XML as chunks arrive, keeping only entries
+
+    Each entry element is reduced to a FeedEntry and cleared (along with its
+    already-processed siblings) as soon as it closes, so memory is bounded
+    by one entry rather than the whole document. Entity expansion and
+    network access are disabled.
+    """
+
+    offload = True  # stream_fetch feeds it on the parse thread
+
+    def __init__(self, response: httpx.Response = None):
+        self._parser = etree.XMLPullParser(
+            events=("end",), resolve_entities=False, no_network=True, recover=True, remove_comments=True
+        )
+        self.entries: List[FeedEntry] = []
+
+    def _drain(self):
+        for _, element in self._parser.read_events():
+            if _local(element.tag) not in _ENTRY_TAGS:
+                continue
+            entry = _entry(element)
+            if entry is not None:
+                self.entries.append(entry)
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+    def feed(self, chunk: bytes):
+        if chunk:
+            self._parser.feed(chunk)
+            self._drain()
+
+    def close(self) -> List[FeedEntry]:
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Truncated or malformed tail: keep the entries parsed so far
+        self._drain()
+        return self.entries
@@ -0,0 +1,238 @@
+import asyncio
+import codecs
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Optional, Protocol
+
+import httpx
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from app.config import get_settings
+from app.utils.politeness import domain_limiter
+
+settings = get_settings()
+
+class FetchError(Exception):
+    """The page could not be fetched within its limits (or answered with an error status)"""
+
+class FetchResult:
+    """Response metadata for a streamed fetch (the body went to a sink)"""
+
+    __slots__ = ("url", "status_code", "headers", "bytes_read", "truncated")
+
+    def __init__(self, url: str, status_code: int, headers: httpx.Headers, bytes_read: int, truncated: bool):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+
+class Sink(Protocol):
+    def feed(self, chunk: bytes) -> None: ...
+    def close(self): ...
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide client so connections and TLS sessions are reused across ticks"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"User-Agent": settings.FETCH_USER_AGENT}
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+# Bytes handed to an offloaded sink per hop onto the parse thread
+_OFFLOAD_BATCH_BYTES = 262144
+
+# libxml2 parser state is tied to the thread that uses it: hopping one parser
+# across pool threads corrupts memory, so every offloaded sink lives on this one
+_parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+
+class _ParseThreadSink:
+    """Buffers chunks for a sink that is created, fed and closed on the parse thread
+
+    A page smaller than one batch costs a single hop (create + feed + close).
+    """
+
+    def __init__(self, make_sink: Callable[[httpx.Response], Sink], response: httpx.Response):
+        self._make_sink = make_sink
+        self._response = response
+        self._sink = None
+        self._pending = []
+        self._pending_bytes = 0
+
+    def _run(self, data: bytes, close: bool):
+        if self._sink is None:
+            self._sink = self._make_sink(self._response)
+        if data:
+            self._sink.feed(data)
+        return self._sink.close() if close else None
+
+    async def _hop(self, close: bool):
+        data = b"".join(self._pending)
+        self._pending, self._pending_bytes = [], 0
+        return await asyncio.get_running_loop().run_in_executor(_parse_executor, self._run, data, close)
+
+    async def feed(self, chunk: bytes):
+        if chunk:
+            self._pending.append(chunk)
+            self._pending_bytes += len(chunk)
+            if self._pending_bytes >= _OFFLOAD_BATCH_BYTES:
+                await self._hop(close=False)
+
+    async def close(self):
+        return await self._hop(close=True)
+
+async def stream_fetch(
+    url: str,
+    make_sink: Callable[[httpx.Response], Sink],
+    max_bytes: Optional[int] = None,
+    deadline: Optional[float] = None,
+    headers: Optional[dict] = None
+):
+    """Stream a GET into a sink, stopping at max_bytes (decoded) or the deadline
+
+    Returns (FetchResult, sink.close()). The body is never held in full:
+    each chunk is handed to the sink and dropped. Oversized bodies are
+    truncated rather than rejected, so a monitor still sees the page head.
+    A 4xx/5xx status raises FetchError before any of the body is read.
+
+    Sinks marked `offload = True` (the lxml parsers) are created, fed and
+    closed on the parse thread in batches of up to _OFFLOAD_BATCH_BYTES,
+    so parsing never runs on the event loop.
+    """
+    max_bytes = max_bytes or settings.FETCH_MAX_BYTES
+    deadline = deadline or settings.FETCH_DEADLINE_SECONDS
+    offload = getattr(make_sink, "offload", False)
+    bytes_read = 0
+    truncated = False
+    
+    try:
+        async with asyncio.timeout(deadline):
+            async with get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code in (429, 503):
+                    domain_limiter.penalize(url, response.headers.get("retry-after"))
+                if response.status_code >= 400:
+                    raise FetchError(f"{url} returned HTTP {response.status_code}")
+                sink = _ParseThreadSink(make_sink, response) if offload else make_sink(response)
+                async for chunk in response.aiter_bytes(settings.FETCH_CHUNK_SIZE):
+                    remaining = max_bytes - bytes_read
+                    if len(chunk) > remaining:
+                        chunk = chunk[:remaining]
+                        truncated = True
+                    bytes_read += len(chunk)
+                    if offload:
+                        await sink.feed(chunk)
+                    else:
+                        sink.feed(chunk)
+                    if truncated:
+                        break
+                result = FetchResult(str(response.url), response.status_code, response.headers, bytes_read, truncated)
+    except TimeoutError:
+        raise FetchError(f"Fetch exceeded {deadline:g}s deadline after {bytes_read} bytes")
+    
+    return result, (await sink.close() if offload else sink.close())
+
+def fetch_limits(config: dict):
+    """Per-automation byte cap / deadline, clamped to the server-wide ceilings"""
+    max_bytes = min(int(config.get('max_bytes', settings.FETCH_MAX_BYTES)), settings.FETCH_MAX_BYTES_LIMIT)
+    deadline = min(float(config.get('timeout_seconds', settings.FETCH_DEADLINE_SECONDS)), settings.FETCH_DEADLINE_LIMIT)
+    return max_bytes, deadline
+
+class BytesSink:
+    """Collect the (already capped) body into one buffer"""
+
+    def __init__(self, response: httpx.Response = None):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes):
+        self._buffer += chunk
+
+    def close(self) -> bytes:
+        return bytes(self._buffer)
+
+# <meta charset="..."> or <meta http-equiv=... content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+
+class HtmlSink:
+    """Incrementally parse HTML with libxml2 as chunks arrive
+
+    Decoding happens inside the parser, so neither the raw body nor a decoded
+    str copy is ever materialized. Charset comes from Content-Type, then a
+    <meta> tag in the first chunk, then UTF-8 (httpx's default for .text).
+    """
+
+    offload = True  # stream_fetch feeds it on the parse thread
+
+    def __init__(self, response: httpx.Response = None):
+        self._encoding = response.charset_encoding if response is not None else None
+        self._parser = None
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        if self._parser is None:
+            encoding = self._encoding
+            if encoding is None:
+                match = _META_CHARSET_RE.search(chunk[:4096])
+                encoding = match.group(1).decode("ascii") if match else "utf-8"
+            try:
+                codecs.lookup(encoding)
+            except LookupError:
+                encoding = "utf-8"
+            self._parser = etree.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+        self._parser.feed(chunk)
+
+    def close(self):
+        if self._parser is None:
+            return None
+        try:
+            return self._parser.close()
+        except etree.XMLSyntaxError:
+            return None
+
+@lru_cache(maxsize=512)
+def compile_selector(selector: str) -> CSSSelector:
+    return CSSSelector(selector, translator="html")
+
+# Content of these elements is not page text (bs4's get_text skips it too)
+_NON_TEXT_TAGS = {"script", "style", "template", "noscript"}
+
+def element_text(element) -> str:
+    """Concatenated stripped text of an element, like bs4's get_text(strip=True)"""
+    parts = []
+    
+    def walk(node):
+        if node.tag not in _NON_TEXT_TAGS and node.text:
+            text = node.text.strip()
+            if text:
+                parts.append(text)
+        if node.tag not in _NON_TEXT_TAGS:
+            for child in node:
+                walk(child)
+                if child.tail:
+                    tail = child.tail.strip()
+                    if tail:
+                        parts.append(tail)
+    
+    walk(element)
+    return "".join(parts)
+
+def select_text(root, selector: str) -> str:
+    """Text of the first element matching a CSS selector ("" if none)"""
+    if root is None:
+        return ""
+    matches = compile_selector(selector)(root)
+    return element_text(matches[0]) if matches else ""
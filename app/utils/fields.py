@@ -0,0 +1,107 @@
+import re
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+from app.utils.fetch import compile_selector, element_text
+from app.utils.fingerprint import hamming_distance, simhash
+
+settings = get_settings()
+
+EXTRACTORS = {"text", "all", "attribute", "count"}
+CHANGE_RULES = {"any", "numeric", "simhash", "ignore"}
+
+_PRICE_RE = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+
+def parse_price(text: str) -> Optional[float]:
+    """First number in a price string ("₹1,299.00" -> 1299.0)"""
+    match = _PRICE_RE.search(text.replace(',', ''))
+    return float(match.group()) if match else None
+
+def field_specs(config: dict) -> Dict[str, dict]:
+    """Named selector specs from a website monitor config ({} if not configured)
+
+    "selectors": {
+        "title": "h1",
+        "price": {"selector": ".price", "change": "numeric", "min_change": 5},
+        "links": {"selector": "a.item", "extract": "attribute", "attribute": "href"},
+        "notes": {"selector": "#notes", "change": "simhash", "threshold": 3}
+    }
+    extract: text (first match, default) | all (every match) | attribute | count
+    change:  any (default) | numeric | simhash | ignore (tracked, never alerts)
+    """
+    specs = {}
+    for name, spec in (config.get('selectors') or {}).items():
+        if isinstance(spec, str):
+            spec = {"selector": spec}
+        if not spec.get('selector'):
+            raise ValueError(f"Field '{name}' has no selector")
+        spec = {"extract": "text", "change": "any", **spec}
+        if spec['extract'] not in EXTRACTORS:
+            raise ValueError(f"Field '{name}': unknown extract '{spec['extract']}'")
+        if spec['change'] not in CHANGE_RULES:
+            raise ValueError(f"Field '{name}': unknown change rule '{spec['change']}'")
+        if spec['extract'] == 'attribute' and not spec.get('attribute'):
+            raise ValueError(f"Field '{name}': extract 'attribute' needs an attribute name")
+        compile_selector(spec['selector'])  # Fail on bad CSS before fetching
+        specs[name] = spec
+    return specs
+
+def extract_fields(root, specs: Dict[str, dict]) -> Dict[str, Any]:
+    """Evaluate every field against one parsed document"""
+    values = {}
+    for name, spec in specs.items():
+        matches = compile_selector(spec['selector'])(root) if root is not None else []
+        extract = spec['extract']
+        if extract == 'count':
+            values[name] = len(matches)
+        elif extract == 'all':
+            values[name] = [element_text(match) for match in matches]
+        elif extract == 'attribute':
+            values[name] = matches[0].get(spec['attribute'], "") if matches else ""
+        else:
+            values[name] = element_text(matches[0]) if matches else ""
+    return values
+
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return parse_price(value)
+    return None
+
+def _field_changed(spec: dict, old: Any, new: Any) -> bool:
+    rule = spec['change']
+    if rule == 'ignore' or old == new:
+        return False
+    if rule == 'numeric':
+        before, after = _as_number(old), _as_number(new)
+        if before is None or after is None:
+            return before is not after
+        moved = abs(after - before)
+        if moved <= float(spec.get('min_change', 0)):
+            return False
+        min_pct = float(spec.get('min_change_pct', 0))
+        return not before or moved / abs(before) * 100 > min_pct
+    if rule == 'simhash':
+        threshold = int(spec.get('threshold', settings.SIMHASH_DEFAULT_THRESHOLD))
+        text_old = old if isinstance(old, str) else "\n".join(map(str, old or []))
+        text_new = new if isinstance(new, str) else "\n".join(map(str, new or []))
+        return hamming_distance(simhash(text_old), simhash(text_new)) > threshold
+    return True
+
+def compare_fields(specs: Dict[str, dict], old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, bool]:
+    """Per-field change flags; every field counts as changed on its first run, except ignored ones"""
+    if not isinstance(old, dict):
+        old = {}
+    return {
+        name: specs[name]['change'] != 'ignore' and (name not in old or _field_changed(specs[name], old[name], value))
+        for name, value in new.items()
+    }
+
+def ignored_updates(specs: Dict[str, dict], old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """New values of ignored fields that differ from the stored ones (tracked without alerting)"""
+    old = old if isinstance(old, dict) else {}
+    return {
+        name: value for name, value in new.items()
+        if specs[name]['change'] == 'ignore' and (name not in old or old[name] != value)
+    }
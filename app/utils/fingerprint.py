@@ -0,0 +1,43 @@
+import hashlib
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"\w+")
+_DIGITS_RE = re.compile(r"\d+")
+
+SIMHASH_BITS = 64
+
+def normalize(text: str) -> list:
+    """Lowercased words with every digit run collapsed to "0"
+
+    Counters, prices-in-ads and timestamps then hash identically, which is
+    most of the churn on otherwise static pages.
+    """
+    return _WORD_RE.findall(_DIGITS_RE.sub("0", text.lower()))
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles of the normalized text"""
+    words = normalize(text)
+    if len(words) <= shingle_size:
+        shingles = Counter([" ".join(words)]) if words else Counter()
+    else:
+        shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+    
+    # Per-byte histograms instead of 64 per-bit updates for every shingle
+    counts = [[0] * 256 for _ in range(SIMHASH_BITS // 8)]
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode(), digest_size=SIMHASH_BITS // 8).digest()
+        for position, byte in enumerate(digest):
+            counts[position][byte] += weight
+    
+    total = sum(shingles.values())
+    fingerprint = 0
+    for position, histogram in enumerate(counts):
+        for bit in range(8):
+            ones = sum(count for byte, count in enumerate(histogram) if byte >> bit & 1)
+            if ones * 2 > total:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
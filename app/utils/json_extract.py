@@ -0,0 +1,49 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import jmespath
+import orjson
+
+@lru_cache(maxsize=512)
+def compile_expression(expression: str):
+    """Parse a JMESPath expression once per process"""
+    return jmespath.compile(expression)
+
+def json_paths(config: dict) -> Dict[str, str]:
+    """Named JMESPath expressions from a monitor config
+
+    "json_paths": {"price": "data.price", ...}, or a single "json_path"
+    (stored under "value"); with neither, the whole document is watched.
+    """
+    if config.get('json_paths'):
+        return dict(config['json_paths'])
+    return {"value": config.get('json_path') or "@"}
+
+def extract_values(document: Any, paths: Dict[str, str]) -> Dict[str, Any]:
+    return {name: compile_expression(expression).search(document) for name, expression in paths.items()}
+
+def canonical(values: Any) -> str:
+    """Key-order independent text form (stored as last_result, diffed into snapshots)"""
+    return orjson.dumps(values, option=orjson.OPT_SORT_KEYS).decode()
+
+def load_canonical(text: Optional[str]) -> Optional[Any]:
+    if not text:
+        return None
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return None
+
+def summarize_changes(old: Optional[Dict[str, Any]], new: Dict[str, Any], max_chars: int = 1000) -> str:
+    """One "name: old → new" line per extracted value that differs"""
+    old = old if isinstance(old, dict) else {}
+    lines = []
+    for name in new.keys() | old.keys():
+        if old.get(name) != new.get(name):
+            before = canonical(old.get(name)) if name in old else "∅"
+            after = canonical(new.get(name)) if name in new else "∅"
+            lines.append(f"{name}: {before[:200]} → {after[:200]}")
+    summary = "\n".join(sorted(lines)) or "(no value changes)"
+    if len(summary) > max_chars:
+        summary = summary[:max_chars - 1] + "…"
+    return summary
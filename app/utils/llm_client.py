@@ -1,19 +1,36 @@
 import os
 import httpx
+from fastapi import HTTPException
 from app.config import get_settings
 
 settings = get_settings()
 
+class LLMNotConfigured(RuntimeError):
+    """No LLM provider key is set"""
+
+def llm_configured() -> bool:
+    return bool(settings.GROQ_API_KEY or settings.GOOGLE_API_KEY)
+
+def require_llm():
+    """Route dependency: 503 with the missing setting instead of an upstream 401 later"""
+    if not llm_configured():
+        raise HTTPException(status_code=503, detail="LLM provider not configured: set GROQ_API_KEY or GOOGLE_API_KEY")
+
 async def call_llm(prompt: str, provider="groq"):
-    """Call LLM with automatic fallback"""
+    """Call LLM with automatic fallback (only to providers that have a key)"""
+    if not llm_configured():
+        raise LLMNotConfigured("Set GROQ_API_KEY or GOOGLE_API_KEY")
     
-    if provider == "groq":
+    if provider == "groq" and settings.GROQ_API_KEY:
+        if not settings.GOOGLE_API_KEY:
+            return await call_groq(prompt)
         try:
             return await call_groq(prompt)
         except:
             return await call_google(prompt)
-    else:
-        return await call_google(prompt)
+    if not settings.GOOGLE_API_KEY:
+        return await call_groq(prompt)
+    return await call_google(prompt)
 
 async def call_groq(prompt: str):
     """Direct Groq API call"""
@@ -0,0 +1,213 @@
+import atexit
+import logging
+import logging.handlers
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+import orjson
+
+from app.config import get_settings
+
+# Fields attached to every record logged from the current task, e.g. the
+# automation a scheduler run is executing. Each run is its own asyncio task,
+# so concurrent runs never see each other's fields.
+_log_context: ContextVar[Dict[str, object]] = ContextVar("log_context", default={})
+
+@contextmanager
+def log_context(**fields):
+    """Add fields to every record logged inside the block"""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+class ContextFilter(logging.Filter):
+    """Copies the caller's context fields onto the record before it is queued"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        extra = getattr(record, "fields", None)
+        record.fields = {**context, **extra} if extra else context
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in `every` records logged with extra={"sample": key}
+
+    Kept records carry the rate ("sampled_1_in") so totals stay
+    recoverable. Sampling is per key; records without a key always pass.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.every == 1:
+            return True
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.fields = {**record.fields, "sampled_1_in": self.every}
+        return True
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full
+
+    Records are handed to the writer thread as objects (same process), so
+    only the message is rendered here; exception formatting happens on the
+    writer.
+    """
+
+    def __init__(self, records: deque, max_records: int):
+        super().__init__(records)
+        self.max_records = max_records
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if len(self.queue) >= self.max_records:
+            self.dropped += 1
+            return
+        self.queue.append(record)
+
+class LogWriter(threading.Thread):
+    """Background thread that formats and writes queued records in batches
+
+    It wakes every flush_interval rather than per record: a thread woken for
+    every log call keeps taking the GIL from the event loop under load.
+
+    Lines go to whatever sys.stdout is at flush time (test runners and
+    reloaders swap it). A failed write is counted and the batch discarded;
+    the thread keeps running so the queue keeps draining.
+    """
+
+    def __init__(self, records: deque, handler: logging.Handler, flush_interval: float):
+        super().__init__(name="log-writer", daemon=True)
+        self.records = records
+        self.handler = handler
+        self.flush_interval = flush_interval
+        self.failed_writes = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        lines = []
+        while True:
+            try:
+                record = self.records.popleft()
+            except IndexError:
+                break
+            if record.levelno < self.handler.level:
+                continue
+            try:
+                lines.append(self.handler.format(record))
+            except Exception:
+                self.handler.handleError(record)
+        if lines:
+            try:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            except (OSError, ValueError):  # ValueError: stdout was closed
+                self.failed_writes += len(lines)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.msg
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+class TextFormatter(logging.Formatter):
+    """Human-readable line with context fields appended as key=value"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(message)s", datefmt="%H:%M:%S")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            context = " ".join(f"{key}={value}" for key, value in fields.items())
+            first, newline, rest = line.partition("\n")
+            line = f"{first}  [{context}]{newline}{rest}"
+        return line
+
+_writer: Optional[LogWriter] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+_configure_lock = threading.Lock()
+
+def configure_logging():
+    """Route the "app" logger through a queue to a background writer thread (idempotent)"""
+    global _writer, _handler
+    with _configure_lock:
+        if _writer is not None:
+            return
+        settings = get_settings()
+        records = deque()
+        _handler = NonBlockingQueueHandler(records, settings.LOG_QUEUE_SIZE)
+        _handler.addFilter(ContextFilter())
+        _handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_EVERY))
+
+        output = logging.Handler()  # Formatter and level only: the writer does the output
+        output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+        _writer = LogWriter(records, output, settings.LOG_FLUSH_INTERVAL_SECONDS)
+        _writer.start()
+
+        root = logging.getLogger("app")
+        root.setLevel(settings.LOG_LEVEL.upper())
+        root.addHandler(_handler)
+        root.propagate = False
+        atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _writer, _handler
+    with _configure_lock:
+        if _writer is None:
+            return
+        logging.getLogger("app").removeHandler(_handler)
+        _writer.stop()
+        try:
+            if _handler.dropped:
+                sys.stdout.write(f"{_handler.dropped} log record(s) dropped (queue full)\n")
+            if _writer.failed_writes:
+                sys.stdout.write(f"{_writer.failed_writes} log record(s) lost (stdout write failed)\n")
+        except (OSError, ValueError):
+            pass
+        _writer = _handler = None
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the "app" hierarchy; configures the writer on first use"""
+    configure_logging()
+    return logging.getLogger(name if name.startswith("app") else f"app.{name}")
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from app.config import get_settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Allocations made by the instrumentation itself
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+)
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size (Linux), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class MemoryMonitor:
+    """Opt-in tracemalloc instrumentation for the long-running scheduler
+
+    Every scheduler tick closes a window: traced memory growth and peak since
+    the previous tick, net allocated blocks and RSS go into a bounded
+    history, and a window whose peak exceeds MEMORY_TICK_BUDGET_MB logs a
+    warning. Snapshots are taken every MEMORY_SNAPSHOT_INTERVAL_SECONDS; the
+    first is kept as a baseline so slow leaks show up against it, the last
+    one to spot what grew recently.
+    """
+
+    def __init__(self, history_size: int):
+        self.history = deque(maxlen=history_size)
+        self.budget_exceeded = 0
+        self._lock = threading.Lock()
+        self._tick_started: Optional[float] = None
+        self._tick_traced = 0
+        self._tick_blocks = 0
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._latest: Optional[tracemalloc.Snapshot] = None
+        self._latest_at: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        settings = get_settings()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.MEMORY_TRACE_FRAMES)
+        logger.info("🧠 Memory profiling on (%d frame(s) per allocation)", settings.MEMORY_TRACE_FRAMES)
+        self.take_snapshot()
+        self._begin_tick()
+
+    def stop(self):
+        if not tracemalloc.is_tracing():
+            return
+        tracemalloc.stop()
+        with self._lock:
+            self._baseline = self._previous = self._latest = None
+            self._latest_at = self._tick_started = None
+
+    def _begin_tick(self):
+        self._tick_started = time.time()
+        self._tick_traced = tracemalloc.get_traced_memory()[0]
+        self._tick_blocks = sys.getallocatedblocks()
+        tracemalloc.reset_peak()
+
+    def on_tick(self):
+        """Close the window that started at the previous tick and open the next"""
+        if not tracemalloc.is_tracing():
+            return
+        settings = get_settings()
+        if self._tick_started is not None:
+            current, peak = tracemalloc.get_traced_memory()
+            entry = {
+                "started_at": datetime.fromtimestamp(self._tick_started).isoformat(),
+                "duration_s": round(time.time() - self._tick_started, 3),
+                "traced_mb": round(current / 2**20, 3),
+                "growth_mb": round((current - self._tick_traced) / 2**20, 3),
+                "peak_mb": round((peak - self._tick_traced) / 2**20, 3),
+                "net_blocks": sys.getallocatedblocks() - self._tick_blocks,
+                "rss_mb": rss_mb()
+            }
+            with self._lock:
+                self.history.append(entry)
+            budget = settings.MEMORY_TICK_BUDGET_MB
+            if budget and entry["peak_mb"] > budget:
+                self.budget_exceeded += 1
+                logger.warning("⚠️  Tick memory budget exceeded: peak %.1f MB > %g MB (growth %+.1f MB, %+d blocks)",
+                               entry['peak_mb'], budget, entry['growth_mb'], entry['net_blocks'])
+
+        if self._latest_at is None or time.time() - self._latest_at >= settings.MEMORY_SNAPSHOT_INTERVAL_SECONDS:
+            self.take_snapshot()
+        self._begin_tick()
+
+    def take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = snapshot
+            self._previous, self._latest = self._latest, snapshot
+            self._latest_at = time.time()
+
+    def top_growth(self, against: str = "previous", group_by: str = "lineno", limit: int = 20) -> List[dict]:
+        """Allocation sites that grew the most between two snapshots"""
+        with self._lock:
+            old = self._baseline if against == "baseline" else self._previous
+            new = self._latest
+        if old is None or new is None or old is new:
+            return []
+        stats = new.compare_to(old, group_by)
+        sites = []
+        for stat in stats:
+            if stat.size_diff <= 0:
+                break  # compare_to sorts by size_diff, largest first
+            sites.append({
+                "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_kb": round(stat.size / 1024, 1),
+                "growth_kb": round(stat.size_diff / 1024, 1),
+                "count": stat.count,
+                "count_growth": stat.count_diff
+            })
+            if len(sites) >= limit:
+                break
+        return sites
+
+    def report(self, against: str = "previous", group_by: str = "lineno", limit: int = 20, ticks: int = 20) -> dict:
+        if not tracemalloc.is_tracing():
+            return {"enabled": False, "rss_mb": rss_mb()}
+        current, peak = tracemalloc.get_traced_memory()
+        ticks = min(ticks, get_settings().MEMORY_TICK_HISTORY)
+        with self._lock:
+            history = list(self.history)[-ticks:][::-1] if ticks > 0 else []
+            latest_at = self._latest_at
+        return {
+            "enabled": True,
+            "traced_mb": round(current / 2**20, 3),
+            "tick_peak_mb": round((peak - self._tick_traced) / 2**20, 3),
+            "tracemalloc_overhead_mb": round(tracemalloc.get_tracemalloc_memory() / 2**20, 3),
+            "rss_mb": rss_mb(),
+            "tick_budget_mb": get_settings().MEMORY_TICK_BUDGET_MB,
+            "budget_exceeded": self.budget_exceeded,
+            "last_snapshot": datetime.fromtimestamp(latest_at).isoformat() if latest_at else None,
+            "compared_against": against,
+            "top_growth": self.top_growth(against, group_by, limit),
+            "ticks": history
+        }
+
+memory_monitor = MemoryMonitor(get_settings().MEMORY_TICK_HISTORY)
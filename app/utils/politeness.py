@@ -0,0 +1,204 @@
+import asyncio
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from app.config import get_settings
+from app.utils.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking
+
+    reserve() always takes a token and returns how long to wait before
+    using it; the balance may go negative, which queues later callers
+    behind earlier ones without a lock.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def available_in(self) -> float:
+        """Seconds until a token is free, without taking or reserving one"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def try_take(self) -> float:
+        """Take a token only if one is available; otherwise return the wait without queuing"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def penalize(self, seconds: float):
+        """Hold back the next token for at least `seconds` (Retry-After)"""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+def _host_key(url: str) -> Optional[Tuple[str, str]]:
+    """(bucket key, robots.txt URL) for an http(s) URL"""
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    netloc = f"{host}:{port}" if port else host
+    return netloc, f"{parts.scheme}://{netloc}/robots.txt"
+
+def target_url(config_json: str) -> Optional[str]:
+    """The page an automation config fetches, if any"""
+    try:
+        config = json.loads(config_json)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(config, dict):
+        return None
+    return config.get('url') or config.get('feed_url') or config.get('product_url') or config.get('data_source')
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class DomainLimiter:
+    """Per-host token buckets, slowed further by robots.txt Crawl-delay"""
+
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._robots: Dict[str, Tuple[float, Optional[float]]] = {}  # host -> (expires, crawl delay)
+        self._robots_pending: Dict[str, asyncio.Task] = {}
+
+    async def _fetch_crawl_delay(self, robots_url: str) -> Optional[float]:
+        from app.utils.fetch import BytesSink, stream_fetch  # fetch reports 429s back here
+        try:
+            fetch, body = await stream_fetch(robots_url, BytesSink, max_bytes=512_000, deadline=5.0)
+        except Exception:
+            return None
+        if fetch.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(body.decode("utf-8", errors="replace").splitlines())
+        delay = parser.crawl_delay(settings.ROBOTS_USER_AGENT)
+        rate = parser.request_rate(settings.ROBOTS_USER_AGENT)
+        if rate is not None and rate.requests:
+            delay = max(float(delay or 0), rate.seconds / rate.requests)
+        if not delay:
+            return None
+        return min(float(delay), settings.ROBOTS_MAX_CRAWL_DELAY)
+
+    async def _crawl_delay(self, host: str, robots_url: str) -> Optional[float]:
+        cached = self._robots.get(host)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        # One robots.txt request per host, however many automations are waiting on it
+        task = self._robots_pending.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_crawl_delay(robots_url))
+            self._robots_pending[host] = task
+            task.add_done_callback(lambda _: self._robots_pending.pop(host, None))
+        delay = await asyncio.shield(task)
+        self._robots[host] = (time.monotonic() + settings.ROBOTS_CACHE_SECONDS, delay)
+        return delay
+
+    def _bucket(self, host: str, crawl_delay: Optional[float]) -> TokenBucket:
+        rate = settings.DOMAIN_RATE_PER_SECOND
+        burst = settings.DOMAIN_BURST
+        if crawl_delay:
+            rate = min(rate, 1.0 / crawl_delay)
+            burst = 1
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        else:
+            bucket.rate, bucket.burst = rate, burst  # robots.txt may have changed
+        return bucket
+
+    async def _host_bucket(self, url: Optional[str]) -> Optional[TokenBucket]:
+        if not settings.POLITENESS_ENABLED or not url:
+            return None
+        key = _host_key(url)
+        if key is None:
+            return None
+        host, robots_url = key
+        crawl_delay = await self._crawl_delay(host, robots_url) if settings.ROBOTS_RESPECT_CRAWL_DELAY else None
+        return self._bucket(host, crawl_delay)
+
+    async def ready(self, url: Optional[str]) -> float:
+        """Sleep until this host has a token free, without taking it; returns the seconds waited
+
+        For waiting outside a concurrency slot: the token itself is taken
+        with wait() once the slot is held, right before the fetch, so runs
+        queued on busy slots can't all spend tokens early and then hit the
+        host together.
+        """
+        bucket = await self._host_bucket(url)
+        if bucket is None:
+            return 0.0
+        delay = bucket.available_in()
+        if delay > 0:
+            delay += random.uniform(0, settings.DOMAIN_JITTER / bucket.rate)
+            await asyncio.sleep(delay)
+        return delay
+
+    async def wait(self, url: Optional[str]) -> float:
+        """Take a token for this host, sleeping until it may be fetched; returns the seconds waited"""
+        bucket = await self._host_bucket(url)
+        if bucket is None:
+            return 0.0
+        delay = bucket.reserve()
+        if delay > 0:
+            # Jitter keeps queued requests for one host from lining up on exact token boundaries
+            delay += random.uniform(0, settings.DOMAIN_JITTER / bucket.rate)
+            await asyncio.sleep(delay)
+        return delay
+
+    def penalize(self, url: str, retry_after: Optional[str]):
+        """Back off a host that answered 429/503"""
+        key = _host_key(url)
+        if key is None:
+            return
+        seconds = parse_retry_after(retry_after)
+        if seconds is None:
+            seconds = 1.0 / settings.DOMAIN_RATE_PER_SECOND * 10
+        seconds = min(seconds, settings.DOMAIN_MAX_BACKOFF_SECONDS)
+        bucket = self._buckets.get(key[0])
+        if bucket is None:
+            bucket = self._buckets[key[0]] = TokenBucket(settings.DOMAIN_RATE_PER_SECOND, settings.DOMAIN_BURST)
+        bucket.penalize(seconds)
+        logger.warning("🐢 %s asked us to slow down: backing off %gs", key[0], seconds)
+
+domain_limiter = DomainLimiter()
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.config import get_settings
+from app.utils.timing import phase
+
+# Headers that belong to one concrete response, not to the cached payload
+_HOP_HEADERS = {"content-length", "content-type"}
+
+class CachedResponse:
+    """Serialized JSON body plus the headers needed to replay it"""
+
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, body: bytes, headers: Dict[str, str]):
+        self.body = body
+        self.etag = make_etag(body)
+        self.headers = headers
+
+class ResponseCache:
+    """In-process LRU of serialized responses with tag-based invalidation
+
+    Entries are tagged (e.g. "user:demo_user", "automation:7") so writers can
+    drop everything derived from the rows they touched. The TTL is only a
+    safety net for writes this process never sees.
+
+    Every invalidation bumps a per-tag generation; set() drops an entry
+    built before one of its tags was invalidated, so a response computed
+    while a write landed is never stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, Tuple[float, CachedResponse, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # Bumped by clear()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry, _ = item
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def generation(self, tags: Iterable[str]) -> tuple:
+        """Snapshot to take before building an entry and pass to set()"""
+        with self._lock:
+            return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def set(self, key: tuple, entry: CachedResponse, tags: Iterable[str], generation: Optional[tuple] = None):
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != (self._epoch, *(self._generations.get(tag, 0) for tag in tags)):
+                return  # Invalidated while the entry was being built
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def _remove(self, key: tuple):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+_settings = get_settings()
+response_cache = ResponseCache(_settings.RESPONSE_CACHE_MAX_ENTRIES, _settings.RESPONSE_CACHE_TTL_SECONDS)
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (RFC 9110 weak comparison, as required for GET)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+async def cached_json(
+    request: Request,
+    scope: str,
+    tags: Iterable[str],
+    build: Callable[[], Awaitable[Response]]
+) -> Response:
+    """Read-through cache for a JSON endpoint, keyed per scope and query string
+
+    `build` runs only on a miss; when the client already holds the current
+    ETag the reply is a bodiless 304.
+    """
+    key = (scope, request.url.path, tuple(sorted(request.query_params.multi_items())))
+    
+    with phase("cache"):
+        entry = response_cache.get(key) if _settings.RESPONSE_CACHE_ENABLED else None
+    status = "HIT" if entry else "MISS"
+    
+    if entry is None:
+        tags = tuple(tags)
+        generation = response_cache.generation(tags)
+        response = await build()
+        if response.status_code != 200:
+            return response
+        entry = CachedResponse(
+            bytes(response.body),
+            {k: v for k, v in response.headers.items() if k not in _HOP_HEADERS}
+        )
+        if _settings.RESPONSE_CACHE_ENABLED:
+            response_cache.set(key, entry, tags, generation)
+    
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Cache-Control": "private, no-cache",
+        "X-Cache": status
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
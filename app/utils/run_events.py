@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+import orjson
+
+from app.config import get_settings
+
+class RunEvent:
+    """A committed AutomationRun, pre-serialized once for every subscriber"""
+
+    __slots__ = ("id", "user_id", "automation_id", "data")
+
+    def __init__(self, run_id: int, user_id: str, automation_id: int, payload: dict):
+        self.id = run_id
+        self.user_id = user_id
+        self.automation_id = automation_id
+        self.data = orjson.dumps(payload)
+
+    def encode(self) -> bytes:
+        """SSE frame; the run id doubles as the Last-Event-ID resume token"""
+        return b"id: %d\nevent: run\ndata: %s\n\n" % (self.id, self.data)
+
+class Subscription:
+    """One stream's bounded buffer of pending events"""
+
+    def __init__(self, user_id: str, automation_id: Optional[int], buffer_size: int):
+        self.user_id = user_id
+        self.automation_id = automation_id
+        self.queue: "asyncio.Queue[RunEvent]" = asyncio.Queue(maxsize=buffer_size)
+        # Set when the buffer overflowed; the stream closes so the client
+        # reconnects with Last-Event-ID and replays what it missed
+        self.lagged = False
+
+    def matches(self, event: RunEvent) -> bool:
+        if event.user_id != self.user_id:
+            return False
+        return self.automation_id is None or event.automation_id == self.automation_id
+
+class RunEventBroker:
+    """In-process pub/sub for new AutomationRun rows
+
+    publish() never blocks the scheduler: a subscriber that cannot keep up is
+    marked lagged instead of growing its buffer. Must be used from the event
+    loop thread (the scheduler and routes both run there).
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+
+    def subscribe(self, user_id: str, automation_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(user_id, automation_id, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: RunEvent):
+        for subscription in self._subscribers:
+            if subscription.lagged or not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.lagged = True
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+run_events = RunEventBroker(get_settings().RUN_EVENT_BUFFER_SIZE)
+
+def run_payload(run) -> Dict:
+    """Shape shared by GET /{id}/runs and the run event stream"""
+    return {
+        "id": run.id,
+        "automation_id": run.automation_id,
+        "status": run.status,
+        "result": run.result,
+        "changed_fields": orjson.loads(run.changed_fields) if run.changed_fields else None,
+        "notified": run.notified,
+        "executed_at": run.executed_at
+    }
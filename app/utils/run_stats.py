@@ -0,0 +1,215 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.hosted_automation import AutomationRun, HostedAutomation
+from app.models.run_stats import AutomationRunDaily, RunStatsWatermark
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+ERROR_STATUSES = ("error",)
+CHANGE_STATUSES = ("change_detected", "price_alert")
+
+_WATERMARK = "automation_run_daily"
+
+_is_error = AutomationRun.status.in_(ERROR_STATUSES)
+_is_change = AutomationRun.status.in_(CHANGE_STATUSES)
+
+def _aggregate_columns():
+    """Counts and time bounds per group; every one of them merges across groups"""
+    return (
+        func.count().label("runs"),
+        func.coalesce(func.sum(case((_is_error, 1), else_=0)), 0).label("errors"),
+        func.coalesce(func.sum(case((_is_change, 1), else_=0)), 0).label("changes"),
+        func.min(AutomationRun.executed_at).label("first_run_at"),
+        func.max(AutomationRun.executed_at).label("last_run_at"),
+        func.min(case((_is_change, AutomationRun.executed_at))).label("first_change_at"),
+        func.max(case((_is_change, AutomationRun.executed_at))).label("last_change_at")
+    )
+
+_MIN_FIELDS = ("first_run_at", "first_change_at")
+_MAX_FIELDS = ("last_run_at", "last_change_at")
+
+def _empty() -> dict:
+    return {"runs": 0, "errors": 0, "changes": 0, **{key: None for key in _MIN_FIELDS + _MAX_FIELDS}}
+
+def _fold(totals: dict, values) -> dict:
+    """Merge one aggregate (raw group, daily summary or another total) into totals"""
+    for key in ("runs", "errors", "changes"):
+        totals[key] += values[key] or 0
+    for keys, pick in ((_MIN_FIELDS, min), (_MAX_FIELDS, max)):
+        for key in keys:
+            value = values[key]
+            if value is not None:
+                totals[key] = value if totals[key] is None else pick(totals[key], value)
+    return totals
+
+def _utcnow() -> datetime:
+    """Naive UTC, like executed_at (server_default=func.now() is UTC on SQLite and on Render's Postgres)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+async def _watermark(db) -> int:
+    state = await db.get(RunStatsWatermark, _WATERMARK)
+    return state.last_run_id if state else 0
+
+async def rollup_run_stats() -> int:
+    """Fold runs recorded since the last rollup into the daily summary rows
+
+    Only runs older than STATS_ROLLUP_LAG_SECONDS are folded, so a run whose
+    transaction is still open when a higher id commits is not skipped. Runs
+    of automations that no longer exist are left out.
+    Returns the number of runs folded.
+    """
+    settings = get_settings()
+    cutoff = _utcnow() - timedelta(seconds=settings.STATS_ROLLUP_LAG_SECONDS)
+    async with AsyncSessionLocal() as db:
+        state = await db.get(RunStatsWatermark, _WATERMARK)
+        if state is None:
+            state = RunStatsWatermark(name=_WATERMARK, last_run_id=0)
+            db.add(state)
+
+        day = func.date(AutomationRun.executed_at)
+        result = await db.execute(
+            select(AutomationRun.automation_id, day.label("day"), func.max(AutomationRun.id).label("max_id"), *_aggregate_columns())
+            # Runs of deleted automations must not recreate their summary rows
+            .join(HostedAutomation, HostedAutomation.id == AutomationRun.automation_id)
+            .where(AutomationRun.id > state.last_run_id, AutomationRun.executed_at < cutoff)
+            .group_by(AutomationRun.automation_id, day)
+        )
+        groups = result.all()
+        if not groups:
+            await db.commit()
+            return 0
+
+        keys = {(row.automation_id, str(row.day)) for row in groups}
+        existing = {
+            (row.automation_id, row.day): row
+            for row in (await db.execute(
+                select(AutomationRunDaily).where(AutomationRunDaily.automation_id.in_({key[0] for key in keys}))
+                .where(AutomationRunDaily.day.in_({key[1] for key in keys}))
+            )).scalars().all()
+        }
+        for row in groups:
+            key = (row.automation_id, str(row.day))
+            summary = existing.get(key)
+            if summary is None:
+                db.add(AutomationRunDaily(
+                    automation_id=key[0], day=key[1], runs=row.runs, errors=row.errors, changes=row.changes,
+                    first_run_at=row.first_run_at, last_run_at=row.last_run_at,
+                    first_change_at=row.first_change_at, last_change_at=row.last_change_at
+                ))
+                continue
+            merged = _fold(_fold(_empty(), {key: getattr(summary, key) for key in _empty()}), row._mapping)
+            for column, value in merged.items():
+                setattr(summary, column, value)
+
+        folded = sum(row.runs for row in groups)
+        state.last_run_id = max(row.max_id for row in groups)
+        await db.commit()
+    logger.debug("📈 Rolled up %d run(s) into %d daily row(s)", folded, len(groups))
+    return folded
+
+def _rates(totals: dict, period_seconds: float) -> dict:
+    runs, errors, changes = totals["runs"], totals["errors"], totals["changes"]
+    first_change, last_change = totals["first_change_at"], totals["last_change_at"]
+    mtbc = None
+    if changes > 1 and first_change and last_change:
+        mtbc = (last_change - first_change).total_seconds() / (changes - 1)
+    return {
+        **totals,
+        "error_rate": errors / runs if runs else None,
+        "uptime": (runs - errors) / runs if runs else None,
+        "change_rate": changes / runs if runs else None,
+        "changes_per_day": changes / (period_seconds / 86400) if period_seconds > 0 else None,
+        "mean_time_between_changes_s": mtbc
+    }
+
+async def fleet_stats(db, user_id: str, days: Optional[int] = None, automation_id: Optional[int] = None,
+                      use_summary: bool = True) -> dict:
+    """Uptime, error rate, change frequency and MTBC per automation and fleet-wide
+
+    With use_summary the daily rollup rows are read and only runs newer than
+    the rollup watermark are aggregated from automation_runs (an id range
+    scan). Windows (days) are then aligned to whole days. Without it, one
+    grouped query over the covering (automation_id, status, executed_at)
+    index computes everything from the raw runs.
+    """
+    started = time.perf_counter()
+    now = _utcnow()
+    since = now - timedelta(days=days) if days else None
+
+    automations_stmt = select(
+        HostedAutomation.id, HostedAutomation.name, HostedAutomation.automation_type, HostedAutomation.is_active
+    ).where(HostedAutomation.user_id == user_id)
+    if automation_id is not None:
+        automations_stmt = automations_stmt.where(HostedAutomation.id == automation_id)
+    automations = {row.id: row for row in (await db.execute(automations_stmt)).all()}
+    ids = list(automations)
+
+    totals: Dict[int, dict] = {}
+    raw = select(AutomationRun.automation_id, *_aggregate_columns()).where(AutomationRun.automation_id.in_(ids))
+    if use_summary and ids:
+        watermark = await _watermark(db)
+        summary = select(
+            AutomationRunDaily.automation_id,
+            func.sum(AutomationRunDaily.runs).label("runs"),
+            func.sum(AutomationRunDaily.errors).label("errors"),
+            func.sum(AutomationRunDaily.changes).label("changes"),
+            func.min(AutomationRunDaily.first_run_at).label("first_run_at"),
+            func.max(AutomationRunDaily.last_run_at).label("last_run_at"),
+            func.min(AutomationRunDaily.first_change_at).label("first_change_at"),
+            func.max(AutomationRunDaily.last_change_at).label("last_change_at")
+        ).where(AutomationRunDaily.automation_id.in_(ids)).group_by(AutomationRunDaily.automation_id)
+        if since:
+            summary = summary.where(AutomationRunDaily.day >= since.strftime("%Y-%m-%d"))
+        for row in (await db.execute(summary)).all():
+            _fold(totals.setdefault(row.automation_id, _empty()), row._mapping)
+        # Tail: a primary-key range scan over runs not rolled up yet (filtering it by
+        # automation_id would make the planner walk each automation's whole index range)
+        raw = select(AutomationRun.automation_id, *_aggregate_columns()).where(AutomationRun.id > watermark)
+    if since:
+        raw = raw.where(AutomationRun.executed_at >= since)
+
+    if ids:
+        for row in (await db.execute(raw.group_by(AutomationRun.automation_id))).all():
+            if row.automation_id in automations:
+                _fold(totals.setdefault(row.automation_id, _empty()), row._mapping)
+
+    per_automation: List[dict] = []
+    fleet = _empty()
+    change_intervals = 0.0
+    change_gaps = 0
+    for id_, automation in automations.items():
+        stats = totals.get(id_) or _empty()
+        period = (now - (since or stats["first_run_at"] or now)).total_seconds()
+        per_automation.append({
+            "automation_id": id_,
+            "name": automation.name,
+            "automation_type": automation.automation_type,
+            "is_active": automation.is_active,
+            **_rates(stats, period)
+        })
+        _fold(fleet, stats)
+        if stats["changes"] > 1 and stats["first_change_at"] and stats["last_change_at"]:
+            change_intervals += (stats["last_change_at"] - stats["first_change_at"]).total_seconds()
+            change_gaps += stats["changes"] - 1
+
+    fleet_period = (now - (since or fleet["first_run_at"] or now)).total_seconds()
+    fleet_totals = _rates(fleet, fleet_period)
+    # Fleet MTBC: gaps between consecutive changes of the same automation, pooled
+    fleet_totals["mean_time_between_changes_s"] = change_intervals / change_gaps if change_gaps else None
+    fleet_totals["automations"] = len(automations)
+    fleet_totals["active_automations"] = sum(1 for automation in automations.values() if automation.is_active)
+
+    return {
+        "window_days": days,
+        "source": "summary" if use_summary else "raw",
+        "computed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "fleet": fleet_totals,
+        "automations": per_automation
+    }
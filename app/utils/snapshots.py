@@ -0,0 +1,90 @@
+import zlib
+from typing import Optional
+
+import orjson
+from sqlalchemy import case, func, select
+
+from app.config import get_settings
+from app.models.snapshot import AutomationSnapshot
+from app.utils.diff import Delta, apply_delta
+
+settings = get_settings()
+
+def _pack(value) -> bytes:
+    return zlib.compress(orjson.dumps(value), 6)
+
+def _unpack(payload: bytes):
+    return orjson.loads(zlib.decompress(payload))
+
+async def record_snapshot(
+    db,
+    automation_id: int,
+    previous_text: Optional[str],
+    current_text: str,
+    delta: Optional[Delta]
+) -> AutomationSnapshot:
+    """Store the next version as a delta, or as a keyframe when one is due
+
+    `previous_text` must be the content of the latest stored version (it is
+    the automation's last_result). Added to the session, not committed.
+    """
+    latest, latest_keyframe = (await db.execute(
+        select(
+            func.max(AutomationSnapshot.version),
+            func.max(case((AutomationSnapshot.is_keyframe == True, AutomationSnapshot.version)))
+        ).where(AutomationSnapshot.automation_id == automation_id)
+    )).one()
+    
+    version = (latest or 0) + 1
+    keyframe_due = (
+        latest is None
+        or previous_text is None
+        or delta is None
+        or version - (latest_keyframe or 0) >= settings.SNAPSHOT_KEYFRAME_INTERVAL
+    )
+    
+    payload = _pack(current_text) if keyframe_due else _pack(delta)
+    if not keyframe_due:
+        # A rewrite-everything change is cheaper to store as a keyframe
+        keyframe = _pack(current_text)
+        if len(keyframe) <= len(payload):
+            payload, keyframe_due = keyframe, True
+    
+    snapshot = AutomationSnapshot(
+        automation_id=automation_id,
+        version=version,
+        is_keyframe=keyframe_due,
+        payload=payload
+    )
+    db.add(snapshot)
+    return snapshot
+
+async def reconstruct_version(db, automation_id: int, version: int) -> Optional[str]:
+    """Rebuild a historical version from its nearest keyframe plus deltas"""
+    keyframe_version = await db.scalar(
+        select(func.max(AutomationSnapshot.version)).where(
+            AutomationSnapshot.automation_id == automation_id,
+            AutomationSnapshot.is_keyframe == True,
+            AutomationSnapshot.version <= version
+        )
+    )
+    if keyframe_version is None:
+        return None
+    
+    result = await db.execute(
+        select(AutomationSnapshot.version, AutomationSnapshot.is_keyframe, AutomationSnapshot.payload)
+        .where(
+            AutomationSnapshot.automation_id == automation_id,
+            AutomationSnapshot.version >= keyframe_version,
+            AutomationSnapshot.version <= version
+        )
+        .order_by(AutomationSnapshot.version)
+    )
+    rows = result.all()
+    if not rows or rows[-1].version != version:
+        return None
+    
+    text = _unpack(rows[0].payload)
+    for row in rows[1:]:
+        text = _unpack(row.payload) if row.is_keyframe else apply_delta(text, _unpack(row.payload))
+    return text
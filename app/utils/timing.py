@@ -0,0 +1,145 @@
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import get_settings
+
+class RequestTimings:
+    """Phase durations (ms) collected while serving one request"""
+
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, duration_ms: float):
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def header_value(self, total_ms: float) -> str:
+        parts = [f"{name};dur={duration:.2f}" for name, duration in self.phases.items()]
+        parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+# The middleware stores a mutable RequestTimings here; route code running in a
+# copied context (threadpool, tasks) still mutates the same object.
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+@contextmanager
+def phase(name: str):
+    """Time a block and attribute it to the current request's Server-Timing"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - start) * 1000)
+
+class SlowRequestLog:
+    """Bounded ring buffer of the most recent slow requests"""
+
+    def __init__(self, maxlen: int):
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, entry: dict):
+        with self._lock:
+            self._entries.append(entry)
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        with self._lock:
+            entries = list(self._entries)
+        return entries[::-1][:limit]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+slow_requests = SlowRequestLog(get_settings().SLOW_REQUEST_BUFFER_SIZE)
+
+# cProfile can only observe one request at a time; concurrent requests on the
+# event loop still show up in a sampled profile, so treat it as a hint.
+_profiler_lock = threading.Lock()
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def _stop_profiler(profiler: Optional[cProfile.Profile], keep: bool) -> Optional[str]:
+    if profiler is None:
+        return None
+    profiler.disable()
+    _profiler_lock.release()
+    if not keep:
+        return None
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+    return out.getvalue()
+
+class TimingMiddleware:
+    """ASGI middleware emitting Server-Timing headers and sampling slow requests"""
+
+    def __init__(self, app):
+        self.app = app
+        settings = get_settings()
+        self.threshold_ms = settings.SLOW_REQUEST_THRESHOLD_MS
+        self.profile_rate = settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        profiler = None
+        if self.profile_rate and random.random() < self.profile_rate:
+            profiler = _start_profiler()
+        start = time.perf_counter()
+        status_code = 500
+        is_stream = False
+
+        async def send_with_timing(message):
+            nonlocal status_code, is_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                is_stream = headers.get("content-type", "").startswith("text/event-stream")
+                headers.append("Server-Timing", timings.header_value((time.perf_counter() - start) * 1000))
+                headers.append("Timing-Allow-Origin", "*")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timings.reset(token)
+            total_ms = (time.perf_counter() - start) * 1000
+            # Long-lived event streams are open by design, not slow
+            is_slow = total_ms >= self.threshold_ms and not is_stream
+            profile = _stop_profiler(profiler, keep=is_slow)
+            if is_slow:
+                slow_requests.record({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status_code,
+                    "duration_ms": round(total_ms, 2),
+                    "phases": {name: round(duration, 2) for name, duration in timings.phases.items()},
+                    "timestamp": datetime.now().isoformat(),
+                    "profile": profile
+                })
@@ -0,0 +1,82 @@
+"""Record real-world pages for the micro-benchmarks
+
+    python benchmarks/corpus.py record URL [--name NAME] [--selector CSS ...]
+    python benchmarks/corpus.py list
+
+Pages are stored gzip-compressed under benchmarks/corpus/ together with
+manifest.json (source URL, recording time, size, sha256 and the selectors
+to benchmark), so every benchmark run parses exactly the same bytes.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+MANIFEST = os.path.join(CORPUS_DIR, "manifest.json")
+DEFAULT_SELECTORS = ["body", "title", "h1", "div p"]
+
+def load_manifest() -> dict:
+    if not os.path.exists(MANIFEST):
+        return {"pages": []}
+    with open(MANIFEST) as f:
+        return json.load(f)
+
+def load_pages():
+    """[(name, html bytes, selectors)] for every recorded page"""
+    pages = []
+    for entry in load_manifest()["pages"]:
+        with gzip.open(os.path.join(CORPUS_DIR, entry["file"]), "rb") as f:
+            pages.append((entry["name"], f.read(), entry.get("selectors") or DEFAULT_SELECTORS))
+    return pages
+
+def record(url: str, name: str = None, selectors=None):
+    import httpx
+    
+    response = httpx.get(url, follow_redirects=True, timeout=30.0, headers={
+        "User-Agent": "Mozilla/5.0 (compatible; AgenticAutomationBot/1.0)"
+    })
+    response.raise_for_status()
+    body = response.content
+    name = name or re.sub(r"[^a-z0-9]+", "-", url.lower().split("://", 1)[-1]).strip("-")[:60]
+    filename = f"{name}.html.gz"
+    with gzip.open(os.path.join(CORPUS_DIR, filename), "wb", compresslevel=9) as f:
+        f.write(body)
+    
+    manifest = load_manifest()
+    manifest["pages"] = [page for page in manifest["pages"] if page["name"] != name]
+    manifest["pages"].append({
+        "name": name,
+        "file": filename,
+        "url": url,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "bytes": len(body),
+        "sha256": hashlib.sha256(body).hexdigest(),
+        "selectors": selectors or DEFAULT_SELECTORS
+    })
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"📼 Recorded {url} → {filename} ({len(body)} bytes)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record")
+    record_parser.add_argument("url")
+    record_parser.add_argument("--name")
+    record_parser.add_argument("--selector", action="append", dest="selectors")
+    commands.add_parser("list")
+    args = parser.parse_args()
+    
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    if args.command == "record":
+        record(args.url, args.name, args.selectors)
+    else:
+        for page in load_manifest()["pages"]:
+            print(f"{page['name']:40} {page['bytes']:>9} bytes  {page['recorded_at']}  {page['url']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Local stand-ins for everything the scheduler talks to
+
+    python benchmarks/fakes.py --port 8901
+
+- GET  /site/{id}?size=&latency_ms=&change_rate=&error_rate=
+       An HTML page of ~size bytes whose #content changes with probability
+       change_rate per request; fails with HTTP 500 with probability
+       error_rate. Delayed by latency_ms.
+- POST /discord/{id}   Discord webhook (204)
+- POST /emails         Resend API (point RESEND_API_URL here)
+- GET  /robots.txt     404, like most small sites
+- GET  /stats          Request counters (reset with DELETE /stats)
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from functools import lru_cache
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.routing import Route
+
+_versions = {}
+_stats = {"pages": 0, "page_errors": 0, "page_changes": 0, "discord": 0, "emails": 0}
+
+@lru_cache(maxsize=64)
+def filler_html(size: int) -> str:
+    """Deterministic page-like padding, so every run serves the same bytes"""
+    rng = random.Random(size)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "price", "stock", "update", "news", "item"]
+    paragraphs, length = [], 0
+    while length < size:
+        text = " ".join(rng.choice(words) for _ in range(40))
+        paragraph = f"<div class=\"item\"><h3>{rng.randint(1, 99999)}</h3><p>{text}</p></div>\n"
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return "".join(paragraphs)
+
+async def site(request: Request):
+    site_id = request.path_params["site_id"]
+    params = request.query_params
+    latency = float(params.get("latency_ms", 0)) / 1000
+    if latency:
+        await asyncio.sleep(latency)
+    _stats["pages"] += 1
+    if random.random() < float(params.get("error_rate", 0)):
+        _stats["page_errors"] += 1
+        return Response("upstream error", status_code=500)
+    
+    version = _versions.get(site_id, 0)
+    if random.random() < float(params.get("change_rate", 0)):
+        version += 1
+        _versions[site_id] = version
+        _stats["page_changes"] += 1
+    body = (
+        f"<html><head><meta charset=\"utf-8\"><title>Site {site_id}</title></head><body>"
+        f"<div id=\"content\">Site {site_id} version {version}</div>"
+        f"{filler_html(int(params.get('size', 10000)))}</body></html>"
+    )
+    return HTMLResponse(body)
+
+async def discord(request: Request):
+    await request.body()
+    _stats["discord"] += 1
+    return Response(status_code=204)
+
+async def emails(request: Request):
+    await request.body()
+    _stats["emails"] += 1
+    return JSONResponse({"id": str(uuid.uuid4())})
+
+async def robots(request: Request):
+    return Response("not found", status_code=404)
+
+async def stats(request: Request):
+    if request.method == "DELETE":
+        for key in _stats:
+            _stats[key] = 0
+    return JSONResponse(_stats)
+
+app = Starlette(routes=[
+    Route("/site/{site_id}", site),
+    Route("/discord/{hook_id}", discord, methods=["POST"]),
+    Route("/emails", emails, methods=["POST"]),
+    Route("/robots.txt", robots),
+    Route("/stats", stats, methods=["GET", "DELETE"])
+])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8901)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
@@ -0,0 +1,236 @@
+"""End-to-end scheduler load test against local stand-ins
+
+    python benchmarks/load_test.py [--automations 2000] [--ticks 6] [--tick-seconds 5]
+                                   [--page-size 20000] [--latency-ms 50]
+                                   [--change-rate 0.1] [--error-rate 0.02]
+                                   [--save-baseline | --baseline PATH]
+
+Starts benchmarks/fakes.py (fake site farm + Discord/Resend stand-ins) in a
+separate process, registers N website_monitor automations in a throwaway
+SQLite database (or --database-url), then drives run_scheduled_automations
+once per tick exactly like the APScheduler job would.
+
+Reports automations/sec, tick lag (how late each tick started), event
+loop lag, DB write rate and peak RSS, and compares them with the stored
+baseline. Outbound politeness limits are lifted, since every fake site
+shares one host.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "load_test.json")
+
+# metric -> True if higher is better
+METRICS = {
+    "automations_per_sec": True,
+    "db_writes_per_sec": True,
+    "tick_lag_ms_max": False,
+    "loop_lag_ms_p99": False,
+    "drain_ms": False,
+    "peak_rss_mb": False
+}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_for(url: str, timeout: float = 15.0):
+    import urllib.request
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up")
+
+def _configure_environment(args, farm: str, workdir: str):
+    """Settings are read at import, so this must run before any app module is imported"""
+    os.environ.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "SCHEDULER_TICK_SECONDS": str(args.tick_seconds),
+        "SCHEDULER_CONCURRENCY": str(args.concurrency),
+        "SCHEDULER_LOCK_FILE": os.path.join(workdir, "scheduler.lock"),
+        "DOMAIN_RATE_PER_SECOND": "1000000",
+        "DOMAIN_BURST": "1000000",
+        "ROBOTS_RESPECT_CRAWL_DELAY": "false",
+        "RESEND_API_KEY": "re_load_test",
+        "RESEND_API_URL": farm
+    })
+    sys.path.insert(0, ROOT)
+
+def _automation_rows(args, farm: str) -> list:
+    rows = []
+    for i in range(args.automations):
+        config = {
+            "url": (f"{farm}/site/{i}?size={args.page_size}&latency_ms={args.latency_ms}"
+                    f"&change_rate={args.change_rate}&error_rate={args.error_rate}"),
+            "css_selector": "#content"
+        }
+        if i % 100 < args.discord_percent:
+            config["discord_webhook"] = f"{farm}/discord/{i}"
+        if i % 100 < args.email_percent:
+            config["email"] = f"load-{i}@example.com"
+        rows.append({
+            "user_id": f"load_user_{i % 50}",
+            "automation_type": "website_monitor",
+            "name": f"Load test #{i}",
+            "config": json.dumps(config),
+            "interval_minutes": 1,
+            "is_active": True
+        })
+    return rows
+
+async def _monitor_loop_lag(samples: list, interval: float = 0.05):
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+async def run_load(args, farm: str) -> dict:
+    import httpx
+    from sqlalchemy import func, insert, select
+    from app.database import AsyncSessionLocal, async_engine, ensure_schema
+    from app.models import AutomationRun, AutomationSnapshot, HostedAutomation
+    from app.scheduler import automation_scheduler
+    
+    await ensure_schema()
+    async with async_engine.begin() as connection:
+        await connection.execute(insert(HostedAutomation), _automation_rows(args, farm))
+    async with httpx.AsyncClient() as client:
+        await client.delete(f"{farm}/stats")
+    
+    loop = asyncio.get_running_loop()
+    loop_lag = []
+    monitor = asyncio.ensure_future(_monitor_loop_lag(loop_lag))
+    tick_lag = []
+    started = loop.time()
+    for tick in range(args.ticks):
+        target = started + tick * args.tick_seconds
+        await asyncio.sleep(max(0.0, target - loop.time()))
+        tick_lag.append((loop.time() - target) * 1000)
+        await automation_scheduler.run_scheduled_automations()
+    await asyncio.sleep(max(0.0, started + args.ticks * args.tick_seconds - loop.time()))
+    drain_started = loop.time()
+    await automation_scheduler.drain()
+    finished = loop.time()
+    monitor.cancel()
+    
+    async with AsyncSessionLocal() as db:
+        statuses = dict((await db.execute(
+            select(AutomationRun.status, func.count()).group_by(AutomationRun.status)
+        )).all())
+        snapshots = (await db.execute(select(func.count()).select_from(AutomationSnapshot))).scalar_one()
+    async with httpx.AsyncClient() as client:
+        farm_stats = (await client.get(f"{farm}/stats")).json()
+    from app.utils.fetch import close_client
+    await close_client()
+    
+    elapsed = finished - started
+    runs = sum(statuses.values())
+    loop_lag.sort()
+    return {
+        "automations_per_sec": runs / elapsed,
+        "db_writes_per_sec": (runs + snapshots) / elapsed,
+        "tick_lag_ms_max": max(tick_lag),
+        "loop_lag_ms_p99": loop_lag[int(len(loop_lag) * 0.99)] if loop_lag else 0.0,
+        "drain_ms": (finished - drain_started) * 1000,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "runs": runs,
+        "run_statuses": statuses,
+        "snapshots": snapshots,
+        "elapsed_sec": elapsed,
+        "farm": farm_stats
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print results next to the baseline; True if any metric regressed past tolerance"""
+    regressed = False
+    print(f"\n{'metric':22} {'current':>12} {'baseline':>12} {'change':>9}")
+    for metric, higher_is_better in METRICS.items():
+        current = results[metric]
+        reference = (baseline or {}).get("results", {}).get(metric)
+        if not reference:
+            print(f"{metric:22} {current:12.2f} {'-':>12} {'':>9}")
+            continue
+        change = (current - reference) / reference
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > tolerance:
+            flag, regressed = "  ❌", True
+        elif worse < -tolerance:
+            flag = "  ✅"
+        print(f"{metric:22} {current:12.2f} {reference:12.2f} {change:+8.1%}{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--automations", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=6)
+    parser.add_argument("--tick-seconds", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--discord-percent", type=int, default=50, help="Automations with a Discord webhook")
+    parser.add_argument("--email-percent", type=int, default=10, help="Automations with an email recipient")
+    parser.add_argument("--database-url", help="Defaults to a throwaway SQLite file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="Keep the scheduler's own output")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    port = _free_port()
+    farm = f"http://127.0.0.1:{port}"
+    farm_process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "benchmarks", "fakes.py"), "--port", str(port)], cwd=ROOT
+    )
+    try:
+        _wait_for(f"{farm}/stats")
+        _configure_environment(args, farm, workdir)
+        print(f"🏁 {args.automations} automations × {args.ticks} ticks of {args.tick_seconds:g}s against {farm}")
+        with open(os.devnull, "w") as devnull:
+            # The scheduler logs per automation; keep the cost, drop the noise
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+                results = asyncio.run(run_load(args, farm))
+    finally:
+        farm_process.terminate()
+        farm_process.wait()
+    
+    print(f"   Runs: {results['runs']} {results['run_statuses']}  snapshots: {results['snapshots']}")
+    print(f"   Farm: {results['farm']}")
+    
+    config = {key: value for key, value in vars(args).items() if key not in ("baseline", "save_baseline", "verbose", "tolerance")}
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("⚠️  Baseline was recorded with different parameters; comparison is indicative only")
+    regressed = compare(results, baseline, args.tolerance)
+    
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": config, "results": {metric: results[metric] for metric in METRICS}}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    sys.exit(1 if regressed else 0)
+
+if __name__ == "__main__":
+    main()
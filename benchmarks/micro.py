@@ -0,0 +1,246 @@
+"""Micro-benchmarks for the per-tick and per-request hot paths
+
+    python benchmarks/micro.py [-k parse] [--rounds 25] [--save results.json]
+                               [--compare baseline.json] [--alpha 0.01] [--threshold 0.05]
+
+Covers HTML parsing and selection (plus the legacy BeautifulSoup
+select_one path for reference), change comparison, config json.loads,
+templates' generate_code and the /list and /runs serialization. Pages come
+from the recorded corpus (benchmarks/corpus.py); without one, synthetic
+pages of 10 KB / 100 KB / 1 MB are used.
+
+Each benchmark is auto-ranged so one sample lasts at least --min-time, and
+sampled --rounds times with the GC disabled. --compare runs a two-sided
+Mann-Whitney U test per benchmark and flags a regression only when the
+difference is both significant (p < alpha) and larger than --threshold.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# name -> zero-argument callable to time
+BENCHMARKS: Dict[str, Callable[[], object]] = {}
+
+def _synthetic_pages():
+    from fakes import filler_html
+
+    pages = []
+    for label, size in (("synthetic-10k", 10_000), ("synthetic-100k", 100_000), ("synthetic-1m", 1_000_000)):
+        html = (
+            f"<html><head><meta charset=\"utf-8\"><title>{label}</title></head><body>"
+            f"<h1>Benchmark page</h1><div id=\"content\">Current price: ₹1,299.00</div>"
+            f"{filler_html(size)}</body></html>"
+        ).encode()
+        pages.append((label, html, ["body", "title", "h1", "#content", "div.item p"]))
+    return pages
+
+def _mutate(text: str) -> str:
+    """The same text with a handful of words changed, like a typical update"""
+    words = text.split(" ")
+    for index in range(0, len(words), max(1, len(words) // 5)):
+        words[index] = words[index][::-1]
+    return " ".join(words)
+
+def register_benchmarks():
+    import orjson
+    from app.models.hosted_automation import AutomationRun, HostedAutomation
+    from app.routes.hosted_automations import AUTOMATION_FIELDS, _row_to_dict
+    from app.templates import discord_notifier, price_tracker, website_monitor
+    from app.utils.diff import compute_delta, summarize_delta
+    from app.utils.fetch import HtmlSink, compile_selector, select_text
+    from app.utils.fingerprint import simhash
+    from app.utils.run_events import run_payload
+    from corpus import load_pages
+
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        BeautifulSoup = None
+
+    pages = load_pages() or _synthetic_pages()
+    for name, html, selectors in pages:
+        def parse(html=html):
+            sink = HtmlSink()
+            for start in range(0, len(html), 65536):
+                sink.feed(html[start:start + 65536])
+            return sink.close()
+        BENCHMARKS[f"parse[{name}]"] = parse
+
+        root = parse()
+        for selector in selectors:
+            compile_selector(selector)
+            BENCHMARKS[f"select[{name}|{selector}]"] = lambda root=root, selector=selector: select_text(root, selector)
+
+        if BeautifulSoup is not None:
+            # What execute_website_monitor did before the streaming lxml parser
+            BENCHMARKS[f"bs4_select_one[{name}]"] = lambda html=html, selector=selectors[0]: (
+                BeautifulSoup(html, "html.parser").select_one(selector).get_text(strip=True)
+            )
+
+        text = select_text(root, "body")
+        changed = _mutate(text)
+        BENCHMARKS[f"compare_equal[{name}]"] = lambda text=text, other=(text + " ")[:-1]: text != other
+        BENCHMARKS[f"compare_delta[{name}]"] = lambda text=text, changed=changed: summarize_delta(
+            text, compute_delta(text, changed), 1000
+        )
+        BENCHMARKS[f"simhash[{name}]"] = lambda text=text: simhash(text)
+
+    config = json.dumps({
+        "url": "https://example.com/products/123?ref=abc",
+        "css_selector": "#content .price",
+        "discord_webhook": "https://discord.com/api/webhooks/123/abc",
+        "email": "someone@example.com",
+        "selectors": {"price": {"selector": ".price", "change": "numeric", "min_change_pct": 2}}
+    })
+    BENCHMARKS["config_json_loads"] = lambda: json.loads(config)
+    BENCHMARKS["config_orjson_loads"] = lambda: orjson.loads(config)
+
+    template_config = {"url": "https://example.com", "webhook_url": "https://discord.com/api/webhooks/1/a",
+                       "product_url": "https://example.com/p/1", "target_price": 999, "css_selector": ".price",
+                       "message": "Hello {time}", "check_interval": 300}
+    for module in (website_monitor, price_tracker, discord_notifier):
+        BENCHMARKS[f"generate_code[{module.__name__.rsplit('.', 1)[-1]}]"] = (
+            lambda module=module: module.generate_code(template_config)
+        )
+
+    selected = list(AUTOMATION_FIELDS)
+    automations = [
+        HostedAutomation(id=i, user_id="demo_user", automation_type="website_monitor", name=f"Monitor {i}",
+                         config=config, interval_minutes=10, is_active=True,
+                         last_run=None, created_at=None)
+        for i in range(200)
+    ]
+    runs = [
+        AutomationRun(id=i, automation_id=7, status="no_change", result="Current price: ₹1,299.00" * 10,
+                      changed_fields='{"price":false}', notified=False, executed_at=None)
+        for i in range(200)
+    ]
+    BENCHMARKS["serialize_list[200]"] = lambda: orjson.dumps([_row_to_dict(row, selected) for row in automations])
+    BENCHMARKS["serialize_runs[200]"] = lambda: orjson.dumps([run_payload(run) for run in runs])
+
+def measure(fn: Callable[[], object], rounds: int, min_time: float) -> List[float]:
+    """Per-call seconds for each round (timeit-style autorange)"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_time:
+            break
+        loops *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            samples.append((time.perf_counter() - started) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+def mann_whitney_u(a: List[float], b: List[float]) -> float:
+    """Two-sided p-value (normal approximation with tie correction)"""
+    combined = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+
+    n1, n2 = len(a), len(b)
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return math.erfc(max(z, 0.0) / math.sqrt(2))
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.1f} ns"
+
+def compare(results: Dict[str, List[float]], baseline: Dict[str, List[float]], alpha: float, threshold: float) -> Tuple[int, int]:
+    regressions = improvements = 0
+    print(f"\n{'benchmark':48} {'median':>11} {'baseline':>11} {'change':>8} {'p':>8}")
+    for name, samples in results.items():
+        median = statistics.median(samples)
+        reference = baseline.get(name)
+        if not reference:
+            print(f"{name[:48]:48} {_format_time(median):>11} {'-':>11}")
+            continue
+        reference_median = statistics.median(reference)
+        change = (median - reference_median) / reference_median
+        p = mann_whitney_u(samples, reference)
+        flag = ""
+        if p < alpha and abs(change) > threshold:
+            if change > 0:
+                flag, regressions = "  ❌", regressions + 1
+            else:
+                flag, improvements = "  ✅", improvements + 1
+        print(f"{name[:48]:48} {_format_time(median):>11} {_format_time(reference_median):>11} {change:+7.1%} {p:8.4f}{flag}")
+    return regressions, improvements
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-k", dest="filter", help="Only benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=25)
+    parser.add_argument("--min-time", type=float, default=0.02, help="Seconds per sample")
+    parser.add_argument("--save", help="Write raw samples to this JSON file")
+    parser.add_argument("--compare", help="Baseline file written by --save")
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    args = parser.parse_args()
+
+    register_benchmarks()
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(fn, args.rounds, args.min_time)
+        if not args.compare:
+            samples = results[name]
+            spread = statistics.quantiles(samples, n=4) if len(samples) > 1 else [samples[0]] * 3
+            print(f"{name[:48]:48} {_format_time(statistics.median(samples))}  "
+                  f"(IQR {_format_time(spread[0]).strip()} – {_format_time(spread[2]).strip()})")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": sys.version.split()[0], "samples": results}, f)
+        print(f"\n💾 Samples saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["samples"]
+        regressions, improvements = compare(results, baseline, args.alpha, args.threshold)
+        print(f"\n{regressions} significant regression(s), {improvements} improvement(s)")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
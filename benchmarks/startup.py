@@ -0,0 +1,127 @@
+"""Startup benchmark: import cost by module and time to first response
+
+    python benchmarks/startup.py [--runs 5] [--top 15] [--json out.json]
+
+Every measurement uses a fresh interpreter against a throwaway SQLite
+database, so results are comparable between commits. Time to first
+response is measured twice: on an empty database (schema gets created)
+and on one whose schema is already applied (the usual restart).
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def _env(database_path: str, lock_path: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{database_path}",
+        "SCHEDULER_LOCK_FILE": lock_path,
+        "PYTHONPATH": ROOT
+    })
+    return env
+
+def import_profile(runs: int, workdir: str) -> dict:
+    """Median self time per top-level package and cumulative time per app module (ms)"""
+    packages, app_modules, totals = {}, {}, []
+    for run in range(runs):
+        env = _env(os.path.join(workdir, f"imports-{run}.db"), os.path.join(workdir, "imports.lock"))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.main"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        per_package = {}
+        for match in _IMPORT_LINE.finditer(result.stderr):
+            self_us, cumulative_us, _, name = int(match[1]), int(match[2]), match[3], match[4]
+            root = name.split(".")[0]
+            per_package[root] = per_package.get(root, 0) + self_us
+            if name.startswith("app."):
+                app_modules.setdefault(name, []).append(cumulative_us / 1000)
+            if name == "app.main":
+                totals.append(cumulative_us / 1000)
+        for root, self_us in per_package.items():
+            packages.setdefault(root, []).append(self_us / 1000)
+    return {
+        "total_ms": statistics.median(totals),
+        "packages_ms": {name: statistics.median(values) for name, values in packages.items()},
+        "app_modules_ms": {name: statistics.median(values) for name, values in app_modules.items()}
+    }
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def time_to_first_response(database_path: str, lock_path: str, timeout: float = 30.0) -> float:
+    """Seconds from spawning uvicorn to the first 200 from GET /"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=_env(database_path, lock_path), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("Server did not answer within the timeout")
+    finally:
+        server.terminate()
+        server.wait()
+
+def first_response_profile(runs: int, workdir: str) -> dict:
+    cold, warm = [], []
+    for run in range(runs):
+        database_path = os.path.join(workdir, f"server-{run}.db")
+        lock_path = os.path.join(workdir, f"server-{run}.lock")
+        cold.append(time_to_first_response(database_path, lock_path) * 1000)
+        warm.append(time_to_first_response(database_path, lock_path) * 1000)
+    return {
+        "cold_schema_ms": {"median": statistics.median(cold), "min": min(cold)},
+        "warm_schema_ms": {"median": statistics.median(warm), "min": min(warm)}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = import_profile(args.runs, workdir)
+        responses = first_response_profile(args.runs, workdir)
+    
+    print(f"\n📦 import app.main: {imports['total_ms']:.1f} ms (median of {args.runs})")
+    print("\n   Self time by top-level package:")
+    for name, ms in sorted(imports["packages_ms"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {ms:8.1f} ms  {name}")
+    print("\n   Cumulative time by app module:")
+    for name, ms in sorted(imports["app_modules_ms"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   {ms:8.1f} ms  {name}")
+    
+    print("\n⏱️  Time to first response (spawn → GET / 200):")
+    for label, key in (("empty database", "cold_schema_ms"), ("schema applied", "warm_schema_ms")):
+        stats = responses[key]
+        print(f"   {label:15} median {stats['median']:7.1f} ms   min {stats['min']:7.1f} ms")
+    
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"imports": imports, "first_response": responses, "runs": args.runs}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
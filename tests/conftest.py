@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings and engines are built at import time: point them at a throwaway
+# database and keep the scheduler off before anything imports app.*
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='ade-tests-')}/test.db"
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ.setdefault("GROQ_API_KEY", "test-key")  # LLM routes answer 503 without a provider key
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def automation_id(client):
+    """One website monitor owned by demo_user, deleted afterwards (the free tier allows 3)"""
+    response = client.post("/api/hosted-automations/create", json={
+        "automation_type": "website_monitor",
+        "name": "Example",
+        "config": {"url": "https://example.com", "css_selector": "h1"},
+        "interval_minutes": 10
+    })
+    assert response.status_code == 200, response.text
+    automation_id = response.json()["id"]
+    yield automation_id
+    client.delete(f"/api/hosted-automations/{automation_id}")
@@ -0,0 +1,48 @@
+import pytest
+
+from app.config import get_settings
+from app.utils import admission
+
+GENERATE = "/api/automations/generate"
+BODY = {"automation_type": "website_monitor", "config": {}}
+
+@pytest.fixture(autouse=True)
+def fresh_limits(monkeypatch):
+    """Empty buckets per test, one trusted proxy (as on Render), 3-call LLM burst"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ADMISSION_TRUSTED_PROXY_HOPS", 1)
+    monkeypatch.setattr(settings, "ADMISSION_LLM_BURST", 3)
+    admission._classes.clear()
+    yield
+    admission._classes.clear()
+
+def _generate(client, forwarded_for=None):
+    headers = {"X-Forwarded-For": forwarded_for} if forwarded_for else {}
+    return client.post(GENERATE, json=BODY, headers=headers)
+
+def test_proxied_clients_get_separate_buckets(client):
+    assert [_generate(client, "203.0.113.7").status_code for _ in range(4)] == [200, 200, 200, 429]
+
+    # Same proxy peer, different client behind it: not locked out
+    assert _generate(client, "198.51.100.20").status_code == 200
+
+def test_rejection_carries_retry_after(client):
+    for _ in range(3):
+        _generate(client, "203.0.113.7")
+    response = _generate(client, "203.0.113.7")
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+def test_client_supplied_forwarded_entries_are_ignored(client):
+    for _ in range(3):
+        assert _generate(client, "203.0.113.7").status_code == 200
+
+    # Prepending made-up hops does not move the caller to a fresh bucket
+    assert _generate(client, "10.9.8.7, 203.0.113.7").status_code == 429
+
+def test_forwarded_for_ignored_without_trusted_proxies(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "ADMISSION_TRUSTED_PROXY_HOPS", 0)
+    statuses = [_generate(client, f"203.0.113.{i}").status_code for i in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
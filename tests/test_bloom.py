@@ -0,0 +1,25 @@
+from app.utils.bloom import BloomFilter
+
+def test_no_false_negatives():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    items = [f"https://example.com/post/{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+def test_false_positive_rate_near_target():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"seen-{i}")
+
+    false_positives = sum(f"unseen-{i}" in bloom for i in range(10000))
+    assert false_positives < 300  # 1% target, generous margin
+
+def test_round_trips_through_bytes():
+    bloom = BloomFilter.for_capacity(100, 0.001)
+    bloom.add("guid-1")
+    restored = BloomFilter.for_capacity(100, 0.001, bloom.to_bytes())
+
+    assert "guid-1" in restored
+    assert "guid-2" not in restored
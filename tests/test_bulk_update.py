@@ -0,0 +1,49 @@
+import json
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import HostedAutomation
+
+def _stored(client, automation_id: int) -> HostedAutomation:
+    """Row as committed, read on the app's own event loop (the async pool is bound to it)"""
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(HostedAutomation).where(HostedAutomation.id == automation_id))
+    return client.portal.call(load)
+
+def _bulk_update(client, **fields):
+    return client.post("/api/hosted-automations/bulk/update", json={"updates": [fields]})
+
+def test_null_name_is_a_per_item_error(client, automation_id):
+    response = _bulk_update(client, id=automation_id, name=None)
+
+    assert response.status_code == 400
+    errors = response.json()["detail"]["errors"]
+    assert errors == [{"index": 0, "id": automation_id, "errors": ["name must not be null"]}]
+    assert _stored(client, automation_id).name == "Example"
+
+def test_null_config_is_rejected_and_not_stored(client, automation_id):
+    response = _bulk_update(client, id=automation_id, config=None)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["errors"] == ["config must not be null"]
+    assert json.loads(_stored(client, automation_id).config)["url"] == "https://example.com"
+
+def test_one_null_rejects_the_whole_batch(client, automation_id):
+    response = client.post("/api/hosted-automations/bulk/update", json={"updates": [
+        {"id": automation_id, "interval_minutes": None, "name": "Renamed"}
+    ]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["errors"] == ["interval_minutes must not be null"]
+    stored = _stored(client, automation_id)
+    assert (stored.name, stored.interval_minutes) == ("Example", 10)
+
+def test_valid_update_still_applies(client, automation_id):
+    response = _bulk_update(client, id=automation_id, name="Renamed", config={"url": "https://example.org"})
+
+    assert response.status_code == 200
+    stored = _stored(client, automation_id)
+    assert stored.name == "Renamed"
+    assert json.loads(stored.config) == {"url": "https://example.org"}
@@ -0,0 +1,49 @@
+import pytest
+
+from app.config import get_settings
+
+SCRIPT = {"automation_type": "custom_script", "name": "Script", "config": {"code": "def main():\n    return 1\n"}}
+
+@pytest.fixture
+def sandbox(monkeypatch):
+    """Sandbox on, admin token configured (the pool itself is never started here)"""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SANDBOX_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    return settings
+
+def _create(client, token=None, path="/api/hosted-automations/create", body=SCRIPT):
+    headers = {"X-Admin-Token": token} if token else {}
+    return client.post(path, json=body, headers=headers)
+
+def test_rejected_at_create_when_sandbox_disabled(client):
+    response = _create(client)
+
+    assert response.status_code == 400
+    assert "SANDBOX_ENABLED" in response.json()["detail"]
+
+def test_requires_a_configured_admin_token(client, sandbox, monkeypatch):
+    monkeypatch.setattr(sandbox, "ADMIN_TOKEN", "")
+
+    assert _create(client).status_code == 403
+
+def test_requires_the_admin_token(client, sandbox):
+    assert _create(client).status_code == 403
+    assert _create(client, "wrong").status_code == 403
+
+def test_bulk_create_is_gated(client, sandbox):
+    body = {"automations": [{**SCRIPT, "automation_type": "website_monitor", "config": {"url": "https://example.com"}}, SCRIPT]}
+
+    assert _create(client, path="/api/hosted-automations/bulk/create", body=body).status_code == 403
+
+def test_admin_creates_then_updates_need_the_token(client, sandbox):
+    response = _create(client, "secret")
+    assert response.status_code == 200, response.text
+    automation_id = response.json()["id"]
+    try:
+        update = {"updates": [{"id": automation_id, "config": {"code": "import os"}}]}
+        assert client.post("/api/hosted-automations/bulk/update", json=update).status_code == 403
+        assert client.post("/api/hosted-automations/bulk/update", json=update,
+                           headers={"X-Admin-Token": "secret"}).status_code == 200
+    finally:
+        client.delete(f"/api/hosted-automations/{automation_id}")
@@ -0,0 +1,35 @@
+import pytest
+
+from app.utils.diff import apply_delta, compute_delta, summarize_delta, tokenize
+
+OLD = "Price: 1,299 INR. In stock at 3 stores."
+
+@pytest.mark.parametrize("new", [
+    "Price: 1,299 INR. Only a few left! In stock at 3 stores.",  # insert
+    "Price: 1,299 INR.",  # delete
+    "Price: 999 INR (sale, ends Friday). In stock at 3 stores.",  # replace, more tokens
+    "Sold out.",  # replace, fewer tokens
+    "",
+])
+def test_delta_rebuilds_new_text(new):
+    assert apply_delta(OLD, compute_delta(OLD, new)) == new
+
+def test_tokenize_is_lossless():
+    text = "  tabs\tand\nnewlines, émoji 🔔 and (punctuation)!  "
+    assert "".join(tokenize(text)) == text
+
+def test_unchanged_text_is_one_copy():
+    assert compute_delta(OLD, OLD) == [len(tokenize(OLD))]
+
+def test_summary_lists_removed_and_added_text():
+    new = "Price: 999 INR. In stock at 3 stores."
+    summary = summarize_delta(OLD, compute_delta(OLD, new))
+
+    assert "➖ 1,299" in summary
+    assert "➕ 999" in summary
+
+def test_summary_is_capped():
+    summary = summarize_delta("", compute_delta("", "word " * 500), max_chars=50)
+
+    assert len(summary) == 50
+    assert summary.endswith("…")
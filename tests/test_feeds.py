@@ -0,0 +1,52 @@
+from app.utils.feeds import FeedEntry, FeedSink
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <title>Example</title>
+  <item>
+    <title>First post</title>
+    <link>https://example.com/1</link>
+    <guid>post-1</guid>
+    <pubDate>Mon, 19 Oct 2026 09:00:00 GMT</pubDate>
+  </item>
+  <!-- a comment between items -->
+  <item>
+    <title>Second post</title>
+    <link>https://example.com/2</link>
+  </item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example</title>
+  <entry>
+    <title>Release 2.0</title>
+    <id>tag:example.com,2026:2.0</id>
+    <link rel="edit" href="https://example.com/edit/2.0"/>
+    <link href="https://example.com/releases/2.0"/>
+    <updated>2026-10-19T09:00:00Z</updated>
+  </entry>
+</feed>"""
+
+def _parse(document: bytes, chunk_size: int = 7):
+    """Fed in small chunks, as stream_fetch would, so entries straddle chunk boundaries"""
+    sink = FeedSink()
+    for start in range(0, len(document), chunk_size):
+        sink.feed(document[start:start + chunk_size])
+    return sink.close()
+
+def test_rss_items():
+    assert _parse(RSS) == [
+        FeedEntry(key="post-1", title="First post", link="https://example.com/1", updated="Mon, 19 Oct 2026 09:00:00 GMT"),
+        FeedEntry(key="https://example.com/2", title="Second post", link="https://example.com/2", updated="")
+    ]
+
+def test_atom_entry_prefers_alternate_link():
+    assert _parse(ATOM) == [
+        FeedEntry(key="tag:example.com,2026:2.0", title="Release 2.0",
+                  link="https://example.com/releases/2.0", updated="2026-10-19T09:00:00Z")
+    ]
+
+def test_truncated_feed_keeps_complete_entries():
+    cut = RSS.index(b"<item>", RSS.index(b"</item>"))
+    assert [entry.key for entry in _parse(RSS[:cut + 20])] == ["post-1"]
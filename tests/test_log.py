@@ -0,0 +1,42 @@
+import io
+import logging
+from collections import deque
+
+from app.utils.log import LogWriter, TextFormatter
+
+def _writer() -> LogWriter:
+    handler = logging.Handler()
+    handler.setFormatter(TextFormatter())
+    return LogWriter(deque(), handler, flush_interval=60)
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("app.test", logging.INFO, __file__, 1, message, None, None)
+
+def test_closed_stdout_is_counted_not_raised(monkeypatch):
+    writer = _writer()
+    closed = io.StringIO()
+    closed.close()
+    monkeypatch.setattr("sys.stdout", closed)
+    writer.records.extend([_record("one"), _record("two")])
+
+    writer.flush()
+
+    assert writer.failed_writes == 2
+    assert not writer.records
+
+def test_writes_follow_the_current_stdout(monkeypatch):
+    writer = _writer()
+    closed = io.StringIO()
+    closed.close()
+    monkeypatch.setattr("sys.stdout", closed)
+    writer.records.append(_record("lost"))
+    writer.flush()
+
+    # stdout replaced after the failure: the same writer picks it up
+    current = io.StringIO()
+    monkeypatch.setattr("sys.stdout", current)
+    writer.records.append(_record("kept"))
+    writer.flush()
+
+    assert "kept" in current.getvalue()
+    assert "lost" not in current.getvalue()
@@ -0,0 +1,46 @@
+from sqlalchemy import delete, select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.models.snapshot import AutomationSnapshot
+from app.utils.diff import compute_delta
+from app.utils.snapshots import reconstruct_version, record_snapshot
+
+AUTOMATION_ID = 990001  # No automation row needed: snapshots are keyed by id only
+VERSIONS = 45  # Crosses two keyframe intervals
+
+def _page(version: int) -> str:
+    # Mostly stable text with a few changing lines, like a monitored page
+    lines = [f"Line {i}: nothing new here" for i in range(100)]
+    lines[version % 100] = f"Line {version % 100}: updated in version {version}"
+    lines.append(f"Visitors: {version * 37}")
+    return "\n".join(lines)
+
+def test_every_version_reconstructs(client):
+    texts = [_page(version) for version in range(1, VERSIONS + 1)]
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            previous = None
+            for text in texts:
+                await record_snapshot(db, AUTOMATION_ID, previous, text, compute_delta(previous, text) if previous else None)
+                await db.commit()  # One run, one commit: the next version number is read from the table
+                previous = text
+
+            keyframes = (await db.scalars(
+                select(AutomationSnapshot.version)
+                .where(AutomationSnapshot.automation_id == AUTOMATION_ID, AutomationSnapshot.is_keyframe == True)
+                .order_by(AutomationSnapshot.version)
+            )).all()
+            rebuilt = [await reconstruct_version(db, AUTOMATION_ID, version) for version in range(1, VERSIONS + 2)]
+
+            await db.execute(delete(AutomationSnapshot).where(AutomationSnapshot.automation_id == AUTOMATION_ID))
+            await db.commit()
+            return keyframes, rebuilt
+
+    keyframes, rebuilt = client.portal.call(scenario)
+
+    interval = get_settings().SNAPSHOT_KEYFRAME_INTERVAL
+    assert keyframes == [1, 1 + interval, 1 + 2 * interval]
+    assert rebuilt[:VERSIONS] == texts
+    assert rebuilt[VERSIONS] is None  # Not recorded yet
@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+
+from lxml import etree
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import HostedAutomation
+from app.scheduler import website_monitor
+from app.utils.snapshots import reconstruct_version
+
+# Long enough that a one-field change is stored as a delta, not a keyframe
+DESCRIPTION = " ".join(f"word{i}" for i in range(200))
+
+def _page(price: str, views: str) -> str:
+    return f"<html><body><p id='about'>{DESCRIPTION}</p><b class='price'>{price}</b><i class='views'>{views} views</i></body></html>"
+
+def test_ignored_updates_keep_every_version_reconstructable(client, monkeypatch):
+    pages = iter([_page("10", "100"), _page("12", "100"), _page("12", "300"), _page("15", "300")])
+
+    async def fake_fetch(url, make_sink, **kwargs):
+        return SimpleNamespace(truncated=False), etree.fromstring(next(pages), etree.HTMLParser())
+    monkeypatch.setattr(website_monitor, "stream_fetch", fake_fetch)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            automation = HostedAutomation(
+                user_id="demo_user",
+                automation_type="website_monitor",
+                name="Round trip",
+                config=json.dumps({"url": "https://example.com", "selectors": {
+                    "about": "#about",
+                    "price": {"selector": ".price", "change": "numeric"},
+                    "views": {"selector": ".views", "change": "ignore"}
+                }}),
+                interval_minutes=10
+            )
+            db.add(automation)
+            await db.commit()
+
+            # change -> change -> ignored-only update -> change
+            results = []
+            for _ in range(4):
+                automation = await db.scalar(select(HostedAutomation).where(HostedAutomation.id == automation.id))
+                run = await website_monitor.execute_website_monitor(automation, db)
+                assert run.status != "error", run.result
+                results.append(automation.last_result)
+
+            versions = [await reconstruct_version(db, automation.id, version) for version in range(1, 5)]
+            return automation.id, results, versions
+
+    automation_id, results, versions = client.portal.call(scenario)
+    client.delete(f"/api/hosted-automations/{automation_id}")  # Also drops its snapshots
+
+    assert json.loads(results[2])["views"] == "300 views"
+    assert versions == results